@@ -0,0 +1,45 @@
+from typing import Any, Dict, Iterable, Iterator, List
+
+_MISSING = object()
+
+
+class AgentTable:
+    """
+    Column-oriented store for agent inventories. Every agent is kept as one tuple under a shared column list
+    instead of one dict per agent. Iterating yields a dict per agent, so callers can treat it like the list of dicts it replaces.
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]] = ()):
+        self.columns: List[str] = []
+        self.columnIndex: Dict[str, int] = {}
+        self.rows: List[tuple] = []
+        self.extend(records)
+
+    def append(self, record: Dict[str, Any]):
+        for key in record:
+            if key not in self.columnIndex:
+                self.columnIndex[key] = len(self.columns)
+                self.columns.append(key)
+        row = [_MISSING] * len(self.columns)
+        for key, value in record.items():
+            row[self.columnIndex[key]] = value
+        self.rows.append(tuple(row))
+
+    def extend(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            self.append(record)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in self.rows:
+            # rows appended before a column was first seen are shorter than the column list
+            yield {column: value for column, value in zip(self.columns, row) if value is not _MISSING}
+
+    def __getitem__(self, idx: int) -> Dict[str, Any]:
+        row = self.rows[idx]
+        return {column: value for column, value in zip(self.columns, row) if value is not _MISSING}
+
+    def __json__(self):
+        return list(self)
@@ -0,0 +1,86 @@
+from array import array
+from typing import Iterator, List, Tuple
+
+
+class MetricAggregate:
+    """
+    Compact form of a wildcard getMetricData response: one metric path, rolled-up sum and has-values flag per entity.
+    Built while the response is parsed so the per-entity metricValues lists don't have to be kept until analysis.
+    """
+
+    def __init__(self):
+        self.metricPaths: List[str] = []
+        self.sums = array("d")
+        self.hasValues = array("b")
+        # raw response, only kept when the controller retains raw metrics (debug runs)
+        self.raw = None
+
+    @staticmethod
+    def fromMetricData(data) -> "MetricAggregate":
+        """Reducer for AppDService.getMetricData."""
+        aggregate = MetricAggregate()
+        for metric in data or []:
+            metricValues = metric.get("metricValues") or []
+            aggregate.metricPaths.append(metric.get("metricPath", ""))
+            aggregate.sums.append(sum(metricValue["sum"] for metricValue in metricValues))
+            aggregate.hasValues.append(1 if metricValues else 0)
+        return aggregate
+
+    def __len__(self) -> int:
+        return len(self.metricPaths)
+
+    def __iter__(self) -> Iterator[Tuple[str, float, bool]]:
+        for metricPath, metricSum, hasValues in zip(self.metricPaths, self.sums, self.hasValues):
+            yield metricPath, metricSum, bool(hasValues)
+
+    @property
+    def nonZeroCount(self) -> int:
+        return sum(1 for metricSum in self.sums if metricSum != 0)
+
+    def __json__(self):
+        data = {
+            "count": len(self),
+            "nonZeroCount": self.nonZeroCount,
+            "metrics": [{"metricPath": metricPath, "sum": metricSum, "hasValues": hasValues} for metricPath, metricSum, hasValues in self],
+        }
+        if self.raw is not None:
+            data["raw"] = self.raw
+        return data
+
+
+def mergeMetricData(slices: List[list], rollup: bool) -> list:
+    """
+    Combine getMetricData responses for consecutive time slices, oldest first, into one response for the whole window.
+    Rolled-up values are merged as the controller would roll up the whole window: sum, count and occurrences add up,
+    min and max are taken across slices, current is the newest slice's and value is the count-weighted mean.
+    Without rollup the per-slice series are concatenated.
+    """
+    merged = {}
+    for data in slices:
+        for metric in data or []:
+            metricPath = metric.get("metricPath", "")
+            if metricPath not in merged:
+                merged[metricPath] = {**metric, "metricValues": list(metric.get("metricValues") or [])}
+            else:
+                merged[metricPath]["metricValues"].extend(metric.get("metricValues") or [])
+
+    if rollup:
+        for metric in merged.values():
+            metricValues = metric["metricValues"]
+            if len(metricValues) > 1:
+                metric["metricValues"] = [_mergeRolledUpValues(metricValues)]
+    return list(merged.values())
+
+
+def _mergeRolledUpValues(metricValues: list) -> dict:
+    count = sum(metricValue.get("count", 0) for metricValue in metricValues)
+    merged = dict(metricValues[-1])
+    merged["startTimeInMillis"] = metricValues[0].get("startTimeInMillis")
+    merged["sum"] = sum(metricValue.get("sum", 0) for metricValue in metricValues)
+    merged["count"] = count
+    merged["occurrences"] = sum(metricValue.get("occurrences", 0) for metricValue in metricValues)
+    merged["min"] = min(metricValue.get("min", 0) for metricValue in metricValues)
+    merged["max"] = max(metricValue.get("max", 0) for metricValue in metricValues)
+    if count:
+        merged["value"] = round(sum(metricValue.get("value", 0) * metricValue.get("count", 0) for metricValue in metricValues) / count)
+    return merged
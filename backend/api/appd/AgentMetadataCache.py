@@ -0,0 +1,65 @@
+import copy
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__.split('.')[-1])
+
+
+class AgentMetadataCache:
+    """
+    App agent metadata (getNodeViewData) of one controller, kept on disk between runs.
+    Entries are keyed by node id and agent version, so an upgraded or re-registered agent is simply a miss.
+    Fields such as latestAgentRuntime and metaInfo change on an agent restart without a version change,
+    so entries are only served for ttlSeconds after they were fetched.
+    """
+
+    def __init__(self, path: str = None, ttlSeconds: float = 0):
+        self.path = path
+        self.ttlSeconds = ttlSeconds
+        self.entries = None
+        self.dirty = False
+
+    @staticmethod
+    def key(nodeId, agentVersion) -> str:
+        return f"{nodeId}|{agentVersion}"
+
+    def _load(self):
+        self.entries = {}
+        if self.path is None or not self.ttlSeconds:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)["entries"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def get(self, nodeId, agentVersion):
+        if self.entries is None:
+            self._load()
+        entry = self.entries.get(self.key(nodeId, agentVersion))
+        if entry is None or time.time() - entry["fetchedAt"] >= self.ttlSeconds:
+            return None
+        return copy.deepcopy(entry["metadata"])
+
+    def put(self, nodeId, agentVersion, metadata):
+        if self.entries is None:
+            self._load()
+        self.entries[self.key(nodeId, agentVersion)] = {"metadata": copy.deepcopy(metadata), "fetchedAt": int(time.time())}
+        self.dirty = True
+
+    def save(self):
+        if self.path is None or not self.ttlSeconds or not self.dirty:
+            return
+        cutoff = time.time() - self.ttlSeconds
+        entries = {key: entry for key, entry in self.entries.items() if entry.get("fetchedAt", 0) >= cutoff}
+        tmpPath = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmpPath, "w", encoding="utf-8") as f:
+                json.dump({"entries": entries}, f)
+            os.replace(tmpPath, self.path)
+            self.dirty = False
+        except OSError as e:
+            logger.debug(f"Unable to write agent metadata cache {self.path}: {e}")
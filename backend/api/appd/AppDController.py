@@ -1,4 +1,8 @@
+from functools import lru_cache
+from urllib.parse import quote
+
 from uplink import Body, Consumer, Path, Query, error_handler, get, headers, params, post
+from yarl import URL
 
 
 class ApiError(Exception):
@@ -9,6 +13,33 @@ def raise_api_error(exc_type, exc_val, exc_tb):
     raise ApiError(exc_val)
 
 
+# Hot endpoints skip uplink's per-call request building. Their URLs and bodies are formatted from these templates and sent
+# straight through the aiohttp session, with the headers uplink would have added, see AppdController.sendDirect.
+METRIC_DATA_URL = (
+    "/controller/rest/applications/{}/metric-data"
+    "?metric-path={}&rollup={}&time-range-type={}&duration-in-mins={}&start-time={}&end-time={}&output=json"
+)
+NODE_METADATA_URL = "/controller/restui/components/getNodeViewData/{}/{}?output=json"
+AGENT_CONFIGURATION_URL = "/controller/restui/agentManager/getAgentConfiguration?output=json"
+AGENT_CONFIGURATION_BODY = (
+    '{{"checkAncestors":false,"key":{{"agentType":"{}","attachedEntity":{{"id":null,"version":null,"entityId":{},"entityType":"{}"}}}}}}'
+)
+SERVER_URL = "/controller/sim/v2/user/machines/{}?output=json"
+
+
+@lru_cache(maxsize=4096)
+def quoteQueryValue(value) -> str:
+    """Percent-encoded query value. Metric paths repeat across applications, so encodings are cached."""
+    return quote(str(value), safe="")
+
+
+class _DirectRequest:
+    """Stands in for uplink's request builder when applying the consumer's auth to a direct request."""
+
+    def __init__(self, requestHeaders: dict):
+        self.info = {"headers": requestHeaders, "params": {}}
+
+
 @error_handler(raise_api_error)
 class AppdController(Consumer):
     """Minimal python client for the AppDynamics API"""
@@ -23,6 +54,22 @@ class AppdController(Consumer):
     def get_client_session(self):
         return self.client_session
 
+    async def sendDirect(self, method: str, pathAndQuery: str, data: str = None, requestHeaders: dict = None):
+        """
+        Send a request whose URL is already encoded through the aiohttp session, with the session headers and auth uplink
+        applies to every request. The response quacks like an uplink one.
+        """
+        request = _DirectRequest({**self.session.headers, **requestHeaders} if requestHeaders else dict(self.session.headers))
+        self.session.auth(request)
+        try:
+            response = await self.client_session.request(
+                method, URL(self.session.base_url + pathAndQuery, encoded=True), data=data, headers=request.info["headers"]
+            )
+        except Exception as e:
+            raise ApiError(e)
+        response.status_code = response.status
+        return response
+
     @params({"action": "login"})
     @get("/controller/auth")
     def login(self):
@@ -111,15 +158,14 @@ class AppdController(Consumer):
     def getAllApplicationComponentsWithNodes(self, applicationID: Path):
         """Retrieves Node Configurations"""
 
-    @params({"output": "json"})
-    @headers(
-        {
-            "Accept": "application/json, text/plain, */*",
-        }
-    )
-    @post("/controller/restui/agentManager/getAgentConfiguration")
-    def getAgentConfiguration(self, body: Body):
+    async def getAgentConfiguration(self, agentType: str, entityType: str, entityId: int):
         """Retrieves Agent Configurations"""
+        return await self.sendDirect(
+            "POST",
+            AGENT_CONFIGURATION_URL,
+            AGENT_CONFIGURATION_BODY.format(agentType, entityId, entityType),
+            {"Accept": "application/json, text/plain, */*"},
+        )
 
     @params({"output": "json"})
     @get("/controller/restui/applicationManagerUiBean/applicationConfiguration/{applicationID}")
@@ -160,19 +206,20 @@ class AppdController(Consumer):
     def getMetricTree(self, body: Body):
         """Retrieves Metrics"""
 
-    @params({"output": "json"})
-    @get("/controller/rest/applications/{applicationID}/metric-data")
-    def getMetricData(
-            self,
-            applicationID: Path,
-            metric_path: Query("metric-path"),
-            rollup: Query("rollup"),
-            time_range_type: Query("time-range-type"),
-            duration_in_mins: Query("duration-in-mins"),
-            start_time: Query("start-time"),
-            end_time: Query("end-time"),
-    ):
+    async def getMetricData(self, applicationID, metric_path, rollup, time_range_type, duration_in_mins, start_time, end_time):
         """Retrieves Metrics"""
+        return await self.sendDirect(
+            "GET",
+            METRIC_DATA_URL.format(
+                quoteQueryValue(applicationID),
+                quoteQueryValue(metric_path),
+                rollup,
+                time_range_type,
+                quoteQueryValue(duration_in_mins),
+                quoteQueryValue(start_time),
+                quoteQueryValue(end_time),
+            ),
+        )
 
     @params({"output": "json"})
     @get("/controller/rest/applications/{applicationID}/events")
@@ -190,8 +237,8 @@ class AppdController(Consumer):
 
     @params({"output": "json"})
     @get("/controller/alerting/rest/v1/applications/{applicationID}/health-rules")
-    def getHealthRules(self, applicationID: Path):
-        """Retrieves Health Rules"""
+    def getHealthRules(self, applicationID: Path, detailed: Query("detailed") = None):
+        """Retrieves Health Rules, with their full definitions where the controller supports detailed=true"""
 
     @params({"output": "json"})
     @get("/controller/alerting/rest/v1/applications/{applicationID}/health-rules/{healthRuleID}")
@@ -281,10 +328,9 @@ class AppdController(Consumer):
     def getAppServerAgentsIds(self, body: Body):
         """Retrieves app server agent summary list"""
 
-    @params({"output": "json"})
-    @get("/controller/restui/components/getNodeViewData/{applicationId}/{nodeId}")
-    def getAppServerAgentsMetadata(self, applicationId: Path, nodeId: Path):
+    async def getAppServerAgentsMetadata(self, applicationId, nodeId):
         """Retrieves app agent metadata"""
+        return await self.sendDirect("GET", NODE_METADATA_URL.format(quoteQueryValue(applicationId), quoteQueryValue(nodeId)))
 
     @params({"output": "json"})
     @headers({"Content-Type": "application/json"})
@@ -308,10 +354,9 @@ class AppdController(Consumer):
     def getServersKeys(self, body: Body):
         """Retrieves machine agents in bulk"""
 
-    @params({"output": "json"})
-    @get("/controller/sim/v2/user/machines/{machineId}")
-    def getServer(self, machineId: Path):
+    async def getServer(self, machineId):
         """Retrieves server agent info"""
+        return await self.sendDirect("GET", SERVER_URL.format(quoteQueryValue(machineId)))
 
     @params({"output": "json"})
     @headers({"Content-Type": "application/json"})
@@ -1,18 +1,112 @@
+import asyncio
+import copy
+import functools
+import hashlib
+import inspect
 import json
 import logging
 import re
 import time
+from collections import Counter, OrderedDict
 from datetime import date, datetime, timedelta
 from json import JSONDecodeError
 from math import ceil
 from typing import List
 
+from backend.api.AgentTable import AgentTable
+from backend.api.MetricAggregate import mergeMetricData
 from backend.api.Result import Result
+from backend.api.appd.AgentMetadataCache import AgentMetadataCache
+from backend.api.appd.DataCollectorProbeCache import DataCollectorProbeCache
 from backend.api.appd.AppDController import AppdController
-from backend.api.appd.AuthMethod import AuthMethod
+from backend.api.appd.AuthMethod import AuthMethod, ReauthenticatingController
 from backend.util.asyncio_utils import AsyncioUtils
+from backend.util.json_utils import jsonCodec
+from backend.util.logging_utils import REQUEST_LOGGER_NAME
 from backend.util.stdlib_utils import get_recursively
 
+requestLogger = logging.getLogger(REQUEST_LOGGER_NAME)
+
+# configuration-like responses a long-running process may keep between runs, see AppDService.resetRunState.
+# Health rules and policies are not among them, alerting is what users change in between and what the next run scores.
+SLOW_CHANGING_METHODS = {"getConfigurations", "getBtMatchRules", "getAppLevelBTConfig"}
+# small responses asked for again after they arrived, kept in the singleFlight memo. Other methods are only coalesced while in flight.
+MEMOIZED_METHODS = SLOW_CHANGING_METHODS
+# metric slices meet on the hour, the finest rollup the controller keeps for long windows
+HOUR_MILLIS = 60 * 60 * 1000
+# agent list pagination: initial/min/max page size, pages in flight and target seconds per page
+AGENT_PAGE_SIZE = 500
+AGENT_PAGE_SIZE_MIN = 100
+AGENT_PAGE_SIZE_MAX = 5000
+AGENT_PAGE_WINDOW = 4
+AGENT_PAGE_TARGET_SECONDS = 2.0
+# keys only present in full health rule definitions, not in the health rule list
+HEALTH_RULE_DETAIL_KEYS = ("affects", "evalCriterias")
+# snapshot searches per application sent before checking whether the data collector verdict is decided
+DATA_COLLECTOR_PROBE_WAVE = 5
+# data collector types the snapshot search cannot filter on, they are assumed to work
+UNPROBEABLE_DATA_COLLECTOR_TYPES = ("Session Key", "HTTP Header")
+
+
+def singleFlight(method):
+    """
+    Coalesce identical calls of a read-only AppDService method.
+    Calls are keyed by method name and canonical arguments: a call made while an identical one is in flight awaits it.
+    Should the call in flight be cancelled, its waiters are not: the first of them makes the call itself and the rest await that one.
+    Successful results of MEMOIZED_METHODS are also kept, and later calls are served from the memo; everything else,
+    like metric data, is released once the call completes. Callers get their own copy because steps mutate results,
+    except for the parts shared on purpose, see AppDService.copyResult.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (method.__name__, json.dumps(list(bound.arguments.items())[1:], sort_keys=True, default=lambda o: getattr(o, "__qualname__", str(o))))
+
+        if key in self.memo:
+            self.redundantCalls[method.__name__] += 1
+            return self.copyResult(self.memo[key][0])
+        while key in self.inFlight:
+            self.redundantCalls[method.__name__] += 1
+            waiting = self.inFlight[key]
+            waiting[1] += 1
+            try:
+                return self.copyResult(await asyncio.shield(waiting[0]))
+            except asyncio.CancelledError:
+                # only this caller's own cancellation is passed on, a cancelled leader is replaced
+                if not waiting[0].cancelled() or asyncio.current_task().cancelling():
+                    raise
+                self.redundantCalls[method.__name__] -= 1
+
+        future = asyncio.get_running_loop().create_future()
+        # [future, number of callers waiting for it]
+        waiting = [future, 0]
+        self.inFlight[key] = waiting
+        try:
+            result = await method(self, *args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # retrieve the exception so it is not reported as never retrieved when no one else was waiting
+            future.exception()
+            raise
+        finally:
+            del self.inFlight[key]
+
+        memoize = result.error is None and method.__name__ in MEMOIZED_METHODS
+        # only copied when someone else reads it, the caller may mutate result right away
+        snapshot = self.copyResult(result) if memoize or waiting[1] else result
+        future.set_result(snapshot)
+        if memoize:
+            self.memo[key] = (snapshot, time.monotonic())
+        return result
+
+    return wrapper
+
 
 class AppDService:
     controller: AppdController
@@ -21,19 +115,64 @@ class AppDService:
     def __init__(self,
                  applicationFilter: dict = None,
                  timeRangeMins: int = 1440,
-                 authMethod: AuthMethod = None):
+                 authMethod: AuthMethod = None,
+                 retainRawMetrics: bool = False,
+                 agentMetadataCacheFile: str = None,
+                 agentMetadataCacheTtlMins: int = 0,
+                 dataCollectorCacheFile: str = None,
+                 dataCollectorCacheTtlMins: int = 0,
+                 metricSliceMins: int = 0,
+                 nodeSampleSize: int = 0):
 
         self.applicationFilter = applicationFilter
         self.timeRangeMins = timeRangeMins
+        # BEFORE_NOW metric queries longer than this are split into parallel slices, 0 never splits
+        self.metricSliceMins = metricSliceMins
+        # shared by all metric requests so nested slice fetches stay within AsyncioUtils.concurrentConnections, see metricRequestSlots
+        self.metricRequests = None
+        # applications with more nodes than this get node metadata for a stratified sample only, 0 never samples
+        self.nodeSampleSize = nodeSampleSize
+        # keep raw metric payloads next to reduced metric data, for debugging
+        self.retainRawMetrics = retainRawMetrics
         self.endTime = int(round(time.time() * 1000))
         self.startTime = self.endTime - (1 * 60 * self.timeRangeMins * 1000)
         self.totalCallsProcessed = 0
+        # run-scoped request coalescing, see singleFlight
+        self.memo = {}
+        self.inFlight = {}
+        self.redundantCalls = Counter()
+        self.agentMetadataCache = AgentMetadataCache(agentMetadataCacheFile, agentMetadataCacheTtlMins * 60)
+        self.dataCollectorProbeCache = DataCollectorProbeCache(dataCollectorCacheFile, dataCollectorCacheTtlMins * 60)
+        # identical health rule definitions across applications are kept once, see internHealthRule
+        self.healthRuleBodies = {}
 
         self.authMethod = authMethod
         self.host = authMethod.host
-        self.controller = authMethod.controller
+        # OAuth tokens can expire mid-run, retry such requests after a single shared re-login
+        self.controller = ReauthenticatingController(authMethod) if authMethod.auth_method.lower() == "secret" else authMethod.controller
         self.username = authMethod.username
 
+    def resetRunState(self, cacheTtlSeconds: float = 0):
+        """
+        Prepare a long-lived service for another run: move the query window to now, reset counters and drop memoized
+        responses, except SLOW_CHANGING_METHODS responses younger than cacheTtlSeconds.
+        """
+        self.endTime = int(round(time.time() * 1000))
+        self.startTime = self.endTime - (1 * 60 * self.timeRangeMins * 1000)
+        self.totalCallsProcessed = 0
+        self.metricRequests = None
+        self.redundantCalls.clear()
+        self.healthRuleBodies.clear()
+        self.agentMetadataCache.save()
+        self.dataCollectorProbeCache.save()
+
+        now = time.monotonic()
+        self.memo = {
+            key: (snapshot, storedAt)
+            for key, (snapshot, storedAt) in self.memo.items()
+            if key[0] in SLOW_CHANGING_METHODS and now - storedAt < cacheTtlSeconds
+        }
+
     def getAuthMethod(self) -> AuthMethod:
         return self.authMethod
 
@@ -96,15 +235,16 @@ class AppDService:
         logging.debug(f"{self.host} - Controller initialization successful.")
         return Result(self.controller, None)
 
+    @singleFlight
     async def getBTs(self, applicationID: int) -> Result:
         debugString = f"Gathering bts"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getBTs(applicationID)
         return await self.getResultFromResponse(response, debugString)
 
     async def getApmApplications(self) -> Result:
         debugString = f"Gathering applications"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
 
         if self.applicationFilter is not None:
             if self.applicationFilter.get("apm") is None:
@@ -136,44 +276,49 @@ class AppDService:
 
     async def getNode(self, applicationID: int, nodeID: int) -> Result:
         debugString = f"Getting single node for Application:{applicationID} node:{nodeID}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getNode(applicationID, nodeID)
         return await self.getResultFromResponse(response, debugString)
 
+    @singleFlight
     async def getNodes(self, applicationID: int) -> Result:
         debugString = f"Gathering nodes for Application:{applicationID}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getNodes(applicationID)
         return await self.getResultFromResponse(response, debugString)
 
+    @singleFlight
     async def getTiers(self, applicationID: int) -> Result:
         debugString = f"Gathering tiers for Application:{applicationID}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getTiers(applicationID)
         return await self.getResultFromResponse(response, debugString)
 
+    @singleFlight
     async def getBtMatchRules(self, applicationID: int) -> Result:
         debugString = f"Gathering Application Business Transaction Custom Match Rules for Application:{applicationID}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getBtMatchRules(applicationID)
         return await self.getResultFromResponse(response, debugString)
 
+    @singleFlight
     async def getBackends(self, applicationID: int) -> Result:
         debugString = f"Gathering Backends for Application:{applicationID}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getBackends(applicationID)
         return await self.getResultFromResponse(response, debugString)
 
+    @singleFlight
     async def getConfigurations(self) -> Result:
         debugString = f"Gathering Controller Configurations"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getConfigurations()
         return await self.getResultFromResponse(response, debugString)
 
     # TODO: need to look at individual tiers as well, and individual agentTypes
     async def getAllCustomExitPoints(self, applicationID: int) -> Result:
         debugString = f"Gathering Custom Exit Points for Application:{applicationID}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         body = '{"agentType": "APP_AGENT", "attachedEntity": {"entityId": {applicationID}, "entityType": "APPLICATION"}}'.replace(
             "{applicationID}", str(applicationID)
         )
@@ -183,7 +328,7 @@ class AppDService:
     # TODO: need to look at individual tiers as well, and individual agent types
     async def getBackendDiscoveryConfigs(self, applicationID: int) -> Result:
         debugString = f"Gathering Backend Discovery Configs for Application:{applicationID}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         body = '{"agentType": "APP_AGENT", "attachedEntity": {"entityId": {applicationID}, "entityType": "APPLICATION"}}'.replace(
             "{applicationID}", str(applicationID)
         )
@@ -192,13 +337,13 @@ class AppDService:
 
     async def getDevModeConfig(self, applicationID: int) -> Result:
         debugString = f"Gathering Developer Mode Configuration for Application:{applicationID}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getDevModeConfig(applicationID)
         return await self.getResultFromResponse(response, debugString)
 
     async def getInstrumentationLevel(self, applicationID: int) -> Result:
         debugString = f"Gathering Instrumentation Level for Application:{applicationID}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getInstrumentationLevel(applicationID)
         return await self.getResultFromResponse(response, debugString,
                                                 isResponseJSON=False)
@@ -206,7 +351,7 @@ class AppDService:
     async def getAllNodePropertiesForCustomizedComponents(self,
                                                           applicationID: int) -> Result:
         debugString = f"Gathering All Application Components With Nodes for Application:{applicationID}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getAllApplicationComponentsWithNodes(
             applicationID)
         applicationComponentsWithNodes = await self.getResultFromResponse(
@@ -260,20 +405,13 @@ class AppDService:
     async def getAgentConfiguration(self, applicationID: int, agentType: str,
                                     entityType: str, entityId: int) -> Result:
         debugString = f"Gathering Agent Configuration for Application:{applicationID} entity:{entityId}"
-        logging.debug(f"{self.host} - {debugString}")
-        body = (
-            '{"checkAncestors":false,"key":{"agentType":"{agentType}","attachedEntity":{"id":null,"version":null,"entityId":{entityId},"entityType":"{entityType}"}}}'.replace(
-                "{agentType}", str(agentType)
-            )
-            .replace("{entityId}", str(entityId))
-            .replace("{entityType}", entityType)
-        )
-        response = await self.controller.getAgentConfiguration(body)
+        requestLogger.debug("%s - %s", self.host, debugString)
+        response = await self.controller.getAgentConfiguration(agentType, entityType, entityId)
         return await self.getResultFromResponse(response, debugString)
 
     async def getApplicationConfiguration(self, applicationID: int) -> Result:
         debugString = f"Gathering Application Call Graph Settings for Application:{applicationID}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getApplicationConfiguration(
             applicationID)
         return await self.getResultFromResponse(response, debugString,
@@ -281,7 +419,7 @@ class AppDService:
 
     async def getServiceEndpointMatchRules(self, applicationID: int) -> Result:
         debugString = f"Gathering Service Endpoint Custom Match Rules for Application:{applicationID}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getApplicationComponents(applicationID)
         response = await self.getResultFromResponse(response, debugString)
 
@@ -318,34 +456,88 @@ class AppDService:
 
         return Result((customMatchRules, defaultMatchRules), None)
 
+    @singleFlight
     async def getAppLevelBTConfig(self, applicationID: int) -> Result:
         debugString = f"Gathering Application Business Transaction Configuration Settings for Application:{applicationID}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getAppLevelBTConfig(applicationID)
         return await self.getResultFromResponse(response, debugString)
 
+    def timeSlices(self, durationInMins: int) -> list:
+        """
+        (startTime, endTime) in ms of the slices covering durationInMins minutes before endTime, oldest first. Empty if no split
+        is needed. Slices are whole hours long and meet on the hour, so no hourly rollup is split between two slices and counted twice.
+        """
+        if not self.metricSliceMins or not durationInMins or int(durationInMins) <= self.metricSliceMins:
+            return []
+        endTime = self.endTime
+        startTime = endTime - int(durationInMins) * 60 * 1000
+        sliceMillis = max(1, ceil(self.metricSliceMins / 60)) * HOUR_MILLIS
+        boundaries = range(startTime - startTime % HOUR_MILLIS + sliceMillis, endTime, sliceMillis)
+        edges = [startTime, *boundaries, endTime]
+        return list(zip(edges, edges[1:]))
+
+    def metricRequestSlots(self) -> asyncio.Semaphore:
+        """Semaphore every metric request holds while it is sent, created on first use in the running event loop."""
+        if self.metricRequests is None:
+            self.metricRequests = asyncio.Semaphore(AsyncioUtils.concurrentConnections)
+        return self.metricRequests
+
     async def getCustomMetrics(self, applicationID: int,
                                tierName: str) -> Result:
         debugString = f"Gathering Custom Metrics for Application:{applicationID}"
-        logging.debug(f"{self.host} - {debugString}")
-        body = {
-            "request": None,
-            "applicationId": applicationID,
-            "livenessStatus": "ALL",
-            "pathData": ["Application Infrastructure Performance", tierName,
-                         "Custom Metrics"],
-            "timeRangeSpecifier": {
-                "type": "BEFORE_NOW",
-                "durationInMinutes": self.timeRangeMins,
-                "endTime": None,
-                "startTime": None,
-                "timeRange": None,
-                "timeRangeAdjusted": False,
-            },
-        }
-        response = await self.controller.getMetricTree(json.dumps(body))
-        return await self.getResultFromResponse(response, debugString)
+        requestLogger.debug("%s - %s", self.host, debugString)
+
+        async def getMetricTree(timeRangeSpecifier):
+            body = {
+                "request": None,
+                "applicationId": applicationID,
+                "livenessStatus": "ALL",
+                "pathData": ["Application Infrastructure Performance", tierName,
+                             "Custom Metrics"],
+                "timeRangeSpecifier": timeRangeSpecifier,
+            }
+            async with self.metricRequestSlots():
+                response = await self.controller.getMetricTree(json.dumps(body))
+            return await self.getResultFromResponse(response, debugString)
+
+        slices = self.timeSlices(self.timeRangeMins)
+        if not slices:
+            return await getMetricTree(
+                {
+                    "type": "BETWEEN_TIMES",
+                    "durationInMinutes": None,
+                    "endTime": self.endTime,
+                    "startTime": self.startTime,
+                    "timeRange": None,
+                    "timeRangeAdjusted": False,
+                }
+            )
+
+        results = await AsyncioUtils.mapWithConcurrency(
+            lambda timeSlice: getMetricTree(
+                {
+                    "type": "BETWEEN_TIMES",
+                    "durationInMinutes": None,
+                    "endTime": timeSlice[1],
+                    "startTime": timeSlice[0],
+                    "timeRange": None,
+                    "timeRangeAdjusted": False,
+                }
+            ),
+            slices,
+        )
+        for result in results:
+            if result.error is not None:
+                return result
+        # a custom metric reported in any slice was reported in the window
+        metrics = {}
+        for result in results:
+            for metric in result.data:
+                metrics.setdefault(metric["name"], metric)
+        return Result(list(metrics.values()), None)
 
+    @singleFlight
     async def getMetricData(
             self,
             applicationID: int,
@@ -355,19 +547,49 @@ class AppDService:
             duration_in_mins: int = "",
             start_time: int = "",
             end_time: int = 1440,
+            reducer=None,
     ) -> Result:
+        """
+        reducer, if given, is applied to the parsed metric list (e.g. MetricAggregate.fromMetricData) and its return value
+        replaces the raw data. The raw data is attached as `.raw` only when retainRawMetrics is set.
+        BEFORE_NOW windows end at endTime rather than now, so a resumed run queries the window of its checkpointed data.
+        They are sent as BETWEEN_TIMES, and windows longer than metricSliceMins as parallel slices merged by mergeMetricData.
+        Slices and whole-window requests share metricRequestSlots, so nesting under gatherWithConcurrency adds no connections.
+        """
         debugString = f'Gathering Metrics for:"{metric_path}" on application:{applicationID}'
-        logging.debug(f"{self.host} - {debugString}")
-        response = await self.controller.getMetricData(
-            applicationID,
-            metric_path,
-            rollup,
-            time_range_type,
-            duration_in_mins,
-            start_time,
-            end_time,
-        )
-        return await self.getResultFromResponse(response, debugString)
+        requestLogger.debug("%s - %s", self.host, debugString)
+
+        async def getSlice(timeRangeType, durationInMins, startTime, endTime):
+            async with self.metricRequestSlots():
+                response = await self.controller.getMetricData(
+                    applicationID,
+                    metric_path,
+                    rollup,
+                    timeRangeType,
+                    durationInMins,
+                    startTime,
+                    endTime,
+                )
+            return await self.getResultFromResponse(response, debugString)
+
+        slices = []
+        if time_range_type == "BEFORE_NOW":
+            slices = self.timeSlices(duration_in_mins)
+            start_time, end_time = self.endTime - int(duration_in_mins) * 60 * 1000, self.endTime
+            time_range_type, duration_in_mins = "BETWEEN_TIMES", ""
+        if slices:
+            sliceResults = await AsyncioUtils.mapWithConcurrency(lambda timeSlice: getSlice("BETWEEN_TIMES", "", *timeSlice), slices)
+            failed = next((sliceResult for sliceResult in sliceResults if sliceResult.error is not None), None)
+            result = failed or Result(mergeMetricData([sliceResult.data for sliceResult in sliceResults], rollup), None)
+        else:
+            result = await getSlice(time_range_type, duration_in_mins, start_time, end_time)
+
+        if reducer is not None:
+            raw = result.data
+            result.data = reducer(raw)
+            if self.retainRawMetrics:
+                result.data.raw = raw
+        return result
 
     async def getApplicationEvents(
             self,
@@ -380,7 +602,7 @@ class AppDService:
             end_time: str = "",
     ) -> Result:
         debugString = f'Gathering Application Events for:"{event_types}" with severities {severities} on application:{applicationID}'
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getApplicationEvents(
             applicationID,
             ",".join(event_types),
@@ -395,37 +617,55 @@ class AppDService:
     async def getEventCounts(self, applicationID: int, entityType: str,
                              entityID: int) -> Result:
         debugString = f'Gathering Event Counts for:"{entityType}" {entityID} on application:{applicationID}'
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getEventCounts(
             applicationID, entityType, entityID,
             f"Custom_Time_Range.BETWEEN_TIMES.{self.endTime}.{self.startTime}.{self.timeRangeMins}"
         )
         return await self.getResultFromResponse(response, debugString)
 
+    @singleFlight
     async def getHealthRules(self, applicationID: int) -> Result:
+        """
+        Full health rule definitions of an application, each with its per-application "id".
+        Controllers that return definitions in the list are served in one call, others need one more call per rule.
+        The values of identical definitions are shared between applications, so callers must not modify them; the
+        HealthRulesAndAlerting steps and reports only read them. They stay plain dicts, DeepDiff against the defaults would
+        report any other type as changed.
+        """
         debugString = f"Gathering Health Rules for Application:{applicationID}"
-        logging.debug(f"{self.host} - {debugString}")
-        response = await self.controller.getHealthRules(applicationID)
+        requestLogger.debug("%s - %s", self.host, debugString)
+        response = await self.controller.getHealthRules(applicationID, detailed="true")
         healthRules = await self.getResultFromResponse(response, debugString)
 
-        healthRuleDetails = []
-        for healthRule in healthRules.data:
-            healthRuleDetails.append(
-                self.controller.getHealthRule(applicationID, healthRule["id"]))
-
-        responses = await AsyncioUtils.gatherWithConcurrency(*healthRuleDetails)
+        if all(all(key in healthRule for key in HEALTH_RULE_DETAIL_KEYS) for healthRule in healthRules.data):
+            return Result([Result(self.internHealthRule(healthRule), None) for healthRule in healthRules.data], None)
 
-        healthRulesData = []
-        for response, healthRule in zip(responses, healthRules.data):
+        async def getHealthRuleDetail(healthRule):
+            response = await self.controller.getHealthRule(applicationID, healthRule["id"])
             debugString = f"Gathering Health Rule Data for Application:{applicationID} HealthRule:'{healthRule['name']}'"
-            healthRulesData.append(
-                await self.getResultFromResponse(response, debugString))
+            result = await self.getResultFromResponse(response, debugString)
+            if result.error is None:
+                result.data = self.internHealthRule(result.data)
+            return result
+
+        return Result(await AsyncioUtils.mapWithConcurrency(getHealthRuleDetail, healthRules.data), None)
 
-        return Result(healthRulesData, None)
+    def copyResult(self, result: Result) -> Result:
+        """Deep copy of result that keeps referencing the shared health rule definitions instead of copying them."""
+        return copy.deepcopy(result, {id(value): value for body in self.healthRuleBodies.values() for value in body.values()})
 
+    def internHealthRule(self, healthRule: dict) -> dict:
+        """The health rule as a small dict of its own "id" and the values of the one shared copy of its definition."""
+        body = {key: value for key, value in healthRule.items() if key != "id"}
+        digest = hashlib.sha256(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()
+        body = self.healthRuleBodies.setdefault(digest, body)
+        return {"id": healthRule["id"], **body} if "id" in healthRule else dict(body)
+
+    @singleFlight
     async def getPolicies(self, applicationID: int) -> Result:
         debugString = f"Gathering Policies for Application:{applicationID}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getPolicies(applicationID)
         return await self.getResultFromResponse(response, debugString)
 
@@ -438,7 +678,7 @@ class AppDService:
             data_collector_value: str = "",
     ) -> Result:
         debugString = f"Gathering Snapshots for Application:{applicationID}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         body = {
             "firstInChain": False,
             "maxRows": maximum_results,
@@ -470,9 +710,15 @@ class AppDService:
 
         return await self.getResultFromResponse(response, debugString)
 
-    async def getDataCollectorUsage(self, applicationID: int) -> Result:
+    async def getDataCollectorUsage(self, applicationID: int, enoughConfirmed: int = None, probeSnapshots: bool = True) -> Result:
+        """
+        Data collector fields of an application and which of them show up in snapshots.
+        Every field needs a snapshot search of its own, so fields recently seen in a snapshot are taken from the probe cache,
+        and searching stops once enoughConfirmed fields, and as many analytics enabled ones, are confirmed.
+        Without probeSnapshots only the probe cache is consulted.
+        """
         debugString = f"Gathering Data Collectors for Application:{applicationID}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getDataCollectors(applicationID)
 
         dataCollectors = await self.getResultFromResponse(response, debugString)
@@ -517,34 +763,41 @@ class AppDService:
                     )
                 )
 
-        snapshotsContainingDataCollectorFields = []
-        distinctDataCollectors = set()
-        for dataCollectorField in dataCollectorFields:
-            if (applicationID, dataCollectorField[1],
-                dataCollectorField[0]) not in distinctDataCollectors:
-                snapshotsContainingDataCollectorFields.append(
-                    self.getSnapshotsWithDataCollector(
-                        applicationID=applicationID,
-                        data_collector_name=dataCollectorField[1],
-                        data_collector_type=dataCollectorField[0],
-                    )
-                )
-            distinctDataCollectors.add(
-                (applicationID, dataCollectorField[1], dataCollectorField[0]))
-        snapshotResults = await AsyncioUtils.gatherWithConcurrency(
-            *snapshotsContainingDataCollectorFields)
-
-        dataCollectorFieldsWithSnapshots = []
-        for collector, snapshotResult in zip(dataCollectorFields,
-                                             snapshotResults):
-            if snapshotResult.error is None and len(
-                    snapshotResult.data["requestSegmentDataListItems"]) == 1:
-                dataCollectorFieldsWithSnapshots.append(collector)
+        analyticsFields = {(field[0], field[1]) for field in dataCollectorFields if field[2]}
+        confirmed = set()
+        toProbe = []
+        # a field configured in several collectors is probed once
+        for key in OrderedDict.fromkeys((field[0], field[1]) for field in dataCollectorFields):
             # This API does not work for either session keys or headers, as far as I know there is no way to get this info without inspecting ALL snapshots (won't do).
             # The API comes from the Transaction Snapshot filtering UI. No UI option for session keys or headers exists there.
             # For now, let's just assume that any session key or header configured data collector is working... If anyone has a better idea I'm all ears.
-            elif collector[0] == "Session Key" or collector[0] == "HTTP Header":
-                dataCollectorFieldsWithSnapshots.append(collector)
+            if key[0] in UNPROBEABLE_DATA_COLLECTOR_TYPES or self.dataCollectorProbeCache.isConfirmed(applicationID, *key):
+                confirmed.add(key)
+            else:
+                toProbe.append(key)
+        # analytics enabled fields count towards both metrics, probe them first
+        toProbe.sort(key=lambda key: key not in analyticsFields)
+
+        def decided():
+            return enoughConfirmed is not None and len(confirmed) >= enoughConfirmed and len(confirmed & analyticsFields) >= enoughConfirmed
+
+        async def probe(key):
+            return await self.getSnapshotsWithDataCollector(
+                applicationID=applicationID,
+                data_collector_name=key[1],
+                data_collector_type=key[0],
+            )
+
+        probed = 0
+        while probeSnapshots and probed < len(toProbe) and not decided():
+            wave = toProbe[probed : probed + DATA_COLLECTOR_PROBE_WAVE]
+            for key, snapshotResult in zip(wave, await AsyncioUtils.mapWithConcurrency(probe, wave)):
+                if snapshotResult.error is None and len(snapshotResult.data["requestSegmentDataListItems"]) == 1:
+                    confirmed.add(key)
+                    self.dataCollectorProbeCache.confirm(applicationID, *key)
+            probed += len(wave)
+
+        dataCollectorFieldsWithSnapshots = [field for field in dataCollectorFields if (field[0], field[1]) in confirmed]
 
         result = {
             "allDataCollectors": dataCollectorFields,
@@ -553,22 +806,29 @@ class AppDService:
                                                  in
                                                  dataCollectorFieldsWithSnapshots
                                                  if dataCollector[2]],
+            # fields left unprobed because the verdict was already decided, the counts of present fields are lower bounds then
+            "unprobedDataCollectors": len(toProbe) - probed,
+            # False if probing was skipped before the verdict was decided
+            "snapshotsAssessed": probed == len(toProbe) or decided(),
         }
         return Result(result, None)
 
     async def getAnalyticsEnabledStatusForAllApplications(self) -> Result:
         debugString = f"Gathering Analytics Enabled Status for all Applications"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getAnalyticsEnabledStatusForAllApplications()
         return await self.getResultFromResponse(response, debugString)
 
-    async def getDashboards(self) -> Result:
+    async def getDashboards(self, withDetails: bool = True) -> Result:
+        """Exported dashboards with their widgets. Without details only the metadata of every dashboard, a single call."""
 
         debugString = f"Gathering Dashboards"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getAllDashboardsMetadata()
         allDashboardsMetadata = await self.getResultFromResponse(response,
                                                                  debugString)
+        if not withDetails:
+            return allDashboardsMetadata
 
         dashboards = []
         batch_size = AsyncioUtils.concurrentConnections
@@ -617,7 +877,7 @@ class AppDService:
 
     async def getUserPermissions(self, username: str) -> Result:
         debugString = f"Gathering Permission set for user: {username}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.getAuthMethod().validatePermissions()
 
         # response = await self.controller.getUsers()
@@ -636,7 +896,7 @@ class AppDService:
 
     async def getAccountUsageSummary(self) -> Result:
         debugString = f"Gathering Account Usage Summary"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         body = {
             "type": "BEFORE_NOW",
             "durationInMinutes": self.timeRangeMins,
@@ -651,7 +911,7 @@ class AppDService:
 
     async def getEumLicenseUsage(self) -> Result:
         debugString = f"Gathering Account Usage Summary"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         body = {
             "type": "BEFORE_NOW",
             "durationInMinutes": self.timeRangeMins,
@@ -664,111 +924,127 @@ class AppDService:
         return await self.getResultFromResponse(response, debugString)
 
     async def getAppAgentMetadata(self, applicationId: int,
-                                  agentIDs: list[str]) -> Result:
+                                  agentIDs: list[str],
+                                  agentVersions: list[str] = None) -> Result:
+        """
+        Node view metadata of agentIDs, in order. Nodes whose id and agent version were fetched within the agent metadata cache TTL are not requested,
+        the rest are requested one by one.
+        """
         debugString = f"Gathering App Agent Metadata"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
 
         if len(agentIDs) == 0:
             return Result([], None)
 
-        futures = [
-            self.controller.getAppServerAgentsMetadata(applicationId, agentId)
-            for agentId in agentIDs]
-        response = await AsyncioUtils.gatherWithConcurrency(*futures)
-        results = [
-            (await self.getResultFromResponse(response, debugString)).data for
-            response in response]
-        return Result(results, None)
+        agentVersions = agentVersions or [None] * len(agentIDs)
+        results = [None] * len(agentIDs)
+        missing = []
+        for idx, (agentId, agentVersion) in enumerate(zip(agentIDs, agentVersions)):
+            cached = self.agentMetadataCache.get(agentId, agentVersion) if agentVersion else None
+            if cached is None:
+                missing.append(idx)
+            else:
+                results[idx] = cached
 
-    async def getAppServerAgents(self) -> Result:
-        debugString = f"Gathering App Server Agents Agents"
-        logging.debug(f"{self.host} - {debugString}")
-        body = {
-            "requestFilter": {
-                "queryParams": {"applicationAssociationType": "ALL"},
-                "filters": []},
-            "resultColumns": [],
-            "offset": 0,
-            "limit": -1,
-            "searchFilters": [],
-            "columnSorts": [{"column": "HOST_NAME", "direction": "ASC"}],
-            "timeRangeStart": self.startTime,
-            "timeRangeEnd": self.endTime,
-        }
-        response = await self.controller.getAppServerAgents(json.dumps(body))
-        result = await self.getResultFromResponse(response, debugString)
-        if result.error is not None:
-            return result
+        fetched = await self._getAppAgentMetadataUncached(applicationId, [agentIDs[idx] for idx in missing], debugString)
+        for idx, metadata in zip(missing, fetched):
+            results[idx] = metadata
+            if agentVersions[idx] and metadata:
+                self.agentMetadataCache.put(agentIDs[idx], agentVersions[idx], metadata)
 
-        agentIds = [agent["applicationComponentNodeId"] for agent in
-                    result.data["data"]]
+        requestLogger.debug("%s - %s: %d of %d nodes served from cache", self.host, debugString, len(agentIDs) - len(missing), len(agentIDs))
+        return Result(results, None)
 
-        debugString = f"Gathering App Server Agents Agents List"
-        agentFutures = []
-        batch_size = 50
-        for i in range(0, len(agentIds), batch_size):
-            chunk = agentIds[i: i + batch_size]
+    async def _getAppAgentMetadataUncached(self, applicationId: int, agentIDs: list, debugString: str) -> list:
+        async def getSingle(agentId):
+            response = await self.controller.getAppServerAgentsMetadata(applicationId, agentId)
+            return (await self.getResultFromResponse(response, debugString)).data
+
+        return await AsyncioUtils.mapWithConcurrency(getSingle, agentIDs)
+
+    async def getAgentIdsPaginated(self, listAgents, idField: str, idColumn: str, debugString: str) -> Result:
+        """
+        Page through an agent list endpoint with offset/limit instead of one `limit: -1` request.
+        A window of pages is fetched concurrently, and the page size grows or shrinks to keep each page near AGENT_PAGE_TARGET_SECONDS.
+        Pages are sorted by host name and then by idColumn, as many agents share a host and only a unique order pages consistently.
+        Should the controller reject the idColumn sort, paging falls back to the host name alone.
+        Paging stops at the first page that is not full or adds no new id, the latter meaning the endpoint ignores offset.
+        """
+        pageSize = AGENT_PAGE_SIZE
+        offset = 0
+        agentIds = []
+        seenIds = set()
+        window = max(1, min(AsyncioUtils.concurrentConnections, AGENT_PAGE_WINDOW))
+        columnSorts = [{"column": "HOST_NAME", "direction": "ASC"}, {"column": idColumn, "direction": "ASC"}]
+
+        async def getPage(pageOffset, limit):
             body = {
-                "requestFilter": chunk,
-                "resultColumns": [
-                    "HOST_NAME",
-                    "AGENT_VERSION",
-                    "NODE_NAME",
-                    "COMPONENT_NAME",
-                    "APPLICATION_NAME",
-                    "DISABLED",
-                    "ALL_MONITORING_DISABLED",
-                ],
-                "offset": 0,
-                "limit": -1,
+                "requestFilter": {
+                    "queryParams": {"applicationAssociationType": "ALL"},
+                    "filters": []},
+                "resultColumns": [],
+                "offset": pageOffset,
+                "limit": limit,
                 "searchFilters": [],
-                "columnSorts": [{"column": "HOST_NAME", "direction": "ASC"}],
+                "columnSorts": columnSorts,
                 "timeRangeStart": self.startTime,
                 "timeRangeEnd": self.endTime,
             }
-            agentFutures.append(
-                self.controller.getAppServerAgentsIds(json.dumps(body)))
-
-        response = await AsyncioUtils.gatherWithConcurrency(*agentFutures)
-        results = [
-            (await self.getResultFromResponse(response, debugString)).data[
-                "data"] for response in response]
-        out = []
-        for result in results:
-            out.extend(result)
-        return Result(out, None)
-
-    async def getMachineAgents(self) -> Result:
-        debugString = f"Gathering App Server Agents Agents"
-        logging.debug(f"{self.host} - {debugString}")
-        body = {
-            "requestFilter": {
-                "queryParams": {"applicationAssociationType": "ALL"},
-                "filters": []},
-            "resultColumns": [],
-            "offset": 0,
-            "limit": -1,
-            "searchFilters": [],
-            "columnSorts": [{"column": "HOST_NAME", "direction": "ASC"}],
-            "timeRangeStart": self.startTime,
-            "timeRangeEnd": self.endTime,
-        }
-        response = await self.controller.getMachineAgents(json.dumps(body))
-        result = await self.getResultFromResponse(response, debugString)
-        if result.error is not None:
-            return result
-
-        agentIds = [agent["machineId"] for agent in result.data["data"]]
-
-        debugString = f"Gathering Machine Agents Agents List"
-        agentFutures = []
-        batch_size = 50
-        for i in range(0, len(agentIds), batch_size):
-            chunk = agentIds[i: i + batch_size]
+            start = time.monotonic()
+            response = await listAgents(json.dumps(body))
+            result = await self.getResultFromResponse(response, f"{debugString} offset:{pageOffset} limit:{limit}")
+            return result, time.monotonic() - start
+
+        while True:
+            offsets = [offset + i * pageSize for i in range(window)]
+            offset += window * pageSize
+            pages = await asyncio.gather(*[getPage(pageOffset, pageSize) for pageOffset in offsets])
+
+            if offsets[0] == 0 and len(columnSorts) > 1 and any(result.error is not None for result, _ in pages):
+                logging.warning(f"{self.host} - {debugString} failed sorted by {idColumn}, paging sorted by host name only")
+                columnSorts = columnSorts[:1]
+                offset = 0
+                continue
+
+            lastPage = False
+            for result, _ in pages:
+                if result.error is not None:
+                    return result
+                agents = result.data["data"]
+                if len(agents) > pageSize:
+                    # endpoint ignored offset/limit and returned everything
+                    agentIds = list(dict.fromkeys(agent[idField] for agent in agents))
+                    lastPage = True
+                    break
+                newIds = [agentId for agentId in dict.fromkeys(agent[idField] for agent in agents) if agentId not in seenIds]
+                if agents and not newIds:
+                    logging.warning(f"{self.host} - {debugString} returned a page of ids it already returned, the endpoint ignores offset. Stopping at {len(agentIds)} ids.")
+                    lastPage = True
+                    break
+                seenIds.update(newIds)
+                agentIds.extend(newIds)
+                if len(agents) < pageSize:
+                    lastPage = True
+                    break
+            if lastPage:
+                break
+
+            slowest = max(elapsed for _, elapsed in pages)
+            if slowest < AGENT_PAGE_TARGET_SECONDS / 2:
+                pageSize = min(pageSize * 2, AGENT_PAGE_SIZE_MAX)
+            elif slowest > AGENT_PAGE_TARGET_SECONDS:
+                pageSize = max(pageSize // 2, AGENT_PAGE_SIZE_MIN)
+            requestLogger.debug("%s - %s fetched %d ids, next page size %d", self.host, debugString, len(agentIds), pageSize)
+
+        return Result(agentIds, None)
+
+    async def getAgentDetails(self, listAgentsByIds, agentIds: list, resultColumns: List[str], debugString: str) -> Result:
+        """Fetch agent details 50 ids per request and collect them into an AgentTable as chunks complete."""
+
+        async def getChunk(chunk):
             body = {
                 "requestFilter": chunk,
-                "resultColumns": ["AGENT_VERSION", "APPLICATION_NAMES",
-                                  "ENABLED"],
+                "resultColumns": resultColumns,
                 "offset": 0,
                 "limit": -1,
                 "searchFilters": [],
@@ -776,34 +1052,69 @@ class AppDService:
                 "timeRangeStart": self.startTime,
                 "timeRangeEnd": self.endTime,
             }
+            response = await listAgentsByIds(json.dumps(body))
+            return (await self.getResultFromResponse(response, debugString)).data["data"]
+
+        batch_size = 50
+        chunks = [agentIds[i: i + batch_size] for i in range(0, len(agentIds), batch_size)]
+        agents = AgentTable()
+        for chunk in await AsyncioUtils.mapWithConcurrency(getChunk, chunks):
+            agents.extend(chunk)
+        return Result(agents, None)
 
-            agentFutures.append(
-                self.controller.getMachineAgentsIds(json.dumps(body)))
+    async def getAppServerAgents(self) -> Result:
+        debugString = f"Gathering App Server Agents Agents"
+        requestLogger.debug("%s - %s", self.host, debugString)
+        result = await self.getAgentIdsPaginated(self.controller.getAppServerAgents, "applicationComponentNodeId", "APPLICATION_COMPONENT_NODE_ID", debugString)
+        if result.error is not None:
+            return result
 
-        response = await AsyncioUtils.gatherWithConcurrency(*agentFutures)
-        results = [
-            (await self.getResultFromResponse(response, debugString)).data[
-                "data"] for response in response]
-        out = []
-        for result in results:
-            out.extend(result)
-        return Result(out, None)
+        debugString = f"Gathering App Server Agents Agents List"
+        return await self.getAgentDetails(
+            self.controller.getAppServerAgentsIds,
+            result.data,
+            [
+                "HOST_NAME",
+                "AGENT_VERSION",
+                "NODE_NAME",
+                "COMPONENT_NAME",
+                "APPLICATION_NAME",
+                "DISABLED",
+                "ALL_MONITORING_DISABLED",
+            ],
+            debugString,
+        )
+
+    async def getMachineAgents(self) -> Result:
+        debugString = f"Gathering App Server Agents Agents"
+        requestLogger.debug("%s - %s", self.host, debugString)
+        result = await self.getAgentIdsPaginated(self.controller.getMachineAgents, "machineId", "MACHINE_ID", debugString)
+        if result.error is not None:
+            return result
+
+        debugString = f"Gathering Machine Agents Agents List"
+        return await self.getAgentDetails(
+            self.controller.getMachineAgentsIds,
+            result.data,
+            ["AGENT_VERSION", "APPLICATION_NAMES", "ENABLED"],
+            debugString,
+        )
 
     async def getDBAgents(self) -> Result:
         debugString = f"Gathering DB Agents"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getDBAgents()
         return await self.getResultFromResponse(response, debugString)
 
     async def getAnalyticsAgents(self) -> Result:
         debugString = f"Gathering Analytics Agents"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getAnalyticsAgents()
         return await self.getResultFromResponse(response, debugString)
 
     async def getServers(self) -> Result:
         debugString = f"Gathering Server Keys"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         body = {
             "filter": {
                 "appIds": [],
@@ -838,46 +1149,15 @@ class AppDService:
                         logging.warning("Expected a dictionary, but found type: {}".format(type(serverKey)))
 
 
-        serverFutures = [self.controller.getServer(serverId) for serverId in
-                         machineIds]
-        serversResponses = await AsyncioUtils.gatherWithConcurrency(
-            *serverFutures)
-
-        serverAvailabilityFutures = []
-        for machineId in machineIds:
-            body = {
-                "timeRange": f"Custom_Time_Range.BETWEEN_TIMES.{self.endTime}.{self.startTime}.{self.timeRangeMins}",
-                "metricNames": ["Hardware Resources|Machine|Availability"],
-                "rollups": [1],
-                "ids": [machineId],
-                "baselineId": None,
-            }
-            serverAvailabilityFutures.append(
-                self.controller.getServerAvailability(json.dumps(body)))
-        serversAvailabilityResponses = await AsyncioUtils.gatherWithConcurrency(
-            *serverAvailabilityFutures)
+        serverAvailability = await self.getServerAvailability(machineIds)
 
         debugString = f"Gathering Machine Agents Agents List"
-        serversResults = [
-            (await self.getResultFromResponse(serversResponse, debugString)) for
-            serversResponse in serversResponses]
-        serversAvailabilityResults = [
-            (await self.getResultFromResponse(serversAvailabilityResponse,
-                                              debugString))
-            for serversAvailabilityResponse in serversAvailabilityResponses
-        ]
 
-        machineIdMap = {}
-        for serverResult, serverAvailabilityResult in zip(serversResults,
-                                                          serversAvailabilityResults):
-            machine = serverResult.data
-            value = get_recursively(serverAvailabilityResult.data["data"],
-                                    "value")
-            if value:
-                availability = next(iter(value))
-                machine["availability"] = availability
-            else:
-                machine["availability"] = 0
+        async def getServerDetails(machineId):
+            # compute derived fields as each response arrives instead of holding every response until all are done
+            response = await self.controller.getServer(machineId)
+            machine = (await self.getResultFromResponse(response, debugString)).data
+            machine["availability"] = serverAvailability.get(machineId, 0)
 
             physicalCores = 0
             virtualCores = 0
@@ -886,14 +1166,41 @@ class AppDService:
                 virtualCores += cpu.get("logicalCount", 0)
             machine["physicalCores"] = physicalCores
             machine["virtualCores"] = virtualCores
+            return machine
 
+        machineIdMap = {}
+        for machine in await AsyncioUtils.mapWithConcurrency(getServerDetails, machineIds):
             machineIdMap[machine["hostId"]] = machine
 
         return Result(machineIdMap, None)
 
+    async def getServerAvailability(self, machineIds: List[int]) -> dict:
+        """
+        Machine availability keyed by machine id, one request per machine.
+        Whether a multi-id request answers per machine was never verified against a controller, so ids are not batched.
+        """
+        debugString = f"Gathering Server Availability"
+        requestLogger.debug("%s - %s", self.host, debugString)
+
+        async def getSingle(machineId):
+            body = {
+                "timeRange": f"Custom_Time_Range.BETWEEN_TIMES.{self.endTime}.{self.startTime}.{self.timeRangeMins}",
+                "metricNames": ["Hardware Resources|Machine|Availability"],
+                "rollups": [1],
+                "ids": [machineId],
+                "baselineId": None,
+            }
+            response = await self.controller.getServerAvailability(json.dumps(body))
+            result = await self.getResultFromResponse(response, debugString)
+            data = (result.data or {}).get("data")
+            value = get_recursively(data, "value") if isinstance(data, dict) else None
+            return next(iter(value)) if value else 0
+
+        return dict(zip(machineIds, await AsyncioUtils.mapWithConcurrency(getSingle, machineIds)))
+
     async def getEumApplications(self) -> Result:
         debugString = f"Gathering BRUM Applications"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
 
         if self.applicationFilter is not None:
             if self.applicationFilter.get("brum") is None:
@@ -919,7 +1226,7 @@ class AppDService:
 
     async def getEumPageListViewData(self, applicationId: int) -> Result:
         debugString = f"Gathering EUM Page List View Data for Application {applicationId}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         body = {
             "applicationId": applicationId,
             "addId": None,
@@ -932,7 +1239,7 @@ class AppDService:
 
     async def getEumNetworkRequestList(self, applicationId: int) -> Result:
         debugString = f"Gathering EUM Page List View Data for Application {applicationId}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         body = {
             "requestFilter": {"applicationId": applicationId,
                               "fetchSyntheticData": False},
@@ -952,26 +1259,26 @@ class AppDService:
 
     async def getPagesAndFramesConfig(self, applicationId: int) -> Result:
         debugString = f"Gathering Pages and Frames Config for Application {applicationId}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getPagesAndFramesConfig(applicationId)
         return await self.getResultFromResponse(response, debugString)
 
     async def getAJAXConfig(self, applicationId: int) -> Result:
         debugString = f"Gathering AJAX Config for Application {applicationId}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getAJAXConfig(applicationId)
         return await self.getResultFromResponse(response, debugString)
 
     async def getVirtualPagesConfig(self, applicationId: int) -> Result:
         debugString = f"Gathering Virtual Pages Config for Application {applicationId}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getVirtualPagesConfig(applicationId)
         return await self.getResultFromResponse(response, debugString)
 
     async def getBrowserSnapshotsWithServerSnapshots(self,
                                                      applicationId: int) -> Result:
         debugString = f"Gathering Browser Snapshots for Application {applicationId}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         body = {
             "applicationId": applicationId,
             "timeRangeString": f"Custom_Time_Range.BETWEEN_TIMES.{self.endTime}.{self.startTime}.{self.timeRangeMins}",
@@ -1009,7 +1316,7 @@ class AppDService:
 
     async def getMRUMApplications(self) -> Result:
         debugString = f"Gathering MRUM Applications"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
 
         if self.applicationFilter is not None:
             if self.applicationFilter.get("mrum") is None:
@@ -1044,14 +1351,14 @@ class AppDService:
 
     async def getMRUMNetworkRequestConfig(self, applicationId: int) -> Result:
         debugString = f"Gathering MRUM Network Request Config for Application {applicationId}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getMRUMNetworkRequestConfig(
             applicationId)
         return await self.getResultFromResponse(response, debugString)
 
     async def getNetworkRequestLimit(self, applicationId: int) -> Result:
         debugString = f"Gathering MRUM Network Request Limit for Application {applicationId}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getNetworkRequestLimit(applicationId)
         return await self.getResultFromResponse(response, debugString)
 
@@ -1059,7 +1366,7 @@ class AppDService:
                                                     mobileApplicationId: int,
                                                     platform: str) -> Result:
         debugString = f"Gathering Mobile Snapshots for Application {applicationId}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         body = {
             "applicationId": applicationId,
             "timeRangeString": f"Custom_Time_Range|BETWEEN_TIMES|{self.endTime}|{self.startTime}|{self.timeRangeMins}",
@@ -1072,14 +1379,14 @@ class AppDService:
 
     async def getSyntheticJobs(self, applicationId: int):
         debugString = f"Gathering Mobile Snapshots for Application {applicationId}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getSyntheticJobs(applicationId)
         return await self.getResultFromResponse(response, debugString)
 
     async def getSyntheticBillableTime(self, applicationId: int,
                                        scheduleIds: List[str]) -> Result:
         debugString = f"Gathering Synthetic Billable Time for Application {applicationId}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         body = {
             "scheduleIds": scheduleIds,
             "appId": applicationId,
@@ -1094,7 +1401,7 @@ class AppDService:
                                                   jobsJson: List[
                                                       dict]) -> Result:
         debugString = f"Gathering Synthetic Private Agent Utilization for Application {applicationId}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         response = await self.controller.getSyntheticPrivateAgentUtilization(
             applicationId, json.dumps(jobsJson))
         return await self.getResultFromResponse(response, debugString)
@@ -1102,7 +1409,7 @@ class AppDService:
     async def getSyntheticSessionData(self, applicationId: int,
                                       jobsJson: List[dict]) -> Result:
         debugString = f"Gathering Synthetic Session Data for Application {applicationId}"
-        logging.debug(f"{self.host} - {debugString}")
+        requestLogger.debug("%s - %s", self.host, debugString)
         # get the last 24 hours in milliseconds
         lastMonth = self.endTime - (1 * 60 * 60 * 24 * 30 * 1000)
         monthStart = datetime.timestamp(
@@ -1131,31 +1438,35 @@ class AppDService:
 
     async def close(self):
         logging.debug(f"{self.host} - Closing connection")
+        self.agentMetadataCache.save()
+        self.dataCollectorProbeCache.save()
         await self.authMethod.cleanup()
 
     async def getResultFromResponse(self, response, debugString,
                                     isResponseJSON=True,
                                     isResponseList=True) -> Result:
-        body = (await response.content.read()).decode("ISO-8859-1")
+        # JSON is parsed straight from the bytes, only bodies shown as text are decoded
+        body = await response.content.read()
         self.totalCallsProcessed += 1
 
         if response.status_code >= 400:
-            msg = f"{self.host} - {debugString} failed with code:{response.status_code} body:{body}"
-            try:
-                responseJSON = json.loads(body)
-                if "message" in responseJSON:
-                    msg = f"{self.host} - {debugString} failed with code:{response.status_code} body:{responseJSON['message']}"
-            except JSONDecodeError:
-                pass
-            logging.debug(msg)
+            if requestLogger.isEnabledFor(logging.DEBUG):
+                detail = body.decode("ISO-8859-1")
+                try:
+                    responseJSON = jsonCodec.loads(body)
+                    if "message" in responseJSON:
+                        detail = responseJSON["message"]
+                except JSONDecodeError:
+                    pass
+                requestLogger.debug("%s - %s failed with code:%d body:%s", self.host, debugString, response.status_code, detail)
             return Result([] if isResponseList else {},
                           Result.Error(f"{response.status_code}"))
         if isResponseJSON:
             try:
-                return Result(json.loads(body), None)
+                return Result(jsonCodec.loads(body), None)
             except JSONDecodeError:
-                msg = f"{self.host} - {debugString} failed to parse json from body. Returned code:{response.status_code} body:{body}"
+                msg = f"{self.host} - {debugString} failed to parse json from body. Returned code:{response.status_code} body:{body.decode('ISO-8859-1')}"
                 logging.error(msg)
                 return Result([] if isResponseList else {}, Result.Error(msg))
         else:
-            return Result(body, None)
+            return Result(body.decode("ISO-8859-1"), None)
@@ -1,8 +1,11 @@
 import asyncio
+import functools
+import inspect
 import ipaddress
 import json
 import logging
 import re
+import time
 
 import aiohttp
 from uplink import AiohttpClient
@@ -10,9 +13,18 @@ from uplink.auth import BasicAuth, BearerToken
 
 from backend.api.Result import Result
 from backend.api.appd.AppDController import AppdController
+from backend.api.appd.TokenCache import TokenCache
 from backend.util.asyncio_utils import AsyncioUtils
 from backend.util.logging_utils import initLogging
 
+# access tokens are replaced this long before they expire, or half way through their lifetime if that is shorter
+TOKEN_REFRESH_MARGIN_SECONDS = 60
+# never refresh proactively more often than this, whatever lifetime the controller hands out
+TOKEN_REFRESH_MIN_SECONDS = 5
+# wait before retrying a failed proactive refresh, doubled after every further failure up to the maximum
+TOKEN_REFRESH_RETRY_SECONDS = 15
+TOKEN_REFRESH_RETRY_MAX_SECONDS = 300
+
 
 class AuthMethod():
 
@@ -28,7 +40,8 @@ class AuthMethod():
                  password=None,
                  useProxy=True,
                  verifySsl=True,
-                 controller: AppdController = None):
+                 controller: AppdController = None,
+                 tokenCacheDir: str = None):
 
         self.auth_method = auth_method
         self.host = host
@@ -40,6 +53,16 @@ class AuthMethod():
         self.useProxy = useProxy
         self.verifySSL = verifySsl
         self.session = None
+        self.tokenCache = None
+        if tokenCacheDir is not None and auth_method.lower() == "secret":
+            if TokenCache.isSupported():
+                self.tokenCache = TokenCache(tokenCacheDir, host, account, username, password)
+            else:
+                logging.debug(f"{host} - Access tokens are not cached on disk, the cryptography package is not installed")
+        self.tokenExpiresAt = None
+        self.tokenLifetime = None
+        self._refreshTask = None
+        self._reloginLock = asyncio.Lock()
         connection_url = (f'{"https" if ssl else "http"}://{host}:{port}')
 
 
@@ -134,6 +157,34 @@ class AuthMethod():
             return await self._validateBasicAuthPermissions(self.username)
 
     async def loginClientSecretOauthAuthentication(self):
+        cached = None
+        if self.tokenCache is not None:
+            cached = await asyncio.to_thread(self.tokenCache.load, TOKEN_REFRESH_MARGIN_SECONDS)
+
+        if cached is not None:
+            token, expiresAt = cached
+            logging.info(f"{self.host} - Using cached access token, valid for another {int(expiresAt - time.time())}s")
+            self._applyToken(token, expiresAt)
+        else:
+            tokenResult = await self._requestAccessToken()
+            if tokenResult.error is not None:
+                return tokenResult
+
+        result = await self._validateAPIClientPermissions(self.username)
+        if result.error is not None and cached is not None:
+            # the cached token may have been revoked, try once more with a fresh one
+            logging.info(f"{self.host} - Cached access token rejected, requesting a new one")
+            await asyncio.to_thread(self.tokenCache.invalidate)
+            tokenResult = await self._requestAccessToken()
+            if tokenResult.error is not None:
+                return tokenResult
+            result = await self._validateAPIClientPermissions(self.username)
+
+        if result.error is None:
+            self._scheduleRefresh()
+        return result
+
+    async def _requestAccessToken(self) -> Result:
         payload = {
             "grant_type": "client_credentials",
             "client_id": f"{self.username}@{self.account}",
@@ -159,11 +210,66 @@ class AuthMethod():
         token_data = await response.json()
         token = token_data["access_token"]
         expires_in = token_data.get("expires_in", 300)
+        expiresAt = time.time() + expires_in
+        self._applyToken(token, expiresAt)
+        if self.tokenCache is not None:
+            await asyncio.to_thread(self.tokenCache.store, token, expiresAt)
+        return Result(token, None)
+
+    def _applyToken(self, token: str, expiresAt: float):
+        # requests already sent keep the previous token, which is still valid until it expires
         self.controller.session.headers["Authorization"] = (f"Bearer"
                                                             f" {token}")
         self.controller.session.auth = BearerToken(token)
-
-        return await self._validateAPIClientPermissions(self.username)
+        self.tokenExpiresAt = expiresAt
+        self.tokenLifetime = expiresAt - time.time()
+
+    def _refreshMargin(self) -> float:
+        return min(TOKEN_REFRESH_MARGIN_SECONDS, self.tokenLifetime / 2)
+
+    def currentAuthorization(self):
+        return self.controller.session.headers.get("Authorization")
+
+    def _scheduleRefresh(self):
+        if self._refreshTask is not None:
+            self._refreshTask.cancel()
+        self._refreshTask = asyncio.create_task(self._refreshBeforeExpiry())
+
+    async def _refreshBeforeExpiry(self):
+        """Replace the access token in the background shortly before it expires, requests keep flowing meanwhile."""
+        retrySeconds = TOKEN_REFRESH_RETRY_SECONDS
+        while True:
+            await asyncio.sleep(max(TOKEN_REFRESH_MIN_SECONDS, self.tokenExpiresAt - self._refreshMargin() - time.time()))
+            async with self._reloginLock:
+                if self.tokenExpiresAt - time.time() > self._refreshMargin():
+                    # already replaced after a 401
+                    continue
+                logging.debug(f"{self.host} - Refreshing access token before it expires")
+                result = await self._requestAccessToken()
+            if result.error is None:
+                retrySeconds = TOKEN_REFRESH_RETRY_SECONDS
+                continue
+            logging.warning(f"{self.host} - Proactive access token refresh failed, retrying in {retrySeconds}s")
+            await asyncio.sleep(retrySeconds)
+            retrySeconds = min(retrySeconds * 2, TOKEN_REFRESH_RETRY_MAX_SECONDS)
+
+    async def reloginAfterUnauthorized(self, staleAuthorization) -> bool:
+        """
+        Called when a request sent with staleAuthorization came back 401. Concurrent callers share a single re-login:
+        whoever gets the lock first requests a new token, everyone after sees the replaced header and just retries.
+        Returns whether retrying is worthwhile.
+        """
+        async with self._reloginLock:
+            if self.currentAuthorization() != staleAuthorization:
+                return True
+            logging.info(f"{self.host} - Request unauthorized, requesting a new access token")
+            if self.tokenCache is not None:
+                await asyncio.to_thread(self.tokenCache.invalidate)
+            result = await self._requestAccessToken()
+            if result.error is not None:
+                return False
+        self._scheduleRefresh()
+        return True
 
     async def loginTokenOauthAuthentication(self):
         self.controller.session.auth = BearerToken(self.password)
@@ -304,6 +410,8 @@ class AuthMethod():
     async def cleanup(self):
         logging.info(f"Cleaning up closing connection for this service using "
                      f"{self.host}")
+        if self._refreshTask is not None:
+            self._refreshTask.cancel()
         await self.session.close()
 
     async def getResultFromResponse(self, response, debugString,
@@ -336,6 +444,43 @@ class AuthMethod():
             return Result(body, None)
 
 
+class ReauthenticatingController:
+    """
+    Stands in for the AppdController of an OAuth client secret login. A request answered with 401 is sent once more after
+    AuthMethod.reloginAfterUnauthorized, so an expired or revoked token costs one re-login instead of a cascade of failed calls.
+    """
+
+    def __init__(self, authMethod: AuthMethod):
+        object.__setattr__(self, "_authMethod", authMethod)
+        object.__setattr__(self, "_controller", authMethod.controller)
+
+    def __getattr__(self, name):
+        attr = getattr(self._controller, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def call(*args, **kwargs):
+            authorization = self._authMethod.currentAuthorization()
+            pending = attr(*args, **kwargs)
+            if not inspect.isawaitable(pending):
+                return pending
+            return self._retryOnUnauthorized(pending, attr, args, kwargs, authorization)
+
+        return call
+
+    def __setattr__(self, name, value):
+        setattr(self._controller, name, value)
+
+    async def _retryOnUnauthorized(self, pending, method, args, kwargs, authorization):
+        response = await pending
+        if response.status_code != 401:
+            return response
+        if not await self._authMethod.reloginAfterUnauthorized(authorization):
+            return response
+        response.release()
+        return await method(*args, **kwargs)
+
 
 async def main():
 
@@ -0,0 +1,61 @@
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__.split('.')[-1])
+
+
+class DataCollectorProbeCache:
+    """
+    Data collector fields of one controller that were recently seen in a snapshot, kept on disk between runs.
+    Only positive results are cached: a field that showed up in a snapshot is assumed to keep working for ttlSeconds,
+    a field that did not is probed again next run.
+    """
+
+    def __init__(self, path: str = None, ttlSeconds: float = 0):
+        self.path = path
+        self.ttlSeconds = ttlSeconds
+        self.confirmedAt = None
+        self.dirty = False
+
+    @staticmethod
+    def key(applicationID, collectorType: str, collectorName: str) -> str:
+        return f"{applicationID}|{collectorType}|{collectorName}"
+
+    def _load(self):
+        self.confirmedAt = {}
+        if self.path is None or not self.ttlSeconds:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.confirmedAt = json.load(f)["confirmedAt"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def isConfirmed(self, applicationID, collectorType: str, collectorName: str) -> bool:
+        if self.confirmedAt is None:
+            self._load()
+        confirmedAt = self.confirmedAt.get(self.key(applicationID, collectorType, collectorName))
+        return confirmedAt is not None and time.time() - confirmedAt < self.ttlSeconds
+
+    def confirm(self, applicationID, collectorType: str, collectorName: str):
+        if self.confirmedAt is None:
+            self._load()
+        self.confirmedAt[self.key(applicationID, collectorType, collectorName)] = int(time.time())
+        self.dirty = True
+
+    def save(self):
+        if self.path is None or not self.ttlSeconds or not self.dirty:
+            return
+        cutoff = time.time() - self.ttlSeconds
+        confirmedAt = {key: timestamp for key, timestamp in self.confirmedAt.items() if timestamp >= cutoff}
+        tmpPath = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmpPath, "w", encoding="utf-8") as f:
+                json.dump({"confirmedAt": confirmedAt}, f)
+            os.replace(tmpPath, self.path)
+            self.dirty = False
+        except OSError as e:
+            logger.debug(f"Unable to write data collector probe cache {self.path}: {e}")
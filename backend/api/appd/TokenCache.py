@@ -0,0 +1,88 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # optional, without it access tokens are not cached on disk
+    Fernet = None
+
+logger = logging.getLogger(__name__.split('.')[-1])
+
+_KDF_ITERATIONS = 100_000
+
+
+class TokenCache:
+    """
+    On-disk cache of OAuth access tokens, one file per host, account and client id.
+    Entries are Fernet tokens (AES-CBC with an HMAC-SHA256, from the cryptography package) under a key derived from the
+    client secret, so only holders of the secret can use them and a rotated secret simply misses the cache.
+    """
+
+    def __init__(self, cacheDir: str, host: str, account: str, clientId: str, clientSecret: str):
+        self.cacheDir = cacheDir
+        self.cacheKey = hashlib.sha256(f"{host}|{account}|{clientId}".encode("utf-8")).hexdigest()
+        self.path = os.path.join(cacheDir, f"{self.cacheKey}.token")
+        self._clientSecret = clientSecret
+        self._fernet = None
+
+    @staticmethod
+    def isSupported() -> bool:
+        return Fernet is not None
+
+    def _cipher(self):
+        # derived lazily, PBKDF2 is deliberately slow
+        if self._fernet is None:
+            key = hashlib.pbkdf2_hmac("sha256", self._clientSecret.encode("utf-8"), self.cacheKey.encode("utf-8"), _KDF_ITERATIONS, dklen=32)
+            self._fernet = Fernet(base64.urlsafe_b64encode(key))
+        return self._fernet
+
+    def _encrypt(self, plaintext: bytes) -> bytes:
+        return self._cipher().encrypt(plaintext)
+
+    def _decrypt(self, blob: bytes):
+        try:
+            return self._cipher().decrypt(blob)
+        except InvalidToken:
+            return None
+
+    def load(self, minRemainingSeconds: float = 0):
+        """Cached (token, expiresAt) if it is still valid for at least minRemainingSeconds, otherwise None."""
+        try:
+            with open(self.path, "rb") as f:
+                plaintext = self._decrypt(f.read())
+        except OSError:
+            return None
+        if plaintext is None:
+            logger.debug(f"Ignoring token cache entry {self.path} which could not be decrypted")
+            return None
+        try:
+            entry = json.loads(plaintext)
+            token, expiresAt = entry["accessToken"], float(entry["expiresAt"])
+        except (ValueError, KeyError, TypeError):
+            return None
+        if expiresAt - time.time() < minRemainingSeconds:
+            return None
+        return token, expiresAt
+
+    def store(self, token: str, expiresAt: float):
+        plaintext = json.dumps({"accessToken": token, "expiresAt": expiresAt}).encode("utf-8")
+        tmpPath = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cacheDir, exist_ok=True)
+            fd = os.open(tmpPath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._encrypt(plaintext))
+            # concurrent processes (shards, parallel jobs) never see a partially written entry
+            os.replace(tmpPath, self.path)
+        except OSError as e:
+            logger.debug(f"Unable to write token cache entry {self.path}: {e}")
+
+    def invalidate(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -1,26 +1,146 @@
+import time
+
+startupBegin = time.perf_counter()
+
 import asyncio
 import logging
 import sys
 
 import click
+from backend.core.Deadline import parseDeadline
 from backend.core.Engine import Engine
 from backend.util.click_utils import coro
 from backend.util.logging_utils import initLogging
 
+engineImportSeconds = time.perf_counter() - startupBegin
+
+
+def logStartupProfile(timings: dict, engine: Engine = None):
+    logger = logging.getLogger("startup-profile")
+    logger.info("----------Startup Profile----------")
+    for phase, seconds in timings.items():
+        logger.info(f"{phase:<60} {seconds:8.3f}s")
+    if engine is not None and engine.registry.importTimings:
+        logger.info("Deferred imports:")
+        for path, seconds in engine.registry.importTimings.items():
+            logger.info(f"  {path:<58} {seconds:8.3f}s")
+
 
 @click.command()
 @click.option("-j", "--job-file", default="DefaultJob")
 @click.option("-t", "--thresholds-file", default="DefaultThresholds")
 @click.option("-d", "--debug", is_flag=True)
+@click.option("--debug-request-rate", type=int, default=100, help="Per-request debug lines logged per second with --debug, 0 for all.")
 @click.option("-c", "--concurrent-connections", type=int)
 @click.option("-u", "--username", default=None, hidden=True)
 @click.option("-p", "--password", default=None, hidden=True)
 @click.option("-a", "--auth-method", default=None, hidden=True)
+@click.option("--archive-keep-last", type=int, default=None, help="Keep only the last N archived runs of the job.")
+@click.option("--archive-keep-daily", type=int, default=None, help="Also keep the newest archived run of each of the last N days.")
+@click.option("--archive-keep-weekly", type=int, default=None, help="Also keep the newest archived run of each of the last N weeks.")
+@click.option("--profile-startup", is_flag=True, help="Log import and initialization timings.")
+@click.option("--daemon", is_flag=True, help="Keep running: run the job every --interval minutes and on POST /run to the local API.")
+@click.option("--interval", type=int, default=60, help="Minutes between scheduled runs in daemon mode.")
+@click.option("--api-port", type=int, default=16226, help="Port of the daemon's local API (bound to 127.0.0.1).")
+@click.option("--cache-ttl", type=int, default=360, help="Minutes the daemon reuses slow-changing controller configuration between runs. Health rules and policies are always fetched again.")
+@click.option("--shards", type=int, default=1, help="Split each controller's applications across N worker processes for extraction.")
+@click.option(
+    "--storage",
+    type=click.Choice(["memory", "sqlite"]),
+    default="memory",
+    help="Keep extracted data in memory, or in output/<job>/controllerData.sqlite for estates that do not fit in memory.",
+)
+@click.option("--max-api-calls", type=int, default=None, help="Abort if the planned or actual number of API calls exceeds N.")
+@click.option("--max-minutes", type=float, default=None, help="Abort if the planned or actual run time exceeds N minutes.")
+@click.option("--plan-only", is_flag=True, help="Print the estimated API calls and duration per JobStep, then exit without extracting.")
+@click.option(
+    "--deadline",
+    type=str,
+    default=None,
+    help="Local HH:MM or ISO date and time by which reports must be written. Optional checks are skipped and reported as not assessed when the run falls behind.",
+)
+@click.option("--resume", is_flag=True, help="Continue the checkpointed run of this job that was interrupted. Implies --storage sqlite.")
 @coro
-async def main(job_file: str, thresholds_file: str, debug, concurrent_connections: int, username: str, password: str, auth_method: str):
-    initLogging(debug)
-    engine = Engine(job_file, thresholds_file, concurrent_connections, username, password, auth_method)
-    await engine.run()
+async def main(
+    job_file: str,
+    thresholds_file: str,
+    debug,
+    debug_request_rate: int,
+    concurrent_connections: int,
+    username: str,
+    password: str,
+    auth_method: str,
+    archive_keep_last: int,
+    archive_keep_daily: int,
+    archive_keep_weekly: int,
+    profile_startup: bool,
+    daemon: bool,
+    interval: int,
+    api_port: int,
+    cache_ttl: int,
+    shards: int,
+    storage: str,
+    max_api_calls: int,
+    max_minutes: float,
+    plan_only: bool,
+    resume: bool,
+    deadline: str,
+):
+    if resume:
+        storage = "sqlite"
+    if storage == "sqlite" and shards > 1:
+        raise click.UsageError("--storage sqlite cannot be combined with --shards.")
+    if plan_only and daemon:
+        raise click.UsageError("--plan-only cannot be combined with --daemon.")
+    if resume and daemon:
+        raise click.UsageError("--resume cannot be combined with --daemon.")
+    if deadline and daemon:
+        raise click.UsageError("--deadline cannot be combined with --daemon.")
+    deadlineAt = None
+    if deadline:
+        try:
+            deadlineAt = parseDeadline(deadline)
+        except ValueError:
+            raise click.BadParameter(f"{deadline} is neither HH:MM nor an ISO date and time.", param_hint="--deadline")
+
+    timings = {"import backend.core.Engine": engineImportSeconds}
+
+    start = time.perf_counter()
+    initLogging(debug, requestLogRate=debug_request_rate)
+    timings["initLogging"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine = Engine(
+        job_file,
+        thresholds_file,
+        concurrent_connections,
+        username,
+        password,
+        auth_method,
+        archiveRetention={"keepLastRuns": archive_keep_last, "keepDailyRuns": archive_keep_daily, "keepWeeklyRuns": archive_keep_weekly},
+        shards=shards,
+        storage=storage,
+        callBudget=max_api_calls,
+        timeBudgetMins=max_minutes,
+        planOnly=plan_only,
+        resume=resume,
+        deadlineAt=deadlineAt,
+    )
+    timings["Engine.__init__"] = time.perf_counter() - start
+    timings["total until Engine.run"] = time.perf_counter() - startupBegin
+
+    if profile_startup:
+        logStartupProfile(timings)
+    try:
+        if daemon:
+            from backend.core.Daemon import Daemon
+
+            await Daemon(engine, intervalMins=interval, port=api_port, cacheTtlMins=cache_ttl).serve()
+        else:
+            await engine.run()
+    finally:
+        if profile_startup:
+            logStartupProfile(timings, engine)
 
 
 if __name__ == "__main__":
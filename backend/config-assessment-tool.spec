@@ -7,7 +7,7 @@ import streamlit
 import shutil
 import ctypes.util
 import subprocess
-from PyInstaller.utils.hooks import copy_metadata
+from PyInstaller.utils.hooks import collect_submodules, copy_metadata
 
 pptx_path = path.dirname(pptx.__file__)
 streamlit_path = path.dirname(streamlit.__file__)
@@ -85,7 +85,9 @@ a = Analysis(
         ("../plugins", "plugins"),
         ("../frontend", "frontend"),
     ] + copy_metadata('streamlit'),
-    hiddenimports=['streamlit.runtime.scriptrunner.magic_funcs', 'backend.util', 'backend.util.logging_utils', 'tzlocal', 'streamlit_modal', 'backend.core', 'backend.core.Engine', 'backend.api', 'backend.api.Result', 'backend.api.appd', 'backend.api.appd.AppDService', 'backend.api.appd.AppDController', 'backend.api.appd.AuthMethod', 'backend.extractionSteps', 'backend.extractionSteps.general', 'backend.extractionSteps.maturityAssessment'],
+    hiddenimports=['streamlit.runtime.scriptrunner.magic_funcs', 'backend.util', 'backend.util.logging_utils', 'tzlocal', 'streamlit_modal', 'backend.core', 'backend.core.Engine', 'backend.api', 'backend.api.Result', 'backend.api.appd', 'backend.api.appd.AppDService', 'backend.api.appd.AppDController', 'backend.api.appd.AuthMethod', 'backend.extractionSteps', 'backend.extractionSteps.general', 'backend.extractionSteps.maturityAssessment']
+    # job steps, reports and post-processors are imported lazily through backend.core.Registry
+    + collect_submodules('backend.extractionSteps') + collect_submodules('backend.output'),
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
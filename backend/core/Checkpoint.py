@@ -0,0 +1,85 @@
+import hashlib
+import logging
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+from backend.core.ShardWorker import mergeShard
+from backend.core.SqliteStore import SqliteStore
+
+logger = logging.getLogger(__name__.split('.')[-1])
+
+# applications extracted and checkpointed together by one JobStep
+CHECKPOINT_CHUNK_SIZE = 100
+# chunk name of JobSteps that run once per controller
+CONTROLLER_CHUNK = "controller"
+
+
+class ChunkHostInfo(MutableMapping):
+    """
+    hostInfo of one controller with a single component type narrowed to a chunk of applications. Reads fall through to the
+    full hostInfo, assignments are collected in overlay and folded back with mergeShard, the same way shard results are.
+    """
+
+    def __init__(self, hostInfo, componentType: str, applicationNames: list):
+        self.hostInfo = hostInfo
+        applications = hostInfo[componentType]
+        self.overlay = {componentType: OrderedDict((applicationName, applications[applicationName]) for applicationName in applicationNames)}
+
+    def __getitem__(self, key):
+        if key in self.overlay:
+            return self.overlay[key]
+        return self.hostInfo[key]
+
+    def __setitem__(self, key, value):
+        self.overlay[key] = value
+
+    def __delitem__(self, key):
+        del self.overlay[key]
+
+    def __iter__(self):
+        return iter([*self.overlay, *(key for key in self.hostInfo if key not in self.overlay)])
+
+    def __len__(self):
+        return len(set(self.overlay) | set(self.hostInfo))
+
+    def __contains__(self, key):
+        return key in self.overlay or key in self.hostInfo
+
+
+def applicationChunks(applicationNames: list, chunkSize: int = CHECKPOINT_CHUNK_SIZE) -> list:
+    """
+    (chunk name, application names) in order. Names are derived from the applications, so a resumed run whose
+    application order differs simply finds no checkpoint for the affected chunks. No applications is one empty chunk,
+    JobSteps still set up their controller level values.
+    """
+    chunks = [applicationNames[idx : idx + chunkSize] for idx in range(0, len(applicationNames), chunkSize)] or [[]]
+    return [(hashlib.sha256("\n".join(chunk).encode("utf-8")).hexdigest()[:16], chunk) for chunk in chunks]
+
+
+async def extractWithCheckpoints(jobStep, controllerData, store: SqliteStore):
+    """
+    Extract one JobStep controller by controller and chunk by chunk, checkpointing each finished piece in store.
+    Pieces checkpointed by an earlier attempt of the same run are skipped.
+    """
+    jobStepName = type(jobStep).__name__
+    for host, hostInfo in controllerData.items():
+        done = store.checkpoints(host, jobStepName)
+
+        if jobStep.componentType == "controller":
+            if CONTROLLER_CHUNK in done:
+                logger.info(f"{host} - {jobStepName} restored from checkpoint")
+                continue
+            await jobStep.extract(OrderedDict([(host, hostInfo)]))
+            store.checkpoint(host, jobStepName, CONTROLLER_CHUNK)
+            continue
+
+        chunks = applicationChunks(list(hostInfo[jobStep.componentType]))
+        pending = [(chunkName, chunk) for chunkName, chunk in chunks if chunkName not in done]
+        if len(pending) < len(chunks):
+            logger.info(f"{host} - {jobStepName} restored {len(chunks) - len(pending)} of {len(chunks)} application chunks from checkpoint")
+        for chunkName, chunk in pending:
+            chunkHostInfo = ChunkHostInfo(hostInfo, jobStep.componentType, chunk)
+            await jobStep.extract(OrderedDict([(host, chunkHostInfo)]))
+            with store.transaction():
+                mergeShard(hostInfo, chunkHostInfo.overlay)
+                store.checkpoint(host, jobStepName, chunkName)
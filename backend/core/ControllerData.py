@@ -0,0 +1,2 @@
+# hostInfo keys holding applications by name, one per component type. Every other hostInfo key is a controller level value.
+COMPONENT_TYPES = ["apm", "brum", "mrum"]
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import time
+import traceback
+from collections import deque
+
+from aiohttp import web
+
+from backend.core.Engine import Engine
+
+logger = logging.getLogger(__name__.split('.')[-1])
+
+# controller sessions older than this are re-authenticated before the next run
+SESSION_MAX_AGE_SECONDS = 30 * 60
+
+
+class Daemon:
+    """
+    Keeps one Engine alive and runs its job on a schedule and on request.
+    Imports, validated thresholds, controller sessions and slow-changing controller configuration stay warm between runs.
+
+    Local API (bound to 127.0.0.1 by default):
+        GET  /status  current run, next scheduled run and last result
+        GET  /runs    results of recent runs
+        POST /run     queue an ad-hoc run
+    """
+
+    def __init__(self, engine: Engine, intervalMins: int = 60, host: str = "127.0.0.1", port: int = 16226, cacheTtlMins: int = 360):
+        self.engine = engine
+        self.intervalSeconds = intervalMins * 60
+        self.host = host
+        self.port = port
+        self.cacheTtlSeconds = cacheTtlMins * 60
+
+        self.queue = asyncio.Queue()
+        self.history = deque(maxlen=20)
+        self.current = None
+        self.nextScheduledRun = None
+        self.lastLogin = None
+        self.runCount = 0
+
+    async def serve(self):
+        # fail fast on bad input, exactly like a one-off run
+        await self.engine.validateThresholdsFile()
+        self.engine.exitOnError = False
+
+        app = web.Application()
+        app.router.add_get("/status", self.handleStatus)
+        app.router.add_get("/runs", self.handleRuns)
+        app.router.add_post("/run", self.handleRun)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, self.host, self.port).start()
+        logger.info(f"Daemon listening on http://{self.host}:{self.port}, running {self.engine.jobFileName} every {self.intervalSeconds // 60} minutes")
+
+        try:
+            await asyncio.gather(self.schedule(), self.worker())
+        finally:
+            await runner.cleanup()
+            await self.engine.abortAndCleanup("Daemon stopped.", error=False)
+
+    async def schedule(self):
+        while True:
+            # don't pile up scheduled runs behind one that overran the interval
+            if self.queue.empty():
+                await self.queue.put("schedule")
+            self.nextScheduledRun = time.time() + self.intervalSeconds
+            await asyncio.sleep(self.intervalSeconds)
+
+    async def worker(self):
+        while True:
+            trigger = await self.queue.get()
+            await self.runOnce(trigger)
+
+    async def runOnce(self, trigger: str):
+        self.runCount += 1
+        self.current = {"id": self.runCount, "trigger": trigger, "startedAt": time.time()}
+        logger.info(f"----------Daemon run {self.runCount} ({trigger})----------")
+        startTime = time.monotonic()
+
+        self.engine.resetForRun(self.cacheTtlSeconds)
+        reauthenticate = self.lastLogin is None or time.monotonic() - self.lastLogin > SESSION_MAX_AGE_SECONDS
+        try:
+            await self.engine.initControllers(authenticate=reauthenticate)
+            if reauthenticate:
+                self.lastLogin = time.monotonic()
+            await self.engine.runSteps(startTime)
+            self.current["status"] = "succeeded"
+        except Exception as e:
+            logger.error("".join(traceback.TracebackException.from_exception(e).format()))
+            self.current["status"] = "failed"
+            self.current["error"] = str(e)
+            # sessions may be the cause, log in again next time
+            self.lastLogin = None
+
+        self.current["durationSeconds"] = round(time.monotonic() - startTime, 1)
+        self.current["apiCalls"] = sum(controller.totalCallsProcessed for controller in self.engine.controllers)
+        self.history.append(self.current)
+        self.current = None
+
+    async def handleStatus(self, request):
+        return web.json_response(
+            {
+                "job": self.engine.jobFileName,
+                "running": self.current,
+                "queued": self.queue.qsize(),
+                "nextScheduledRun": self.nextScheduledRun,
+                "lastRun": self.history[-1] if self.history else None,
+            }
+        )
+
+    async def handleRuns(self, request):
+        return web.json_response(list(self.history))
+
+    async def handleRun(self, request):
+        await self.queue.put("api")
+        return web.json_response({"queued": self.queue.qsize()}, status=202)
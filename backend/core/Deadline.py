@@ -0,0 +1,114 @@
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from backend.api.appd.AppDService import DATA_COLLECTOR_PROBE_WAVE
+from backend.core.Planner import RunPlan, formatDuration
+
+logger = logging.getLogger(__name__.split('.')[-1])
+
+# optional work in the order it is shed once a run falls behind its deadline
+OPTIONAL_WORK = ["snapshotChecks", "dataCollectorProbes", "dashboardDetails"]
+# JobStep -> (component type, calls per application) of each optional work, see STEP_COSTS.
+# Dashboard details are fetched with the controller level details, before there is a plan to weigh them against.
+OPTIONAL_CALLS = {
+    "snapshotChecks": {"NetworkRequestsBRUM": ("brum", 1), "NetworkRequestsMRUM": ("mrum", 1)},
+    "dataCollectorProbes": {"DataCollectorsAPM": ("apm", DATA_COLLECTOR_PROBE_WAVE)},
+    "dashboardDetails": {},
+}
+# share of the time between run start and deadline kept free for analysis and reports, and its lower bound
+REPORT_RESERVE_SHARE = 0.1
+MIN_REPORT_RESERVE_SECONDS = 60
+
+
+def parseDeadline(text: str, now: datetime = None) -> float:
+    """Epoch seconds of an ISO date and time, or of the next occurrence of a local HH:MM."""
+    now = now or datetime.now()
+    try:
+        deadline = datetime.combine(now.date(), datetime.strptime(text, "%H:%M").time())
+        if deadline <= now:
+            deadline += timedelta(days=1)
+    except ValueError:
+        deadline = datetime.fromisoformat(text)
+    return deadline.timestamp()
+
+
+class Deadline:
+    """
+    Tracks a run against a wall clock deadline and sheds OPTIONAL_WORK, first to last, when the plan says the remaining
+    extraction will not fit in before it. JobSteps ask allows() before each optional piece and report what they skipped as not assessed.
+    """
+
+    def __init__(self, endsAt: float):
+        self.endsAt = endsAt
+        self.reserveSeconds = max(MIN_REPORT_RESERVE_SECONDS, REPORT_RESERVE_SHARE * (endsAt - time.time()))
+        # number of OPTIONAL_WORK entries shed so far
+        self.shedLevel = 0
+        self.plans: List[RunPlan] = []
+        self.plannedAt = None
+        self.doneSteps = []
+
+    def remainingSeconds(self) -> float:
+        return self.endsAt - time.time()
+
+    def allows(self, work: str) -> bool:
+        if self.remainingSeconds() <= self.reserveSeconds:
+            self.shed(len(OPTIONAL_WORK), "reached the time reserved for reports")
+        return OPTIONAL_WORK.index(work) >= self.shedLevel
+
+    def shed(self, level: int, reason: str):
+        for work in OPTIONAL_WORK[self.shedLevel : level]:
+            logger.warning(f"Deadline: {reason}, skipping {work}. Affected metrics are reported as not assessed.")
+        self.shedLevel = max(self.shedLevel, level)
+
+    def planned(self, plans: List[RunPlan]):
+        self.plans = plans
+        self.plannedAt = time.monotonic()
+        logger.info(f"Deadline in {formatDuration(max(self.remainingSeconds(), 0))}, {formatDuration(self.reserveSeconds)} of it kept for reports")
+        self.reassess()
+
+    def stepDone(self, jobStepName: str):
+        self.doneSteps.append(jobStepName)
+        self.reassess()
+
+    def reassess(self):
+        """Shed as much optional work as the projected remaining extraction needs to end before the report reserve."""
+        if not self.plans:
+            return
+        pace = self.pace()
+        projectedSeconds = pace * sum(step.seconds for plan in self.plans for step in plan.steps if step.jobStep not in self.doneSteps)
+        availableSeconds = self.remainingSeconds() - self.reserveSeconds
+        level = self.shedLevel
+        # work without calls left to save, like dashboard details, is only shed once the report reserve is reached
+        while (
+            level < len(OPTIONAL_WORK)
+            and OPTIONAL_CALLS[OPTIONAL_WORK[level]]
+            and projectedSeconds - self.savedSeconds(OPTIONAL_WORK[:level], pace) > availableSeconds
+        ):
+            level += 1
+        if level > self.shedLevel:
+            self.shed(level, f"{formatDuration(projectedSeconds)} of extraction left at {pace:.1f}x the planned pace, {formatDuration(max(availableSeconds, 0))} available")
+
+    def pace(self) -> float:
+        """Actual over estimated duration of the JobSteps done since planning, never below 1 so an early lucky step sheds no less."""
+        estimatedSeconds = sum(step.seconds for plan in self.plans for step in plan.steps if step.jobStep in self.doneSteps)
+        if estimatedSeconds < 1:
+            return 1.0
+        return max(1.0, (time.monotonic() - self.plannedAt) / estimatedSeconds)
+
+    def savedSeconds(self, works: List[str], pace: float) -> float:
+        savedSeconds = 0.0
+        for plan in self.plans:
+            for work in works:
+                for jobStepName, (componentType, callsPerApplication) in OPTIONAL_CALLS[work].items():
+                    if jobStepName in self.doneSteps:
+                        continue
+                    calls = callsPerApplication * plan.applicationCounts.get(componentType, 0)
+                    savedSeconds += pace * math.ceil(calls / plan.concurrency) * plan.secondsPerCall
+        return savedSeconds
+
+    def __getstate__(self) -> Dict:
+        # shard workers only need the deadline and what was already shed
+        return {"endsAt": self.endsAt, "reserveSeconds": self.reserveSeconds, "shedLevel": self.shedLevel, "plans": [], "plannedAt": None, "doneSteps": []}
@@ -1,58 +1,132 @@
+import hashlib
 import json
 import logging
 import math
+import multiprocessing
 import os
 import sys
 import time
 import asyncio
+import contextlib
 import traceback
-from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter, OrderedDict
 from pathlib import Path
 import importlib.util
 
-import requests
-
 from backend.api.appd.AppDService import AppDService
 from backend.api.appd.AuthMethod import AuthMethod
-from backend.extractionSteps.general.ControllerLevelDetails import ControllerLevelDetails
-from backend.extractionSteps.general.CustomMetrics import CustomMetrics
-from backend.extractionSteps.general.Synthetics import Synthetics
-from backend.extractionSteps.maturityAssessment.apm.AppAgentsAPM import AppAgentsAPM
-from backend.extractionSteps.maturityAssessment.apm.BackendsAPM import BackendsAPM
-from backend.extractionSteps.maturityAssessment.apm.BusinessTransactionsAPM import BusinessTransactionsAPM
-from backend.extractionSteps.maturityAssessment.apm.DashboardsAPM import DashboardsAPM
-from backend.extractionSteps.maturityAssessment.apm.DataCollectorsAPM import DataCollectorsAPM
-from backend.extractionSteps.maturityAssessment.apm.ErrorConfigurationAPM import ErrorConfigurationAPM
-from backend.extractionSteps.maturityAssessment.apm.HealthRulesAndAlertingAPM import HealthRulesAndAlertingAPM
-from backend.extractionSteps.maturityAssessment.apm.MachineAgentsAPM import MachineAgentsAPM
-from backend.extractionSteps.maturityAssessment.apm.OverallAssessmentAPM import OverallAssessmentAPM
-from backend.extractionSteps.maturityAssessment.apm.OverheadAPM import OverheadAPM
-from backend.extractionSteps.maturityAssessment.apm.ServiceEndpointsAPM import ServiceEndpointsAPM
-from backend.extractionSteps.maturityAssessment.brum.HealthRulesAndAlertingBRUM import HealthRulesAndAlertingBRUM
-from backend.extractionSteps.maturityAssessment.brum.NetworkRequestsBRUM import NetworkRequestsBRUM
-from backend.extractionSteps.maturityAssessment.brum.OverallAssessmentBRUM import OverallAssessmentBRUM
-from backend.extractionSteps.maturityAssessment.mrum.HealthRulesAndAlertingMRUM import HealthRulesAndAlertingMRUM
-from backend.extractionSteps.maturityAssessment.mrum.NetworkRequestsMRUM import NetworkRequestsMRUM
-from backend.extractionSteps.maturityAssessment.mrum.OverallAssessmentMRUM import OverallAssessmentMRUM
-from backend.output.Archiver import Archiver
-from backend.output.PostProcessReport import PostProcessReport
-# from output.presentations.cxPpt import createCxPpt
-from backend.output.presentations.cxPptTemplate import createCxPpt as createCxPptTemplate
-from backend.output.reports.AgentMatrixReport import AgentMatrixReport
-from backend.output.reports.ConfigurationAnalysisReport import ConfigurationAnalysisReport
-from backend.output.reports.CustomMetricsReport import CustomMetricsReport
-from backend.output.reports.DashboardReport import DashboardReport
-from backend.output.reports.LicenseReport import LicenseReport
-from backend.output.reports.MaturityAssessmentReport import MaturityAssessmentReport
-from backend.output.reports.MaturityAssessmentReportRaw import RawMaturityAssessmentReport
-from backend.output.reports.SyntheticsReport import SyntheticsReport
+from backend.core.Checkpoint import extractWithCheckpoints
+from backend.core.ControllerData import COMPONENT_TYPES
+from backend.core.Deadline import Deadline
+from backend.core.Planner import DEFAULT_SECONDS_PER_CALL, formatDuration, orderLargestFirst, planController, restoreOrder
+from backend.core.Registry import Registry
+from backend.core.ShardWorker import mergeShard, partitionApplications, runShard
+from backend.core.SqliteStore import HostRecord, SqliteStore
+from backend.output.MaturitySummary import MaturitySummary
 from backend.util.asyncio_utils import AsyncioUtils
+from backend.util.json_utils import jsonCodec
 from backend.util.stdlib_utils import base64Decode, base64Encode, isBase64, jsonEncoder
+from backend.util.version_utils import checkLatestVersion
 
 logger = logging.getLogger(__name__.split('.')[-1])
 
+
+def defaultRegistry() -> Registry:
+    """Job steps, reports and post-processors in execution order. Nothing is imported until first use."""
+    registry = Registry()
+    registry.register(
+        "otherSteps",
+        "backend.extractionSteps.general.ControllerLevelDetails.ControllerLevelDetails",
+        "backend.extractionSteps.general.CustomMetrics.CustomMetrics",
+        "backend.extractionSteps.general.Synthetics.Synthetics",
+    )
+    registry.register(
+        "maturityAssessmentSteps",
+        # APM Report
+        "backend.extractionSteps.maturityAssessment.apm.AppAgentsAPM.AppAgentsAPM",
+        "backend.extractionSteps.maturityAssessment.apm.MachineAgentsAPM.MachineAgentsAPM",
+        "backend.extractionSteps.maturityAssessment.apm.BusinessTransactionsAPM.BusinessTransactionsAPM",
+        "backend.extractionSteps.maturityAssessment.apm.BackendsAPM.BackendsAPM",
+        "backend.extractionSteps.maturityAssessment.apm.OverheadAPM.OverheadAPM",
+        "backend.extractionSteps.maturityAssessment.apm.ServiceEndpointsAPM.ServiceEndpointsAPM",
+        "backend.extractionSteps.maturityAssessment.apm.ErrorConfigurationAPM.ErrorConfigurationAPM",
+        "backend.extractionSteps.maturityAssessment.apm.HealthRulesAndAlertingAPM.HealthRulesAndAlertingAPM",
+        "backend.extractionSteps.maturityAssessment.apm.DataCollectorsAPM.DataCollectorsAPM",
+        "backend.extractionSteps.maturityAssessment.apm.DashboardsAPM.DashboardsAPM",
+        "backend.extractionSteps.maturityAssessment.apm.OverallAssessmentAPM.OverallAssessmentAPM",
+        # BRUM Report
+        "backend.extractionSteps.maturityAssessment.brum.NetworkRequestsBRUM.NetworkRequestsBRUM",
+        "backend.extractionSteps.maturityAssessment.brum.HealthRulesAndAlertingBRUM.HealthRulesAndAlertingBRUM",
+        "backend.extractionSteps.maturityAssessment.brum.OverallAssessmentBRUM.OverallAssessmentBRUM",
+        # MRUM Report
+        "backend.extractionSteps.maturityAssessment.mrum.NetworkRequestsMRUM.NetworkRequestsMRUM",
+        "backend.extractionSteps.maturityAssessment.mrum.HealthRulesAndAlertingMRUM.HealthRulesAndAlertingMRUM",
+        "backend.extractionSteps.maturityAssessment.mrum.OverallAssessmentMRUM.OverallAssessmentMRUM",
+    )
+    registry.register(
+        "reports",
+        "backend.output.reports.MaturityAssessmentReport.MaturityAssessmentReport",
+        "backend.output.reports.MaturityAssessmentReportRaw.RawMaturityAssessmentReport",
+        "backend.output.reports.AgentMatrixReport.AgentMatrixReport",
+        "backend.output.reports.CustomMetricsReport.CustomMetricsReport",
+        "backend.output.reports.LicenseReport.LicenseReport",
+        "backend.output.reports.SyntheticsReport.SyntheticsReport",
+        "backend.output.reports.DashboardReport.DashboardReport",
+    )
+    registry.register(
+        "postProcessors",
+        "backend.output.reports.ConfigurationAnalysisReport.ConfigurationAnalysisReport",
+        # after ALL reports generated archive a copy for safekeeping
+        "backend.output.Archiver.Archiver",
+    )
+    registry.register("presentations", "backend.output.presentations.cxPptTemplate.createCxPpt")
+    return registry
+
+
+def createControllerService(controller: dict, user_name: str = None, password: str = None, auth_method: str = None, cacheDir: str = None) -> AppDService:
+    """
+    AppDService for one controller entry of a job file. user_name, password and auth_method override the job file values.
+    OAuth access tokens and app agent metadata are shared across runs and processes through cacheDir.
+    """
+    logger.debug(
+        f'authenticationMethod: {controller["authType"]} '
+        f'for host {controller["host"]}')
+
+    authMethod = AuthMethod(
+        # auth_method=controller["authType"],
+        auth_method=auth_method if auth_method else controller["authType"],
+        host=controller["host"],
+        port=controller["port"],
+        ssl=controller["ssl"],
+        account=controller["account"],
+        username=user_name if user_name else controller["username"],
+        password=password if password else base64Decode(controller[
+                                                            "pwd"])[len("CAT-ENCODED-") :],
+        verifySsl=controller.get("verifySsl", True),
+        useProxy=controller.get("useProxy", False),
+        tokenCacheDir=os.path.join(cacheDir, "tokens") if cacheDir else None,
+    )
+
+    hostHash = hashlib.sha256(controller["host"].encode("utf-8")).hexdigest()
+    return AppDService(
+        applicationFilter=controller.get("applicationFilter", None),
+        timeRangeMins=controller.get("timeRangeMins", 1440),
+        metricSliceMins=controller.get("metricSliceMins", 1440),
+        nodeSampleSize=controller.get("nodeSampleSize", 0),
+        authMethod=authMethod,
+        retainRawMetrics=logging.getLogger().isEnabledFor(logging.DEBUG),
+        agentMetadataCacheFile=os.path.join(cacheDir, "agentMetadata", f"{hostHash}.json") if cacheDir else None,
+        agentMetadataCacheTtlMins=controller.get("agentMetadataCacheTtlMins", 60),
+        dataCollectorCacheFile=os.path.join(cacheDir, "dataCollectors", f"{hostHash}.json") if cacheDir else None,
+        dataCollectorCacheTtlMins=controller.get("dataCollectorCacheTtlMins", 1440),
+    )
+
+
 class Engine:
-    def __init__(self, jobFileName: str, thresholdsFileName: str, concurrentConnections: int, user_name: str, password: str, auth_method : str):
+    def __init__(self, jobFileName: str, thresholdsFileName: str, concurrentConnections: int, user_name: str, password: str, auth_method : str, archiveRetention: dict = None, shards: int = 1, storage: str = "memory",
+                 callBudget: int = None, timeBudgetMins: float = None, planOnly: bool = False, resume: bool = False,
+                 deadlineAt: float = None):
 
         # should we run the configuration analysis report in post-processing?
         self.controllers = []
@@ -75,6 +149,27 @@ class Engine:
 
         self.input_dir = os.path.join(self.user_data_dir, "input")
         self.output_dir = os.path.join(self.user_data_dir, "output")
+        self.cacheDir = os.path.join(self.output_dir, ".cache")
+        self.archiveRetention = archiveRetention or {}
+        self.shards = max(1, shards)
+        # "sqlite" keeps applications and host level values in output/<job>/controllerData.sqlite instead of memory
+        self.storage = storage
+        self.store = None
+        # continue the checkpointed sqlite run of an interrupted earlier attempt instead of starting over
+        self.resume = resume
+        # optional limits on API calls and minutes, checked against the plan and after every JobStep
+        self.callBudget = callBudget
+        self.timeBudgetMins = timeBudgetMins
+        self.planOnly = planOnly
+        # epoch seconds by which reports must be written, optional work is shed to get there, see Deadline
+        self.deadlineAt = deadlineAt
+        self.deadline = None
+        self.runStartTime = None
+        # host -> original application order, restored before analysis
+        self.applicationOrder = {}
+        self.credentialOverrides = []
+        # abortAndCleanup exits the process unless a long-running caller turns this off
+        self.exitOnError = True
 
         logger.info(f'\n{open(f"backend/resources/img/splash.txt").read()}')
         self.codebaseVersion = open(f"VERSION").read().strip()
@@ -100,23 +195,11 @@ class Engine:
         self.job = json.loads(open(job_file_path).read())
         self.thresholds = json.loads(open(thresholds_file_path).read())
 
-        try:
-            response = requests.request(
-                "GET",
-                "https://api.github.com/repos/appdynamics/config-assessment-tool/tags",
-                verify=all([job.get("verifySsl", True)] for job in self.job),
-                timeout=5,
-            )
-            latestTag = None
-            if not response.ok:
-                logger.warning(f"Unable to get latest tag from https://api.github.com/repos/appdynamics/config-assessment-tool/tags")
-            else:
-                latestTag = json.loads(response.text)[0]["name"]
-                if latestTag.lstrip("v") != self.codebaseVersion.lstrip("v"):
-                    logger.warning(f"You are using an outdated version of the software. Current {self.codebaseVersion} Latest {latestTag}")
-                    logger.warning("You can get the latest version from https://github.com/Appdynamics/config-assessment-tool/releases")
-        except requests.exceptions.RequestException:
-            logger.warning(f"Unable to get latest tag from https://api.github.com/repos/appdynamics/config-assessment-tool/tags")
+        checkLatestVersion(
+            self.codebaseVersion,
+            os.path.join(self.cacheDir, "latestVersion.json"),
+            verifySsl=all(job.get("verifySsl", True) for job in self.job),
+        )
 
         # Default concurrent connections to 10 for On-Premise controllers
         if any(job for job in self.job if "saas.appdynamics.com" not in job["host"]):
@@ -165,32 +248,11 @@ class Engine:
                              f'backward compatibility.')
                 controller["authType"] = "basic"
 
-            logger.debug(
-                f'authenticationMethod: {controller["authType"]} '
-                f'for host {controller["host"]}')
-
-            authMethod = AuthMethod(
-                # auth_method=controller["authType"],
-                auth_method=auth_method if auth_method else controller["authType"],
-                host=controller["host"],
-                port=controller["port"],
-                ssl=controller["ssl"],
-                account=controller["account"],
-                username=user_name if user_name else controller["username"],
-                password=password if password else base64Decode(controller[
-                                                                    "pwd"])[len("CAT-ENCODED-") :],
-                verifySsl=controller.get("verifySsl", True),
-                useProxy=controller.get("useProxy", False)
-            )
-
-            controllerService = AppDService(
-                applicationFilter=controller.get("applicationFilter", None),
-                timeRangeMins=controller.get("timeRangeMins", 1440),
-                authMethod=authMethod
-            )
-
+            controllerService = createControllerService(controller, user_name, password, auth_method, cacheDir=self.cacheDir)
 
             self.controllers.append(controllerService)
+            # sharded extraction rebuilds the service in each worker with the same credentials
+            self.credentialOverrides.append((user_name, password, auth_method))
             username = None
             password = None
 
@@ -201,42 +263,19 @@ class Engine:
             logger.info("Using password from jobfile")
 
         self.controllerData = OrderedDict()
-        self.otherSteps = [
-            ControllerLevelDetails(),
-            CustomMetrics(),
-            Synthetics(),
-        ]
-        self.maturityAssessmentSteps = [
-            # APM Report
-            AppAgentsAPM(),
-            MachineAgentsAPM(),
-            BusinessTransactionsAPM(),
-            BackendsAPM(),
-            OverheadAPM(),
-            ServiceEndpointsAPM(),
-            ErrorConfigurationAPM(),
-            HealthRulesAndAlertingAPM(),
-            DataCollectorsAPM(),
-            DashboardsAPM(),
-            OverallAssessmentAPM(),
-            # BRUM Report
-            NetworkRequestsBRUM(),
-            HealthRulesAndAlertingBRUM(),
-            OverallAssessmentBRUM(),
-            # MRUM Report
-            NetworkRequestsMRUM(),
-            HealthRulesAndAlertingMRUM(),
-            OverallAssessmentMRUM(),
-        ]
-        self.reports = [
-            MaturityAssessmentReport(),
-            RawMaturityAssessmentReport(),
-            AgentMatrixReport(),
-            CustomMetricsReport(),
-            LicenseReport(),
-            SyntheticsReport(),
-            DashboardReport(),
-        ]
+        self.registry = defaultRegistry()
+
+    @property
+    def otherSteps(self):
+        return self.registry.instantiate("otherSteps")
+
+    @property
+    def maturityAssessmentSteps(self):
+        return self.registry.instantiate("maturityAssessmentSteps")
+
+    @property
+    def reports(self):
+        return self.registry.instantiate("reports")
 
     async def run(self):
         startTime = time.monotonic()
@@ -244,10 +283,7 @@ class Engine:
         try:
             await self.validateThresholdsFile()
             await self.initControllers()
-            await self.process()
-            await self.postProcess()
-            await self.runPlugins()
-            self.finalize(startTime)
+            await self.runSteps(startTime)
         except Exception as e:
             # catch exceptions here, so we can terminate coroutines before program exit
             logger.error("".join(traceback.TracebackException.from_exception(e).format()))
@@ -257,6 +293,28 @@ class Engine:
             error=False,
         )
 
+    async def runSteps(self, startTime):
+        """Extract, analyze, report, post-process and run plugins for the current controllerData."""
+        self.runStartTime = startTime
+        self.deadline = Deadline(self.deadlineAt) if self.deadlineAt is not None else None
+        await self.process()
+        await self.postProcess()
+        await self.runPlugins()
+        self.finalize(startTime)
+
+    def resetForRun(self, cacheTtlSeconds: float = 0):
+        """Let a long-lived Engine run the job again with its existing controller sessions."""
+        self.closeStore()
+        self.controllerData = OrderedDict()
+        self.applicationOrder = {}
+        self.registry.instances.clear()
+        for controller in self.controllers:
+            controller.resetRunState(cacheTtlSeconds)
+
+    def closeStore(self):
+        if self.store is not None:
+            self.store.close()
+            self.store = None
 
     async def runPlugins(self):
         logger.info(f"----------Plugins----------")
@@ -354,19 +412,50 @@ class Engine:
                 logger.error(f"Failed to load plugin {plugin_name}: {e}")
                 logger.debug(traceback.format_exc())
 
-    async def initControllers(self) -> ([AppDService], str):
-        logger.info(f"Validating Controller Login(s) for Job - {self.jobFileName} ")
-        loginFutures = [controller.getAuthMethod().authenticate() for controller in
-                        self.controllers]
-        loginResults = await AsyncioUtils.gatherWithConcurrency(*loginFutures)
-        if any(login.error is not None for login in loginResults):
-            await self.abortAndCleanup(f"Unable to connect to one or more controllers. Aborting.")
+    async def initControllers(self, authenticate: bool = True) -> ([AppDService], str):
+        if authenticate:
+            logger.info(f"Validating Controller Login(s) for Job - {self.jobFileName} ")
+            loginFutures = [controller.getAuthMethod().authenticate() for controller in
+                            self.controllers]
+            loginResults = await AsyncioUtils.gatherWithConcurrency(*loginFutures)
+            if any(login.error is not None for login in loginResults):
+                await self.abortAndCleanup(f"Unable to connect to one or more controllers. Aborting.")
+
 
+        if self.storage == "sqlite" and self.store is None:
+            self.store = self.openStore(os.path.join(self.output_dir, self.jobFileName, "controllerData.sqlite"))
 
         for idx, controller in enumerate(self.controllers):
-            self.controllerData[controller.host] = OrderedDict()
+            self.controllerData[controller.host] = HostRecord(self.store, controller.host) if self.store is not None else OrderedDict()
             hostData = self.controllerData[controller.host]
             hostData["controller"] = controller
+            if self.store is not None:
+                # a resumed run keeps querying the time window its checkpointed data was extracted for
+                timeWindowKey = f"timeWindow|{controller.host}"
+                controller.startTime, controller.endTime = self.store.getMeta(timeWindowKey, [controller.startTime, controller.endTime])
+                self.store.setMeta(timeWindowKey, [controller.startTime, controller.endTime])
+
+    def runFingerprint(self) -> str:
+        """Identifies the job, thresholds and version a checkpointed run was made with. Passwords are left out, they get re-encoded."""
+        job = [{key: value for key, value in controller.items() if key != "pwd"} for controller in self.job]
+        fingerprint = json.dumps([job, self.thresholds, self.codebaseVersion], sort_keys=True, default=str)
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+    def openStore(self, path: str) -> SqliteStore:
+        """The store of an interrupted run of the same job when resuming, a fresh one otherwise."""
+        fingerprint = self.runFingerprint()
+        if self.resume and os.path.exists(path):
+            store = SqliteStore(path)
+            if store.getMeta("runFingerprint") == fingerprint:
+                logger.info(f"Resuming checkpointed run from {path}")
+                return store
+            store.close()
+            logger.warning(f"{path} was written with a different job, thresholds or version. Starting over.")
+        elif self.resume:
+            logger.warning(f"No checkpointed run found at {path}. Starting over.")
+        store = SqliteStore.create(path)
+        store.setMeta("runFingerprint", fingerprint)
+        return store
 
     async def validateThresholdsFile(self):
         logger.info(f"----------Input Validation----------")
@@ -459,17 +548,138 @@ class Engine:
 
     async def process(self):
         logger.info(f"----------Extract----------")
-        for jobStep in [*self.otherSteps, *self.maturityAssessmentSteps]:
-            await jobStep.extract(self.controllerData)
+        if self.shards > 1:
+            await self.extractSharded()
+        else:
+            for jobStep in [*self.otherSteps, *self.maturityAssessmentSteps]:
+                jobStep.thresholds = self.thresholds
+                jobStep.deadline = self.deadline
+                stepStart = time.monotonic()
+                if self.store is not None:
+                    await extractWithCheckpoints(jobStep, self.controllerData, self.store)
+                else:
+                    await jobStep.extract(self.controllerData)
+                if jobStep.componentType == "controller":
+                    await self.planRun(time.monotonic() - stepStart)
+                else:
+                    await self.enforceBudget(type(jobStep).__name__)
+                    if self.deadline is not None:
+                        self.deadline.stepDone(type(jobStep).__name__)
+        self.restoreApplicationOrder()
 
         logger.info(f"----------Analyze----------")
         for jobStep in [*self.maturityAssessmentSteps, *self.otherSteps]:
             jobStep.analyze(self.controllerData, self.thresholds)
+            if self.store is not None:
+                self.store.release()
 
         logger.info(f"----------Report----------")
-        job_output_dir = os.path.join(self.output_dir, self.jobFileName)
-        for report in self.reports:
-            report.createWorkbook(self.maturityAssessmentSteps, self.controllerData, self.jobFileName, self.output_dir)
+        # reports only read controllerData, so the store can drop values as soon as they were read
+        with self.store.readOnly() if self.store is not None else contextlib.nullcontext():
+            # The CX deck only needs the APM summary, so build it alongside the workbooks instead of re-reading them afterwards.
+            apmSummary = MaturitySummary.fromControllerData(self.controllerData, self.maturityAssessmentSteps, "apm")
+            pptFuture = asyncio.get_running_loop().run_in_executor(
+                None, self.registry.get("createCxPpt"), self.jobFileName, self.output_dir, apmSummary, int(time.time())
+            )
+            for report in self.reports:
+                report.createWorkbook(self.maturityAssessmentSteps, self.controllerData, self.jobFileName, self.output_dir)
+        await pptFuture
+
+    async def planRun(self, controllerLevelSeconds: float):
+        """
+        Estimate the remaining API calls and duration from the application lists and agent inventory of the controller level details,
+        enforce the budgets before any application is extracted, and move the largest applications to the front.
+        """
+        logger.info(f"----------Plan----------")
+        callsSoFar = sum(controller.totalCallsProcessed for controller in self.controllers)
+        # the controller level calls are mostly sequential, so their mean duration approximates the controller's latency
+        secondsPerCall = controllerLevelSeconds / callsSoFar if callsSoFar >= 5 else DEFAULT_SECONDS_PER_CALL
+        jobSteps = [jobStep for jobStep in [*self.otherSteps, *self.maturityAssessmentSteps] if jobStep.componentType != "controller"]
+
+        plans = []
+        for host, hostInfo in self.controllerData.items():
+            plan = planController(hostInfo, jobSteps, AsyncioUtils.concurrentConnections, secondsPerCall)
+            plan.log()
+            plans.append(plan)
+            self.applicationOrder[host] = orderLargestFirst(hostInfo)
+        if self.deadline is not None:
+            self.deadline.planned(plans)
+
+        # controllers are extracted one after another within each JobStep
+        estimatedCalls = callsSoFar + sum(plan.totalCalls for plan in plans)
+        estimatedSeconds = time.monotonic() - self.runStartTime + sum(plan.totalSeconds for plan in plans)
+        logger.info(f"Estimated run total: {estimatedCalls} API calls, {formatDuration(estimatedSeconds)}")
+
+        if self.callBudget and estimatedCalls > self.callBudget:
+            await self.abortAndCleanup(f"Estimated {estimatedCalls} API calls exceed the budget of {self.callBudget}. Aborting.")
+        if self.timeBudgetMins and estimatedSeconds > self.timeBudgetMins * 60:
+            await self.abortAndCleanup(f"Estimated run time of {formatDuration(estimatedSeconds)} exceeds the budget of {self.timeBudgetMins} minutes. Aborting.")
+        if self.planOnly:
+            await self.abortAndCleanup("Plan only, skipping extraction.", error=False)
+
+    async def enforceBudget(self, jobStepName: str):
+        """Stop a run whose estimate was too optimistic once it actually exceeds a budget."""
+        totalCalls = sum(controller.totalCallsProcessed for controller in self.controllers)
+        if self.callBudget and totalCalls > self.callBudget:
+            await self.abortAndCleanup(f"{totalCalls} API calls after {jobStepName} exceed the budget of {self.callBudget}. Aborting.")
+        elapsedSeconds = time.monotonic() - self.runStartTime
+        if self.timeBudgetMins and elapsedSeconds > self.timeBudgetMins * 60:
+            await self.abortAndCleanup(f"Run time of {formatDuration(elapsedSeconds)} after {jobStepName} exceeds the budget of {self.timeBudgetMins} minutes. Aborting.")
+
+    def restoreApplicationOrder(self):
+        for host, originalOrder in self.applicationOrder.items():
+            restoreOrder(self.controllerData[host], originalOrder)
+        self.applicationOrder = {}
+
+    async def extractSharded(self):
+        """
+        Coordinator mode. Controller level details are extracted here once, then every controller's applications are
+        split into self.shards shards, extracted by worker processes with their own sessions, and merged back.
+        Analysis runs afterwards on the merged controllerData since some metrics are controller-wide.
+        """
+        for jobStep in self.otherSteps:
+            if jobStep.componentType == "controller":
+                jobStep.deadline = self.deadline
+                stepStart = time.monotonic()
+                await jobStep.extract(self.controllerData)
+                # largest-first order also spreads the large applications evenly over the shards
+                await self.planRun(time.monotonic() - stepStart)
+
+        # the controller connection limit is shared between shards
+        concurrentConnections = max(1, AsyncioUtils.concurrentConnections // self.shards)
+        debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=self.shards, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = []
+            for jobController, credentialOverrides, hostInfo in zip(self.job, self.credentialOverrides, self.controllerData.values()):
+                controller: AppDService = hostInfo["controller"]
+                shardHostInfos = partitionApplications(hostInfo, self.shards)
+                logger.info(
+                    f"{controller.host} - Extracting {sum(len(hostInfo[componentType]) for componentType in COMPONENT_TYPES)} applications in {self.shards} shards"
+                )
+                for shardIdx, shardHostInfo in enumerate(shardHostInfos):
+                    shard = {
+                        "controller": jobController,
+                        "credentialOverrides": credentialOverrides,
+                        "cacheDir": self.cacheDir,
+                        "hostInfo": shardHostInfo,
+                        "startTime": controller.startTime,
+                        "endTime": controller.endTime,
+                        "concurrentConnections": concurrentConnections,
+                        "thresholds": self.thresholds,
+                        "deadline": self.deadline,
+                        "debug": debug,
+                        "shardIdx": shardIdx,
+                        "shardCount": self.shards,
+                    }
+                    futures.append((hostInfo, loop.run_in_executor(pool, runShard, shard)))
+
+            for hostInfo, future in futures:
+                shardResult = await future
+                mergeShard(hostInfo, shardResult["hostInfo"])
+                hostInfo["controller"].totalCallsProcessed += shardResult["totalCallsProcessed"]
+                hostInfo["controller"].redundantCalls.update(shardResult["redundantCalls"])
 
     def finalize(self, startTime):
         now = int(time.time())
@@ -483,20 +693,16 @@ class Engine:
                 indent=4,
             )
 
-        with open(os.path.join(job_output_dir, "controllerData.json"), "w", encoding="utf-8") as f:
-            json.dump(
-                self.controllerData,
-                fp=f,
-                default=jsonEncoder,
-                indent=4,
-            )
-
-        # createCxPpt(self.jobFileName)
-        createCxPptTemplate(self.jobFileName, self.output_dir)
+        if self.store is not None:
+            # the database already is the snapshot, dumping it to JSON would load every application at once
+            self.store.flush()
+            controller_data_path = self.store.path
+        else:
+            with open(os.path.join(job_output_dir, "controllerData.json"), "wb") as f:
+                jsonCodec.dump(self.controllerData, f, default=jsonEncoder)
+            controller_data_path = os.path.join(job_output_dir, "controllerData.json")
 
         logger.info(f"----------Complete----------")
-        # if controllerData.json file exists, delete it
-        controller_data_path = os.path.join(job_output_dir, "controllerData.json")
         if Path(controller_data_path).exists():
             sizeBytes = os.path.getsize(controller_data_path)
             sizeName = ("B", "KB", "MB", "GB")
@@ -517,12 +723,20 @@ class Engine:
             totalCalls = sum([controller.totalCallsProcessed for controller in self.controllers])
 
             logger.info(f"Total API calls made: {totalCalls}")
+            redundantCalls = sum((controller.redundantCalls for controller in self.controllers), Counter())
+            logger.info(f"Redundant API calls served by request coalescing: {sum(redundantCalls.values())}")
+            for endpoint, count in redundantCalls.most_common():
+                logger.info(f"    {endpoint}: {count}")
             logger.info(f"Size of data retrieved: {size} {sizeName[i]}")
             logger.info(f"Total execution time: {executionTimeString}")
 
     async def abortAndCleanup(self, msg: str, error=True):
         """Closes open controller connections"""
+        if error and not self.exitOnError:
+            # long-running callers keep their sessions open and handle the failure themselves
+            raise RuntimeError(msg)
         await AsyncioUtils.gatherWithConcurrency(*[controller.close() for controller in self.controllers])
+        self.closeStore()
         if error:
             logger.error(msg)
             sys.exit(1)
@@ -534,10 +748,9 @@ class Engine:
     async def postProcess(self):
         logger.info(f"----------Post Process----------")
         commands = []
-        commands.append(ConfigurationAnalysisReport(self.output_dir))
-
-        # after ALL reports generated archive a copy for safekeeping
-        commands.append(Archiver(self.output_dir))
+        for name in self.registry.groups["postProcessors"]:
+            kwargs = self.archiveRetention if name == "Archiver" else {}
+            commands.append(self.registry.get(name)(self.output_dir, **kwargs))
 
         for command in commands:
             await command.post_process(self.jobFileName)
@@ -0,0 +1,168 @@
+import logging
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from backend.api.appd.AppDService import DATA_COLLECTOR_PROBE_WAVE
+from backend.core.ControllerData import COMPONENT_TYPES
+
+logger = logging.getLogger(__name__.split('.')[-1])
+
+# used until a controller has answered enough calls to measure its latency
+DEFAULT_SECONDS_PER_CALL = 0.5
+
+
+@dataclass(frozen=True)
+class StepCost:
+    """API calls a JobStep makes per application, as listed in its extract docstring."""
+
+    perApplication: float = 0
+    # metric calls are split into one call per time slice
+    metricsPerApplication: float = 0
+    metricsPerTier: float = 0
+    nodeMetadata: bool = False
+
+
+STEP_COSTS = {
+    "CustomMetrics": StepCost(perApplication=1, metricsPerTier=1),
+    "Synthetics": StepCost(perApplication=4),
+    "AppAgentsAPM": StepCost(perApplication=1, metricsPerApplication=2, nodeMetadata=True),
+    "MachineAgentsAPM": StepCost(metricsPerApplication=1),
+    "BusinessTransactionsAPM": StepCost(perApplication=2, metricsPerApplication=1),
+    "BackendsAPM": StepCost(perApplication=3, metricsPerApplication=1),
+    "OverheadAPM": StepCost(perApplication=4),
+    "ServiceEndpointsAPM": StepCost(perApplication=1, metricsPerApplication=1),
+    "ErrorConfigurationAPM": StepCost(metricsPerApplication=1),
+    "HealthRulesAndAlertingAPM": StepCost(perApplication=3),
+    # one wave of snapshot probes, most applications stop there
+    "DataCollectorsAPM": StepCost(perApplication=1 + DATA_COLLECTOR_PROBE_WAVE),
+    "NetworkRequestsBRUM": StepCost(perApplication=6),
+    "HealthRulesAndAlertingBRUM": StepCost(perApplication=3),
+    "NetworkRequestsMRUM": StepCost(perApplication=3),
+    "HealthRulesAndAlertingMRUM": StepCost(perApplication=3),
+}
+
+
+@dataclass
+class ApplicationSize:
+    tiers: int = 0
+    nodes: int = 0
+
+
+@dataclass
+class StepEstimate:
+    jobStep: str
+    calls: int
+    seconds: float
+
+
+@dataclass
+class RunPlan:
+    """Estimated API calls and duration of the extraction still ahead for one controller."""
+
+    host: str
+    concurrency: int
+    secondsPerCall: float
+    applicationCounts: Dict[str, int]
+    nodeCount: int
+    steps: List[StepEstimate] = field(default_factory=list)
+
+    @property
+    def totalCalls(self) -> int:
+        return sum(step.calls for step in self.steps)
+
+    @property
+    def totalSeconds(self) -> float:
+        return sum(step.seconds for step in self.steps)
+
+    def log(self):
+        applications = ", ".join(f"{count} {componentType.upper()}" for componentType, count in self.applicationCounts.items())
+        logger.info(f"{self.host} - Plan for {applications} applications and {self.nodeCount} nodes")
+        for step in self.steps:
+            if step.calls:
+                logger.info(f"{self.host} -     {step.jobStep:<30} {step.calls:>9} calls {formatDuration(step.seconds):>10}")
+        logger.info(
+            f"{self.host} - Estimated {self.totalCalls} API calls in {formatDuration(self.totalSeconds)} "
+            f"at {self.concurrency} concurrent connections and {self.secondsPerCall:.2f}s per call"
+        )
+
+
+def formatDuration(seconds: float) -> str:
+    mins, secs = divmod(int(seconds), 60)
+    hours, mins = divmod(mins, 60)
+    if hours > 0:
+        return f"{hours}h {mins}m {secs}s"
+    if mins > 0:
+        return f"{mins}m {secs}s"
+    return f"{secs}s"
+
+
+def applicationSizes(hostInfo) -> Dict[str, ApplicationSize]:
+    """Tier and node counts per APM application name, taken from the app server agent inventory."""
+    tiers = {}
+    nodes = Counter()
+    for agent in hostInfo.get("appServerAgents") or []:
+        applicationName = agent.get("applicationName")
+        if applicationName is None:
+            continue
+        tiers.setdefault(applicationName, set()).add(agent.get("componentName"))
+        nodes[applicationName] += 1
+    return {applicationName: ApplicationSize(len(tiers[applicationName]), nodes[applicationName]) for applicationName in tiers}
+
+
+def planController(hostInfo, jobSteps: list, concurrency: int, secondsPerCall: float) -> RunPlan:
+    """Estimate the calls of every JobStep from application lists and the agent inventory extracted with the controller level details."""
+    controller = hostInfo["controller"]
+    sizes = applicationSizes(hostInfo)
+    metricSlices = len(controller.timeSlices(controller.timeRangeMins)) or 1
+
+    plan = RunPlan(
+        host=controller.host,
+        concurrency=concurrency,
+        secondsPerCall=secondsPerCall,
+        applicationCounts={componentType: len(hostInfo[componentType]) for componentType in COMPONENT_TYPES},
+        nodeCount=sum(size.nodes for size in sizes.values()),
+    )
+    for jobStep in jobSteps:
+        jobStepName = type(jobStep).__name__
+        cost = STEP_COSTS.get(jobStepName)
+        if cost is None:
+            continue
+        componentType = jobStep.componentType
+        calls = 0
+        for applicationName in hostInfo[componentType]:
+            size = sizes.get(applicationName, ApplicationSize()) if componentType == "apm" else ApplicationSize()
+            calls += cost.perApplication
+            calls += cost.metricsPerApplication * metricSlices
+            calls += cost.metricsPerTier * max(size.tiers, 1) * metricSlices
+            if cost.nodeMetadata and size.nodes:
+                calls += min(size.nodes, controller.nodeSampleSize or size.nodes)
+        calls = math.ceil(calls)
+        plan.steps.append(StepEstimate(jobStepName, calls, math.ceil(calls / concurrency) * secondsPerCall))
+    return plan
+
+
+def orderLargestFirst(hostInfo) -> Dict[str, list]:
+    """
+    Reorder every component type's applications so the largest start first and do not finish last, which shortens the makespan
+    of each JobStep. Returns the original order for restoreOrder.
+    """
+    sizes = applicationSizes(hostInfo)
+    originalOrder = {}
+    for componentType in COMPONENT_TYPES:
+        applications = hostInfo[componentType]
+        originalOrder[componentType] = list(applications)
+        # sorted() is stable, equally sized applications keep their relative order
+        for applicationName in sorted(applications, key=lambda name: -sizes.get(name, ApplicationSize()).nodes if componentType == "apm" else 0):
+            applications.move_to_end(applicationName)
+    return originalOrder
+
+
+def restoreOrder(hostInfo, originalOrder: Dict[str, list]):
+    """Put applications back into controller order so report rows do not depend on planning."""
+    for componentType, applicationNames in originalOrder.items():
+        applications = hostInfo[componentType]
+        for applicationName in applicationNames:
+            if applicationName in applications:
+                applications.move_to_end(applicationName)
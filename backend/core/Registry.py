@@ -0,0 +1,46 @@
+import importlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List
+
+logger = logging.getLogger(__name__.split('.')[-1])
+
+
+class Registry:
+    """
+    Named groups of job steps, reports and post-processors, registered by dotted path.
+    Modules are only imported the first time a component is requested, so heavy dependencies
+    (pandas, openpyxl, python-pptx, deepdiff) are not paid for at startup.
+    """
+
+    def __init__(self):
+        self.groups: Dict[str, List[str]] = OrderedDict()
+        self.paths: Dict[str, str] = {}
+        self.loaded = {}
+        self.instances: Dict[str, list] = {}
+        # dotted path -> seconds spent importing it
+        self.importTimings: Dict[str, float] = OrderedDict()
+
+    def register(self, group: str, *paths: str):
+        for path in paths:
+            name = path.rsplit(".", 1)[1]
+            self.groups.setdefault(group, []).append(name)
+            self.paths[name] = path
+
+    def get(self, name: str):
+        """Import and return the registered class or function."""
+        if name not in self.loaded:
+            modulePath, attribute = self.paths[name].rsplit(".", 1)
+            start = time.perf_counter()
+            module = importlib.import_module(modulePath)
+            self.importTimings[self.paths[name]] = time.perf_counter() - start
+            logger.debug(f"Loaded {name} in {self.importTimings[self.paths[name]]:.3f}s")
+            self.loaded[name] = getattr(module, attribute)
+        return self.loaded[name]
+
+    def instantiate(self, group: str) -> list:
+        """One shared instance of every component in group, in registration order."""
+        if group not in self.instances:
+            self.instances[group] = [self.get(name)() for name in self.groups[group]]
+        return self.instances[group]
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import sys
+from collections import OrderedDict
+
+from backend.core.ControllerData import COMPONENT_TYPES
+
+logger = logging.getLogger(__name__.split('.')[-1])
+
+
+def partitionApplications(hostInfo: dict, shardCount: int) -> list:
+    """
+    Split one controller's hostInfo into shardCount copies that share the controller level data
+    but each hold every shardCount-th application of every component type.
+    """
+    shards = []
+    for shardIdx in range(shardCount):
+        shardHostInfo = {key: value for key, value in hostInfo.items() if key != "controller"}
+        for componentType in COMPONENT_TYPES:
+            applications = list(hostInfo[componentType].items())
+            shardHostInfo[componentType] = OrderedDict(applications[shardIdx::shardCount])
+        shards.append(shardHostInfo)
+    return shards
+
+
+def mergeShard(hostInfo: dict, shardHostInfo: dict):
+    """Fold a finished shard back into the coordinator's hostInfo."""
+    for key, value in shardHostInfo.items():
+        if key in COMPONENT_TYPES:
+            hostInfo[key].update(value)
+        elif isinstance(value, dict) and isinstance(hostInfo.get(key), dict):
+            hostInfo[key].update(value)
+        elif isinstance(value, set) and isinstance(hostInfo.get(key), set):
+            hostInfo[key] |= value
+        else:
+            hostInfo[key] = value
+
+
+def runShard(shard: dict) -> dict:
+    """Process entry point: extract one shard of applications with a session of its own."""
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    return asyncio.run(_runShard(shard))
+
+
+async def _runShard(shard: dict) -> dict:
+    from backend.core.Engine import createControllerService, defaultRegistry
+    from backend.util.asyncio_utils import AsyncioUtils
+    from backend.util.logging_utils import initLogging
+
+    initLogging(shard["debug"])
+    AsyncioUtils.init(shard["concurrentConnections"])
+
+    controller = createControllerService(shard["controller"], *shard["credentialOverrides"], cacheDir=shard["cacheDir"])
+    # every shard must query the same time window as the coordinator
+    controller.startTime = shard["startTime"]
+    controller.endTime = shard["endTime"]
+    logger.info(f'{controller.host} - Shard {shard["shardIdx"] + 1}/{shard["shardCount"]} starting')
+
+    try:
+        login = await controller.getAuthMethod().authenticate()
+        if login.error is not None:
+            raise RuntimeError(f"{controller.host} - Shard {shard['shardIdx'] + 1} unable to log in: {login.error.msg}")
+
+        hostInfo = shard["hostInfo"]
+        hostInfo["controller"] = controller
+        controllerData = OrderedDict([(controller.host, hostInfo)])
+
+        registry = defaultRegistry()
+        for jobStep in [*registry.instantiate("otherSteps"), *registry.instantiate("maturityAssessmentSteps")]:
+            # controller level data was extracted once by the coordinator
+            if jobStep.componentType == "controller":
+                continue
+            jobStep.thresholds = shard["thresholds"]
+            # what the coordinator shed at dispatch stays shed, the rest is shed once the report reserve is reached
+            jobStep.deadline = shard["deadline"]
+            await jobStep.extract(controllerData)
+
+        del hostInfo["controller"]
+        logger.info(f'{controller.host} - Shard {shard["shardIdx"] + 1}/{shard["shardCount"]} done')
+        return {
+            "hostInfo": hostInfo,
+            "totalCallsProcessed": controller.totalCallsProcessed,
+            "redundantCalls": controller.redundantCalls,
+        }
+    finally:
+        await controller.close()
@@ -0,0 +1,325 @@
+import contextlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+from backend.core.ControllerData import COMPONENT_TYPES
+
+logger = logging.getLogger(__name__.split('.')[-1])
+
+# host level values that only make sense in the running process
+RESIDENT_KEYS = ["controller"]
+
+_HOST_NAMESPACE = ""
+
+
+class SqliteStore:
+    """
+    Embedded database behind a controllerData that does not have to fit in memory.
+    Every application and every host level value is one pickled row. Rows are loaded on access and stay cached, so callers
+    can keep mutating what they read, nested values included, exactly like with plain dicts. Changed values are written back
+    and the cache is trimmed to cacheSize only at release(), where the caller guarantees it holds none of them anymore,
+    or on any access inside readOnly(), where nothing read is modified.
+    """
+
+    def __init__(self, path: str, cacheSize: int = 256):
+        self.path = path
+        self.cacheSize = cacheSize
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS entities (
+                host TEXT NOT NULL,
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                PRIMARY KEY (host, namespace, key)
+            );
+            CREATE INDEX IF NOT EXISTS entitiesByPosition ON entities (host, namespace, position);
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                host TEXT NOT NULL,
+                jobStep TEXT NOT NULL,
+                chunk TEXT NOT NULL,
+                PRIMARY KEY (host, jobStep, chunk)
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            """
+        )
+        self.lock = threading.RLock()
+        self.transactionDepth = 0
+        self.readOnlyDepth = 0
+        # (host, namespace, key) -> [value, pickled bytes last written]
+        self.cache = OrderedDict()
+        self.reads = 0
+        self.writes = 0
+
+    @staticmethod
+    def create(path: str, cacheSize: int = 256) -> "SqliteStore":
+        """Fresh store, replacing the database of a previous run."""
+        for suffix in ["", "-wal", "-shm"]:
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        return SqliteStore(path, cacheSize)
+
+    def keys(self, host: str, namespace: str) -> list:
+        with self.lock:
+            rows = self.connection.execute("SELECT key FROM entities WHERE host = ? AND namespace = ? ORDER BY position", (host, namespace))
+            return [key for (key,) in rows]
+
+    def hosts(self) -> list:
+        with self.lock:
+            rows = self.connection.execute("SELECT host FROM entities GROUP BY host ORDER BY MIN(rowid)")
+            return [host for (host,) in rows]
+
+    def get(self, host: str, namespace: str, key: str):
+        cacheKey = (host, namespace, key)
+        with self.lock:
+            entry = self.cache.get(cacheKey)
+            if entry is not None:
+                self.cache.move_to_end(cacheKey)
+                return entry[0]
+            row = self.connection.execute("SELECT data FROM entities WHERE host = ? AND namespace = ? AND key = ?", cacheKey).fetchone()
+            if row is None:
+                raise KeyError(key)
+            self.reads += 1
+            value = pickle.loads(row[0])
+            self.cache[cacheKey] = [value, row[0]]
+            if self.readOnlyDepth:
+                self._trim()
+            return value
+
+    def put(self, host: str, namespace: str, key: str, position: int, value):
+        cacheKey = (host, namespace, key)
+        with self.lock:
+            data = self._write(cacheKey, position, value)
+            self.cache[cacheKey] = [value, data]
+            self.cache.move_to_end(cacheKey)
+            if self.readOnlyDepth:
+                self._trim()
+
+    def delete(self, host: str, namespace: str, key: str = None):
+        """Delete one row, or the whole namespace when key is None."""
+        with self.lock:
+            if key is None:
+                self.connection.execute("DELETE FROM entities WHERE host = ? AND namespace = ?", (host, namespace))
+                for cacheKey in [cacheKey for cacheKey in self.cache if cacheKey[:2] == (host, namespace)]:
+                    del self.cache[cacheKey]
+            else:
+                self.connection.execute("DELETE FROM entities WHERE host = ? AND namespace = ? AND key = ?", (host, namespace, key))
+                self.cache.pop((host, namespace, key), None)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Commit every write made inside at once. Nested transactions join the outermost one."""
+        with self.lock:
+            if self.transactionDepth == 0:
+                self.connection.execute("BEGIN")
+            self.transactionDepth += 1
+            try:
+                yield
+            except BaseException:
+                self.transactionDepth -= 1
+                if self.transactionDepth == 0:
+                    self.connection.execute("ROLLBACK")
+                raise
+            self.transactionDepth -= 1
+            if self.transactionDepth == 0:
+                self.connection.execute("COMMIT")
+
+    def flush(self):
+        """Write back every cached value that changed since it was loaded. Cached values stay cached."""
+        with self.transaction():
+            for cacheKey, entry in self.cache.items():
+                entry[1] = self._writeIfChanged(cacheKey, entry)
+
+    def release(self):
+        """
+        Called where no caller holds values read so far, like between JobSteps: write back what changed and trim the cache
+        to cacheSize. Values read before must not be modified afterwards, they may no longer be the stored ones.
+        """
+        with self.lock:
+            self.flush()
+            self._trim()
+
+    @contextlib.contextmanager
+    def readOnly(self):
+        """Inside, values read are not modified, e.g. by reports, so the cache is trimmed to cacheSize on every access."""
+        with self.lock:
+            self.readOnlyDepth += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.readOnlyDepth -= 1
+
+    def checkpoint(self, host: str, jobStep: str, chunk: str):
+        """
+        Record a finished piece of work, in one transaction with any writes of an enclosing transaction().
+        Like release(), the caller holds no values read so far.
+        """
+        with self.transaction():
+            self.release()
+            self.connection.execute("INSERT OR REPLACE INTO checkpoints (host, jobStep, chunk) VALUES (?, ?, ?)", (host, jobStep, chunk))
+
+    def checkpoints(self, host: str, jobStep: str) -> set:
+        with self.lock:
+            rows = self.connection.execute("SELECT chunk FROM checkpoints WHERE host = ? AND jobStep = ?", (host, jobStep))
+            return {chunk for (chunk,) in rows}
+
+    def getMeta(self, key: str, default=None):
+        with self.lock:
+            row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def setMeta(self, key: str, value):
+        with self.lock:
+            self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def close(self):
+        with self.lock:
+            self.flush()
+            self.cache.clear()
+            self.connection.close()
+        logger.debug(f"Closed {self.path} after {self.reads} reads and {self.writes} writes")
+
+    def _write(self, cacheKey, position, value) -> bytes:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self.connection.execute(
+            "INSERT INTO entities (host, namespace, key, position, data) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (host, namespace, key) DO UPDATE SET data = excluded.data",
+            (*cacheKey, position, data),
+        )
+        self.writes += 1
+        return data
+
+    def _writeIfChanged(self, cacheKey, entry) -> bytes:
+        data = pickle.dumps(entry[0], protocol=pickle.HIGHEST_PROTOCOL)
+        if data != entry[1]:
+            self.connection.execute("UPDATE entities SET data = ? WHERE host = ? AND namespace = ? AND key = ?", (data, *cacheKey))
+            self.writes += 1
+        return data
+
+    def _trim(self):
+        """Write back and drop least recently used values until cacheSize are left."""
+        while len(self.cache) > self.cacheSize:
+            cacheKey, entry = next(iter(self.cache.items()))
+            self._writeIfChanged(cacheKey, entry)
+            del self.cache[cacheKey]
+
+
+class LazyMap(MutableMapping):
+    """Ordered mapping whose values live in a SqliteStore namespace. Keys are kept in memory, values are loaded on access."""
+
+    def __init__(self, store: SqliteStore, host: str, namespace: str):
+        self.store = store
+        self.host = host
+        self.namespace = namespace
+        self.positions = {key: position for position, key in enumerate(store.keys(host, namespace))}
+        self.nextPosition = len(self.positions)
+
+    def __getitem__(self, key):
+        if key not in self.positions:
+            raise KeyError(key)
+        return self.store.get(self.host, self.namespace, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.positions:
+            self.positions[key] = self.nextPosition
+            self.nextPosition += 1
+        self.store.put(self.host, self.namespace, key, self.positions[key], value)
+
+    def __delitem__(self, key):
+        del self.positions[key]
+        self.store.delete(self.host, self.namespace, key)
+
+    def __iter__(self):
+        return iter(list(self.positions))
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def clear(self):
+        self.store.delete(self.host, self.namespace)
+        self.positions.clear()
+
+    def move_to_end(self, key):
+        """Like OrderedDict.move_to_end, for this process only. Stored positions and thus the order of a reopened store are unchanged."""
+        self.positions[key] = self.positions.pop(key)
+
+    def __json__(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.host!r}, {self.namespace!r}, {len(self)} entries)"
+
+
+class HostRecord(LazyMap):
+    """
+    Store-backed hostInfo. Assigning a mapping to "apm", "brum" or "mrum" turns it into a LazyMap with one row per application,
+    every other host level value is a row of its own, and the controller service stays in memory.
+    """
+
+    def __init__(self, store: SqliteStore, host: str):
+        super().__init__(store, host, _HOST_NAMESPACE)
+        self.resident = {}
+        self.components = {}
+        for componentType in COMPONENT_TYPES:
+            if store.keys(host, componentType) or componentType in self.positions:
+                self.components[componentType] = LazyMap(store, host, componentType)
+
+    def __getitem__(self, key):
+        if key in self.resident:
+            return self.resident[key]
+        if key in self.components:
+            return self.components[key]
+        return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        if key in RESIDENT_KEYS:
+            self.resident[key] = value
+            return
+        if key in COMPONENT_TYPES:
+            applications = self.components.get(key) or LazyMap(self.store, self.host, key)
+            applications.clear()
+            applications.update(value)
+            self.components[key] = applications
+            # remember the component in the host namespace so reopened stores and iteration order know about it
+            value = None
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        if key in self.resident:
+            del self.resident[key]
+            return
+        if key in self.components:
+            self.components.pop(key).clear()
+        super().__delitem__(key)
+
+    def __iter__(self):
+        return iter([*self.resident, *self.positions])
+
+    def __len__(self):
+        return len(self.resident) + len(self.positions)
+
+    def __contains__(self, key):
+        return key in self.resident or key in self.positions
+
+
+def openControllerData(path: str, cacheSize: int = 256) -> OrderedDict:
+    """Reopen the controllerData of a finished run, e.g. to replay analysis and reports without a controller."""
+    store = SqliteStore(path, cacheSize)
+    return OrderedDict((host, HostRecord(store, host)) for host in store.hosts())
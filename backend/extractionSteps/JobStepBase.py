@@ -6,10 +6,31 @@ from backend.util.excel_utils import Color, addFilterAndFreeze, resizeColumnWidt
 
 logger = logging.getLogger(__name__.split('.')[-1])
 
+# value of a metric whose optional extraction was shed to meet the run deadline, it is left out of the score
+NOT_ASSESSED = "not assessed"
+# prefix of a metric value only known to be at least the number that follows, e.g. "≥5" when probing stopped once the score was decided.
+# Only meaningful for metrics with direction "decreasing", where the bound alone decides which thresholds are met.
+AT_LEAST = "≥"
+
+
+def atLeast(value) -> str:
+    return f"{AT_LEAST}{value}"
+
+
+def thresholdValue(value):
+    """The number a threshold is compared with, the bound of an atLeast value."""
+    if isinstance(value, str) and value.startswith(AT_LEAST):
+        return int(value[len(AT_LEAST):])
+    return value
+
 
 class JobStepBase(ABC):
     def __init__(self, componentType: str):
         self.componentType = componentType
+        # thresholds of the running job, set before extraction so steps can stop probing once a score is decided
+        self.thresholds = None
+        # deadline of the running job, if any, see optionalWorkAllowed
+        self.deadline = None
 
     @abstractmethod
     async def extract(self, controllerData):
@@ -104,11 +125,13 @@ class JobStepBase(ABC):
             numCriteriaWhichComplyWithCurrentThresholdLevel = 0
 
             for thresholdLevelMetric in jobStepThresholds[thresholdLevel].keys():
-                if jobStepThresholds["direction"][thresholdLevelMetric] == "decreasing":
-                    if analysisDataEvaluatedMetrics[thresholdLevelMetric] >= jobStepThresholds[thresholdLevel][thresholdLevelMetric]:
+                if analysisDataEvaluatedMetrics[thresholdLevelMetric] == NOT_ASSESSED:
+                    numCriteriaWhichComplyWithCurrentThresholdLevel += 1
+                elif jobStepThresholds["direction"][thresholdLevelMetric] == "decreasing":
+                    if thresholdValue(analysisDataEvaluatedMetrics[thresholdLevelMetric]) >= jobStepThresholds[thresholdLevel][thresholdLevelMetric]:
                         numCriteriaWhichComplyWithCurrentThresholdLevel += 1
                 else:
-                    if analysisDataEvaluatedMetrics[thresholdLevelMetric] <= jobStepThresholds[thresholdLevel][thresholdLevelMetric]:
+                    if thresholdValue(analysisDataEvaluatedMetrics[thresholdLevelMetric]) <= jobStepThresholds[thresholdLevel][thresholdLevelMetric]:
                         numCriteriaWhichComplyWithCurrentThresholdLevel += 1
 
             if numCriteriaWhichComplyWithCurrentThresholdLevel == len(jobStepThresholds[thresholdLevel].keys()):
@@ -121,16 +144,19 @@ class JobStepBase(ABC):
         # This data goes into the 'JobStep - Metrics' xlsx sheet.
         for thresholdLevelMetric in analysisDataEvaluatedMetrics.keys():
             # Default to bronze, then loop through thresholds to apply correct color
+            if analysisDataEvaluatedMetrics[thresholdLevelMetric] == NOT_ASSESSED:
+                analysisDataEvaluatedMetrics[thresholdLevelMetric] = [NOT_ASSESSED, Color["white"]]
+                continue
             analysisDataEvaluatedMetrics[thresholdLevelMetric] = [
                 analysisDataEvaluatedMetrics[thresholdLevelMetric],
                 Color["bronze"],
             ]
             for thresholdLevel in thresholdLevels:
                 if jobStepThresholds["direction"][thresholdLevelMetric] == "decreasing":
-                    if analysisDataEvaluatedMetrics[thresholdLevelMetric][0] >= jobStepThresholds[thresholdLevel][thresholdLevelMetric]:
+                    if thresholdValue(analysisDataEvaluatedMetrics[thresholdLevelMetric][0]) >= jobStepThresholds[thresholdLevel][thresholdLevelMetric]:
                         analysisDataEvaluatedMetrics[thresholdLevelMetric][1] = Color[thresholdLevel]
                         break
                 else:
-                    if analysisDataEvaluatedMetrics[thresholdLevelMetric][0] <= jobStepThresholds[thresholdLevel][thresholdLevelMetric]:
+                    if thresholdValue(analysisDataEvaluatedMetrics[thresholdLevelMetric][0]) <= jobStepThresholds[thresholdLevel][thresholdLevelMetric]:
                         analysisDataEvaluatedMetrics[thresholdLevelMetric][1] = Color[thresholdLevel]
                         break
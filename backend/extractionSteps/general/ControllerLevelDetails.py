@@ -43,7 +43,9 @@ class ControllerLevelDetails(JobStepBase):
             hostInfo["analyticsEnabledStatus"] = (await controller.getAnalyticsEnabledStatusForAllApplications()).data
 
             logger.info(f'{hostInfo["controller"].host} - Extracting Dashboards')
-            hostInfo["exportedDashboards"] = (await controller.getDashboards()).data
+            # without details dashboards cannot be matched to applications, DashboardsAPM reports them as not assessed
+            hostInfo["dashboardDetailsFetched"] = self.optionalWorkAllowed("dashboardDetails")
+            hostInfo["exportedDashboards"] = (await controller.getDashboards(withDetails=hostInfo["dashboardDetailsFetched"])).data
 
             logger.info(f'{hostInfo["controller"].host} - Extracting Licenses')
             hostInfo["accountLicenseUsage"] = (await controller.getAccountUsageSummary()).data
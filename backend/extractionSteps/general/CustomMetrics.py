@@ -14,7 +14,8 @@ class CustomMetrics(JobStepBase):
     async def extract(self, controllerData):
         """
         Extract application customization details.
-        1. Makes one API call per application to get custom extensions.
+        1. Makes one API call per application to get its tiers.
+        2. Makes one API call per tier to get custom metrics, all tiers of all applications sharing one work queue.
         """
         jobStepName = type(self).__name__
 
@@ -27,27 +28,26 @@ class CustomMetrics(JobStepBase):
                 getTiersFutures.append(controller.getTiers(application["id"]))
             allTiers = await AsyncioUtils.gatherWithConcurrency(*getTiersFutures)
 
-            allCustomMetrics = []
-            for application, tiers in zip(hostInfo[self.componentType].values(), allTiers):
-                getCustomMetricsFutures = []
-                for tier in tiers.data:
-                    getCustomMetricsFutures.append(
-                        controller.getCustomMetrics(
-                            applicationID=application["id"],
-                            tierName=tier["name"],
-                        )
-                    )
-                customMetrics = await AsyncioUtils.gatherWithConcurrency(*getCustomMetricsFutures)
-                allCustomMetrics.append(customMetrics)
+            # one queue of (application, tier) requests across the whole controller, so small applications don't leave workers idle
+            tierRequests = [
+                (idx, application["id"], tier["name"])
+                for idx, (application, tiers) in enumerate(zip(hostInfo[self.componentType].values(), allTiers))
+                for tier in tiers.data
+            ]
+            customMetricsResults = await AsyncioUtils.mapWithConcurrency(
+                lambda request: controller.getCustomMetrics(applicationID=request[1], tierName=request[2]),
+                tierRequests,
+            )
+
+            allCustomMetrics = [set() for _ in allTiers]
+            for (idx, _, _), tier in zip(tierRequests, customMetricsResults):
+                for customMetric in tier.data:
+                    allCustomMetrics[idx].add(customMetric["name"])
 
             for idx, applicationName in enumerate(hostInfo[self.componentType]):
                 application = hostInfo[self.componentType][applicationName]
                 application["tiers"] = allTiers[idx].data
-                customMetrics = set()
-                for tier in allCustomMetrics[idx]:
-                    for customMetric in tier.data:
-                        customMetrics.add(customMetric["name"])
-                application["customMetrics"] = customMetrics
+                application["customMetrics"] = allCustomMetrics[idx]
 
     def analyze(self, controllerData, thresholds):
         pass
@@ -6,6 +6,7 @@ from collections import OrderedDict
 from backend.api.appd.AppDService import AppDService
 from backend.extractionSteps.JobStepBase import JobStepBase
 from backend.util.asyncio_utils import AsyncioUtils
+from backend.util.sampling_utils import stratifiedSample
 from backend.util.stdlib_utils import substringBetween
 
 
@@ -22,6 +23,8 @@ class AppAgentsAPM(JobStepBase):
         1. Makes one API call per application to get Node Metadata.
         2. Makes one API call per application to get Node App Agent Availability.
         3. Makes one API call per application to get Node Requests Exceeding Limit.
+        Applications with more than nodeSampleSize nodes only get metadata of a stratified sample of nodes per tier,
+        metadata is one call per node. Availability stays one wildcard call per application and covers every node.
         """
         jobStepName = type(self).__name__
 
@@ -108,9 +111,18 @@ class AppAgentsAPM(JobStepBase):
                     nodeIdToMetricLimitMap[tierName + "|" + nodeName] = nodeMetricsUploadedExceedingLimitCount
 
             nodeMetadataFutures = []
+            metadataNodeIds = []
             for nodesList, application in zip(nodes, (hostInfo[self.componentType].values())):
-                nodeIds = [node["id"] for node in nodesList.data]
-                nodeMetadataFutures.append(controller.getAppAgentMetadata(application["id"], nodeIds))
+                # Sample very large applications, the same nodes on every run.
+                application.pop("sampledNodeIds", None)
+                metadataNodes = nodesList.data
+                if controller.nodeSampleSize and len(nodesList.data) > controller.nodeSampleSize:
+                    metadataNodes = stratifiedSample(nodesList.data, controller.nodeSampleSize, lambda node: node["tierName"], application["id"])
+                    application["sampledNodeIds"] = [node["id"] for node in metadataNodes]
+                nodeIds = [node["id"] for node in metadataNodes]
+                agentVersions = [node.get("appAgentVersion") for node in metadataNodes]
+                metadataNodeIds.append(nodeIds)
+                nodeMetadataFutures.append(controller.getAppAgentMetadata(application["id"], nodeIds, agentVersions))
             nodeMetadata = await AsyncioUtils.gatherWithConcurrency(*nodeMetadataFutures)
 
             # Append node level information to overall host info
@@ -118,8 +130,10 @@ class AppAgentsAPM(JobStepBase):
             hostInfo["nodeIdMetaInfoMap"] = {}
             for idx, application in enumerate(hostInfo[self.componentType]):
                 hostInfo[self.componentType][application]["nodes"] = nodes[idx].data
-                for node, metadata in zip(nodes[idx].data, nodeMetadata[idx].data):
-                    node["metadata"] = metadata
+                metadataByNodeId = dict(zip(metadataNodeIds[idx], nodeMetadata[idx].data))
+                for node in nodes[idx].data:
+                    # None for nodes left out of the sample
+                    node["metadata"] = metadataByNodeId.get(node["id"])
                     try:
                         node["appAgentAvailability"] = nodeIdToAppAgentAvailabilityMap[node["tierName"] + "|" + node["name"]]
                     except (KeyError, TypeError):
@@ -260,5 +274,6 @@ class AppAgentsAPM(JobStepBase):
                 analysisDataRawMetrics["numberAppAgentsLessThan1YearOld"] = numberAppAgentsLessThan1YearOld
                 analysisDataRawMetrics["numberAppAgentsLessThan2YearsOld"] = numberAppAgentsLessThan2YearsOld
                 analysisDataRawMetrics["numberOfAgentsReportingData"] = numberAppAgentsReportingData
+                analysisDataRawMetrics["numberOfNodesSampled"] = len(application.get("sampledNodeIds", application["nodes"]))
 
                 self.applyThresholds(analysisDataEvaluatedMetrics, analysisDataRoot, jobStepThresholds)
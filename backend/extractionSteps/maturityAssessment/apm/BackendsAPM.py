@@ -1,6 +1,7 @@
 import logging
 from collections import OrderedDict
 
+from backend.api.MetricAggregate import MetricAggregate
 from backend.api.appd.AppDService import AppDService
 from backend.extractionSteps.JobStepBase import JobStepBase
 from backend.util.asyncio_utils import AsyncioUtils
@@ -45,6 +46,7 @@ class BackendsAPM(JobStepBase):
                         rollup=True,
                         time_range_type="BEFORE_NOW",
                         duration_in_mins=controller.timeRangeMins,
+                        reducer=MetricAggregate.fromMetricData,
                     )
                 )
             backends = await AsyncioUtils.gatherWithConcurrency(*getBackendsFutures)
@@ -56,16 +58,15 @@ class BackendsAPM(JobStepBase):
             for rolledUpMetrics in backendCallsPerMinute:
                 if rolledUpMetrics.error is not None:  # call to gather metrics failed for some reason (most likely 504)
                     continue
-                for backendMetric in rolledUpMetrics.data:
-                    try:
+                for metricPath, backendCallsPerMinuteMetric, hasValues in rolledUpMetrics.data:
+                    if hasValues:
                         # e.g. 'Backends|Discovered backend call - foo|Calls per Minute'
                         backendName = substringBetween(
-                            backendMetric["metricPath"],
+                            metricPath,
                             left="Discovered backend call - ",
                             right="|",
                         )
-                        backendCallsPerMinuteMetric = backendMetric["metricValues"][0]["sum"]
-                    except IndexError:
+                    else:
                         backendName = ""
                         backendCallsPerMinuteMetric = 0
                     backendNameToCallsPerMinuteMap[backendName] = backendCallsPerMinuteMetric
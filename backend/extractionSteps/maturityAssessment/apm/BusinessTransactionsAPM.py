@@ -1,6 +1,7 @@
 import logging
 from collections import OrderedDict
 
+from backend.api.MetricAggregate import MetricAggregate
 from backend.api.appd.AppDService import AppDService
 from backend.extractionSteps.JobStepBase import JobStepBase
 from backend.util.asyncio_utils import AsyncioUtils
@@ -38,6 +39,7 @@ class BusinessTransactionsAPM(JobStepBase):
                         rollup=True,
                         time_range_type="BEFORE_NOW",
                         duration_in_mins=controller.timeRangeMins,
+                        reducer=MetricAggregate.fromMetricData,
                     )
                 )
                 getAppLevelBtConfigFutures.append(controller.getAppLevelBTConfig(application["id"]))
@@ -81,15 +83,12 @@ class BusinessTransactionsAPM(JobStepBase):
                 # TODO: at least 1 business Transaction
 
                 # btLimitNotHit
-                numberOfBusinessTransactions = len(application["businessTransactionCallsPerMinute"])
+                businessTransactionCallsPerMinute: MetricAggregate = application["businessTransactionCallsPerMinute"]
+                numberOfBusinessTransactions = len(businessTransactionCallsPerMinute)
                 analysisDataEvaluatedMetrics["numberOfBTs"] = numberOfBusinessTransactions
 
                 # percentBTsWithLoad
-                businessTransactionsWithLoad = 0
-                for businessTransaction in application["businessTransactionCallsPerMinute"]:
-                    for metricValue in businessTransaction["metricValues"]:
-                        if metricValue["sum"] != 0:
-                            businessTransactionsWithLoad += 1
+                businessTransactionsWithLoad = businessTransactionCallsPerMinute.nonZeroCount
                 if numberOfBusinessTransactions != 0:
                     analysisDataEvaluatedMetrics["percentBTsWithLoad"] = (businessTransactionsWithLoad / numberOfBusinessTransactions) * 100
                 else:
@@ -2,7 +2,7 @@ import logging
 from collections import OrderedDict
 from datetime import datetime
 
-from backend.extractionSteps.JobStepBase import JobStepBase
+from backend.extractionSteps.JobStepBase import NOT_ASSESSED, JobStepBase
 from backend.util.stdlib_utils import get_recursively
 
 
@@ -68,6 +68,13 @@ class DashboardsAPM(JobStepBase):
                 # This data goes into the 'JobStep - Raw' xlsx sheet.
                 analysisDataRawMetrics = analysisDataRoot["raw"] = OrderedDict()
 
+                # dashboard details were shed to meet the run deadline
+                if not hostInfo.get("dashboardDetailsFetched", True):
+                    for metric in ["numberOfDashboards", "percentageOfDashboardsModifiedLast6Months", "numberOfDashboardsUsingBiQ"]:
+                        analysisDataEvaluatedMetrics[metric] = NOT_ASSESSED
+                    self.applyThresholds(analysisDataEvaluatedMetrics, analysisDataRoot, jobStepThresholds)
+                    continue
+
                 # numberOfDashboards
                 analysisDataEvaluatedMetrics["numberOfDashboards"] = len(application["apmDashboards"]) + len(application["biqDashboards"])
 
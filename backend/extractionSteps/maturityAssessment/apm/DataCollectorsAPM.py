@@ -2,7 +2,7 @@ import logging
 from collections import OrderedDict
 
 from backend.api.appd.AppDService import AppDService
-from backend.extractionSteps.JobStepBase import JobStepBase
+from backend.extractionSteps.JobStepBase import NOT_ASSESSED, JobStepBase, atLeast
 from backend.util.asyncio_utils import AsyncioUtils
 
 
@@ -17,9 +17,11 @@ class DataCollectorsAPM(JobStepBase):
         """
         Extract node level details.
         1. Makes one API call per application to get Data Collectors.
-        2. Makes one API call per Data Collector to get snapshots containing said Data Collector (max 1 result returned).
+        2. Makes one API call per Data Collector to get snapshots containing said Data Collector (max 1 result returned),
+           until enough Data Collectors are confirmed to reach the highest threshold. Skipped when behind the run deadline.
         """
         jobStepName = type(self).__name__
+        enoughConfirmed = self.enoughConfirmedDataCollectors()
 
         for host, hostInfo in controllerData.items():
             logger.info(f'{hostInfo["controller"].host} - Extracting {jobStepName}')
@@ -29,7 +31,9 @@ class DataCollectorsAPM(JobStepBase):
             getDataCollectorsFutures = []
 
             for application in hostInfo[self.componentType].values():
-                getDataCollectorsFutures.append(controller.getDataCollectorUsage(application["id"]))
+                getDataCollectorsFutures.append(
+                    controller.getDataCollectorUsage(application["id"], enoughConfirmed, probeSnapshots=self.optionalWorkAllowed("dataCollectorProbes"))
+                )
 
             dataCollectors = await AsyncioUtils.gatherWithConcurrency(*getDataCollectorsFutures)
 
@@ -37,10 +41,22 @@ class DataCollectorsAPM(JobStepBase):
                 application = hostInfo[self.componentType][applicationName]
                 application["dataCollectors"] = dataCollectors[idx].data
 
+    def enoughConfirmedDataCollectors(self):
+        """Confirmed Data Collector fields beyond the highest threshold cannot change the score."""
+        if self.thresholds is None:
+            return None
+        jobStepThresholds = self.thresholds[self.componentType][type(self).__name__]
+        return max(
+            jobStepThresholds[thresholdLevel][metric]
+            for thresholdLevel in ["platinum", "gold", "silver"]
+            for metric in ["numberOfDataCollectorFieldsCollectedInSnapshots", "numberOfDataCollectorFieldsCollectedInAnalytics"]
+        )
+
     def analyze(self, controllerData, thresholds):
         """
         Analysis of node level details.
         1. Determines number of Data Collector Fields.
+        Fields found in snapshots are written as e.g. "≥5" when probing stopped early, the exact count is unknown.
         """
 
         jobStepName = type(self).__name__
@@ -62,15 +78,23 @@ class DataCollectorsAPM(JobStepBase):
                 # numberOfDataCollectorFieldsConfigured
                 analysisDataEvaluatedMetrics["numberOfDataCollectorFieldsConfigured"] = len(application["dataCollectors"]["allDataCollectors"])
 
-                # numberOfDataCollectorFieldsCollectedInSnapshots
-                analysisDataEvaluatedMetrics["numberOfDataCollectorFieldsCollectedInSnapshots"] = len(
-                    application["dataCollectors"]["dataCollectorsPresentInSnapshots"]
-                )
+                unprobedDataCollectors = application["dataCollectors"].get("unprobedDataCollectors", 0)
+                if application["dataCollectors"].get("snapshotsAssessed", True):
+                    collectedInSnapshots = len(application["dataCollectors"]["dataCollectorsPresentInSnapshots"])
+                    collectedInAnalytics = len(application["dataCollectors"]["dataCollectorsPresentInAnalytics"])
+                    if unprobedDataCollectors:
+                        # probing stopped once the score was decided, the counts are lower bounds
+                        collectedInSnapshots, collectedInAnalytics = atLeast(collectedInSnapshots), atLeast(collectedInAnalytics)
 
-                # numberOfDataCollectorFieldsCollectedInAnalytics
-                analysisDataEvaluatedMetrics["numberOfDataCollectorFieldsCollectedInAnalytics"] = len(
-                    application["dataCollectors"]["dataCollectorsPresentInAnalytics"]
-                )
+                    # numberOfDataCollectorFieldsCollectedInSnapshots
+                    analysisDataEvaluatedMetrics["numberOfDataCollectorFieldsCollectedInSnapshots"] = collectedInSnapshots
+
+                    # numberOfDataCollectorFieldsCollectedInAnalytics
+                    analysisDataEvaluatedMetrics["numberOfDataCollectorFieldsCollectedInAnalytics"] = collectedInAnalytics
+                else:
+                    # snapshot probes were shed to meet the run deadline
+                    analysisDataEvaluatedMetrics["numberOfDataCollectorFieldsCollectedInSnapshots"] = NOT_ASSESSED
+                    analysisDataEvaluatedMetrics["numberOfDataCollectorFieldsCollectedInAnalytics"] = NOT_ASSESSED
 
                 # biqEnabled
                 biqEnabled = next(
@@ -79,4 +103,7 @@ class DataCollectorsAPM(JobStepBase):
                 )
                 analysisDataEvaluatedMetrics["biqEnabled"] = biqEnabled
 
+                # probing stopped once the score was decided, these fields were not checked
+                analysisDataRawMetrics["numberOfDataCollectorFieldsNotProbed"] = unprobedDataCollectors
+
                 self.applyThresholds(analysisDataEvaluatedMetrics, analysisDataRoot, jobStepThresholds)
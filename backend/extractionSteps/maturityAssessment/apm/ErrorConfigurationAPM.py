@@ -1,6 +1,7 @@
 import logging
 from collections import OrderedDict
 
+from backend.api.MetricAggregate import MetricAggregate
 from backend.api.appd.AppDService import AppDService
 from backend.extractionSteps.JobStepBase import JobStepBase
 from backend.util.asyncio_utils import AsyncioUtils
@@ -37,6 +38,7 @@ class ErrorConfigurationAPM(JobStepBase):
                         rollup=True,
                         time_range_type="BEFORE_NOW",
                         duration_in_mins=controller.timeRangeMins,
+                        reducer=MetricAggregate.fromMetricData,
                     )
                 )
 
@@ -72,26 +74,26 @@ class ErrorConfigurationAPM(JobStepBase):
                 # successPercentageOfWorstTransaction
                 # Create BT calls per minute lookup table
                 businessTransactionCallsPerMinuteMap = {}
-                for businessTransaction in application["businessTransactionCallsPerMinute"]:
-                    for metricValue in businessTransaction["metricValues"]:
+                for metricPath, callsPerMinute, hasValues in application["businessTransactionCallsPerMinute"]:
+                    if hasValues:
                         btName = substringBetween(
-                            businessTransaction["metricPath"],
+                            metricPath,
                             left="Business Transaction Performance|Business Transactions|",
                             right="|Calls per Minute",
                         )
-                        businessTransactionCallsPerMinuteMap[btName] = metricValue["sum"]
+                        businessTransactionCallsPerMinuteMap[btName] = callsPerMinute
                 # Iterate BT errors per minute to find worst performing BT
                 highestErrorPercentageOfAnyBusinessTransaction = 0
-                for businessTransaction in application["businessTransactionErrorsPerMinute"]:
-                    for metricValue in businessTransaction["metricValues"]:
+                for metricPath, errorsPerMinute, hasValues in application["businessTransactionErrorsPerMinute"]:
+                    if hasValues:
                         btName = substringBetween(
-                            businessTransaction["metricPath"],
+                            metricPath,
                             left="Business Transaction Performance|Business Transactions|",
                             right="|Errors per Minute",
                         )
                         try:
                             if businessTransactionCallsPerMinuteMap[btName] != 0:
-                                errorRate = metricValue["sum"] / businessTransactionCallsPerMinuteMap[btName] * 100
+                                errorRate = errorsPerMinute / businessTransactionCallsPerMinuteMap[btName] * 100
                             else:
                                 errorRate = 0
                             if errorRate > highestErrorPercentageOfAnyBusinessTransaction:
@@ -92,11 +92,12 @@ class HealthRulesAndAlertingAPM(JobStepBase):
                 defaultHealthRulesModified = 0
                 for hrName, heathRule in defaultHealthRules.items():
                     if hrName in application["healthRules"]:
-                        del application["healthRules"][hrName]["id"]
+                        # the definition is shared between applications, leave it as it is and skip the per-application id
                         healthRuleDiff = DeepDiff(
                             defaultHealthRules[hrName],
                             application["healthRules"][hrName],
                             ignore_order=True,
+                            exclude_paths=["root['id']"],
                         )
                         if healthRuleDiff != {}:
                             defaultHealthRulesModified += 1
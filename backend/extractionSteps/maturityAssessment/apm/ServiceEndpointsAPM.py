@@ -1,6 +1,7 @@
 import logging
 from collections import OrderedDict
 
+from backend.api.MetricAggregate import MetricAggregate
 from backend.api.appd.AppDService import AppDService
 from backend.extractionSteps.JobStepBase import JobStepBase
 from backend.util.asyncio_utils import AsyncioUtils
@@ -36,6 +37,7 @@ class ServiceEndpointsAPM(JobStepBase):
                         rollup=True,
                         time_range_type="BEFORE_NOW",
                         duration_in_mins=controller.timeRangeMins,
+                        reducer=MetricAggregate.fromMetricData,
                     )
                 )
                 getServiceEndpointMatchRulesFutures.append(controller.getServiceEndpointMatchRules(application["id"]))
@@ -99,11 +101,7 @@ class ServiceEndpointsAPM(JobStepBase):
                 analysisDataEvaluatedMetrics["serviceEndpointLimitNotHit"] = not (applicationContributingToSepLimit and serviceEndpointLimitHit)
 
                 # percentServiceEndpointsWithLoadOrDisabled
-                numberOfServiceEndpointsWithLoad = 0
-                for serviceEndpoint in application["serviceEndpoints"]:
-                    for metricValue in serviceEndpoint["metricValues"]:
-                        if metricValue["sum"] != 0:
-                            numberOfServiceEndpointsWithLoad += 1
+                numberOfServiceEndpointsWithLoad = application["serviceEndpoints"].nonZeroCount
                 serviceEndpointAutoDetectionEnabled = False
                 for defaultRule in application["serviceEndpointDefaultMatchRules"]:
                     for ruleType in defaultRule.data:
@@ -3,7 +3,7 @@ from collections import OrderedDict
 from itertools import count
 
 from backend.api.appd.AppDService import AppDService
-from backend.extractionSteps.JobStepBase import JobStepBase
+from backend.extractionSteps.JobStepBase import NOT_ASSESSED, JobStepBase
 from backend.util.asyncio_utils import AsyncioUtils
 
 
@@ -31,13 +31,15 @@ class NetworkRequestsBRUM(JobStepBase):
             getAJAXConfigFutures = []
             getVirtualPagesConfigFutures = []
             getBrowserSnapshotsWithServerSnapshotsFutures = []
+            snapshotChecks = self.optionalWorkAllowed("snapshotChecks")
             for application in hostInfo[self.componentType].values():
                 getEumPageListViewDataFutures.append(controller.getEumPageListViewData(application["id"]))
                 getEumNetworkRequestListFutures.append(controller.getEumNetworkRequestList(application["id"]))
                 getPagesAndFramesConfigFutures.append(controller.getPagesAndFramesConfig(application["id"]))
                 getAJAXConfigFutures.append(controller.getAJAXConfig(application["id"]))
                 getVirtualPagesConfigFutures.append(controller.getVirtualPagesConfig(application["id"]))
-                getBrowserSnapshotsWithServerSnapshotsFutures.append(controller.getBrowserSnapshotsWithServerSnapshots(application["id"]))
+                if snapshotChecks:
+                    getBrowserSnapshotsWithServerSnapshotsFutures.append(controller.getBrowserSnapshotsWithServerSnapshots(application["id"]))
 
             eumPageListViewData = await AsyncioUtils.gatherWithConcurrency(*getEumPageListViewDataFutures)
             eumNetworkRequestList = await AsyncioUtils.gatherWithConcurrency(*getEumNetworkRequestListFutures)
@@ -52,7 +54,10 @@ class NetworkRequestsBRUM(JobStepBase):
                 hostInfo[self.componentType][application]["pagesAndFramesConfig"] = pagesAndFramesConfig[idx].data
                 hostInfo[self.componentType][application]["ajaxConfig"] = ajaxConfig[idx].data
                 hostInfo[self.componentType][application]["virtualPagesConfig"] = virtualPagesConfig[idx].data
-                hostInfo[self.componentType][application]["browserSnapshotsWithServerSnapshots"] = browserSnapshotsWithServerSnapshots[idx].data
+                # None when snapshot checks were shed to meet the run deadline
+                hostInfo[self.componentType][application]["browserSnapshotsWithServerSnapshots"] = (
+                    browserSnapshotsWithServerSnapshots[idx].data if snapshotChecks else None
+                )
 
     def analyze(self, controllerData, thresholds):
         """
@@ -128,11 +133,15 @@ class NetworkRequestsBRUM(JobStepBase):
                 analysisDataRawMetrics["numberOfCustomVirtualIncludeRules"] = numberOfCustomVirtualIncludeRules
                 analysisDataRawMetrics["numberOfCustomVirtualExcludeRules"] = numberOfCustomVirtualExcludeRules
 
-                numBrowserSnapshotsWithServerSnapshots = 0
-                if application["browserSnapshotsWithServerSnapshots"].get("snapshots"):
-                    numBrowserSnapshotsWithServerSnapshots = len(application["browserSnapshotsWithServerSnapshots"]["snapshots"])
-                analysisDataEvaluatedMetrics["hasBtCorrelation"] = numBrowserSnapshotsWithServerSnapshots > 0
-                analysisDataRawMetrics["numberOfBrowserSnapshots"] = numBrowserSnapshotsWithServerSnapshots
+                if application["browserSnapshotsWithServerSnapshots"] is None:
+                    analysisDataEvaluatedMetrics["hasBtCorrelation"] = NOT_ASSESSED
+                    analysisDataRawMetrics["numberOfBrowserSnapshots"] = NOT_ASSESSED
+                else:
+                    numBrowserSnapshotsWithServerSnapshots = 0
+                    if application["browserSnapshotsWithServerSnapshots"].get("snapshots"):
+                        numBrowserSnapshotsWithServerSnapshots = len(application["browserSnapshotsWithServerSnapshots"]["snapshots"])
+                    analysisDataEvaluatedMetrics["hasBtCorrelation"] = numBrowserSnapshotsWithServerSnapshots > 0
+                    analysisDataRawMetrics["numberOfBrowserSnapshots"] = numBrowserSnapshotsWithServerSnapshots
 
                 analysisDataEvaluatedMetrics["hasCustomEventServiceIncludeRule"] = len(application["ajaxConfig"]["eventServiceIncludeRules"]) > 0
                 analysisDataRawMetrics["numberOfCustomEventServiceIncludeRules"] = len(application["ajaxConfig"]["eventServiceIncludeRules"])
@@ -3,7 +3,7 @@ from collections import OrderedDict
 from itertools import count
 
 from backend.api.appd.AppDService import AppDService
-from backend.extractionSteps.JobStepBase import JobStepBase
+from backend.extractionSteps.JobStepBase import NOT_ASSESSED, JobStepBase
 from backend.util.asyncio_utils import AsyncioUtils
 
 
@@ -28,14 +28,16 @@ class NetworkRequestsMRUM(JobStepBase):
             getMRUMNetworkRequestConfigFutures = []
             getNetworkRequestLimitFutures = []
             getMobileSnapshotsWithServerSnapshotsFutures = []
+            snapshotChecks = self.optionalWorkAllowed("snapshotChecks")
             for application in hostInfo[self.componentType].values():
                 getMRUMNetworkRequestConfigFutures.append(controller.getMRUMNetworkRequestConfig(application["applicationId"]))
                 getNetworkRequestLimitFutures.append(controller.getNetworkRequestLimit(application["mobileAppId"]))
-                getMobileSnapshotsWithServerSnapshotsFutures.append(
-                    controller.getMobileSnapshotsWithServerSnapshots(
-                        application["applicationId"], application["mobileAppId"], application["platform"]
+                if snapshotChecks:
+                    getMobileSnapshotsWithServerSnapshotsFutures.append(
+                        controller.getMobileSnapshotsWithServerSnapshots(
+                            application["applicationId"], application["mobileAppId"], application["platform"]
+                        )
                     )
-                )
 
             mrumNetworkRequestConfigs = await AsyncioUtils.gatherWithConcurrency(*getMRUMNetworkRequestConfigFutures)
             networkRequestLimits = await AsyncioUtils.gatherWithConcurrency(*getNetworkRequestLimitFutures)
@@ -46,7 +48,8 @@ class NetworkRequestsMRUM(JobStepBase):
 
                 application["eumPageListViewData"] = mrumNetworkRequestConfigs[idx].data
                 application["networkRequestLimit"] = networkRequestLimits[idx].data
-                application["mobileSnapshotsWithServerSnapshots"] = mobileSnapshotsWithServerSnapshots[idx].data
+                # None when snapshot checks were shed to meet the run deadline
+                application["mobileSnapshotsWithServerSnapshots"] = mobileSnapshotsWithServerSnapshots[idx].data if snapshotChecks else None
 
     def analyze(self, controllerData, thresholds):
         """
@@ -86,8 +89,12 @@ class NetworkRequestsMRUM(JobStepBase):
 
                 analysisDataEvaluatedMetrics["numberCustomMatchRules"] = numberOfCustomIncludeRules + numberOfCustomExcludeRules
 
-                analysisDataEvaluatedMetrics["hasBtCorrelation"] = len(application["mobileSnapshotsWithServerSnapshots"]) > 0
-                analysisDataRawMetrics["numberOfMobileSnapshots"] = len(application["mobileSnapshotsWithServerSnapshots"])
+                if application["mobileSnapshotsWithServerSnapshots"] is None:
+                    analysisDataEvaluatedMetrics["hasBtCorrelation"] = NOT_ASSESSED
+                    analysisDataRawMetrics["numberOfMobileSnapshots"] = NOT_ASSESSED
+                else:
+                    analysisDataEvaluatedMetrics["hasBtCorrelation"] = len(application["mobileSnapshotsWithServerSnapshots"]) > 0
+                    analysisDataRawMetrics["numberOfMobileSnapshots"] = len(application["mobileSnapshotsWithServerSnapshots"])
 
                 analysisDataEvaluatedMetrics["hasCustomEventServiceIncludeRule"] = (
                     len(application["eumPageListViewData"]["eventServiceIncludeRules"]) > 0
@@ -1,63 +1,287 @@
+import gzip
+import hashlib
+import json
 import logging
 import os
 import shutil
 from datetime import datetime
 
-import pandas as pd
-import xlsxwriter
+import click
 
 from backend.output.PostProcessReport import PostProcessReport
 
-light_font = '#FFFFFF'
-dark_font = '#000000'
+try:
+    import zstandard
+except ImportError:  # optional, fall back to gzip from the standard library
+    zstandard = None
 
-medium_bg = '#A0A0A0'
-dark_bg = '#000000'
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+CHUNK_SIZE = 1024 * 1024
 
 
 class Archiver(PostProcessReport):
+    """
+    Content-addressed archive of job outputs.
 
-    def __init__(self, output_base_dir="output"):
+    output/archive/
+        blobs/<aa>/<sha256>.<zst|gz>      one compressed copy of every distinct file content
+        manifests/<job>/<timestamp>.json  logical file name -> blob for one run
+        manifests/<job>/index.json        every run of the job, used for listing, retention and blob GC
+
+    Unchanged reports are stored once no matter how many runs reference them.
+    """
+
+    def __init__(self, output_base_dir="output", keepLastRuns: int = None, keepDailyRuns: int = None, keepWeeklyRuns: int = None):
         self.output_base_dir = output_base_dir
-        self.workbook = None
-        self.analysis_sheet = None
+        self.archive_directory = os.path.join(output_base_dir, "archive")
+        self.blob_directory = os.path.join(self.archive_directory, "blobs")
+        self.manifest_directory = os.path.join(self.archive_directory, "manifests")
+        self.keepLastRuns = keepLastRuns
+        self.keepDailyRuns = keepDailyRuns
+        self.keepWeeklyRuns = keepWeeklyRuns
 
     async def post_process(self, jobFileName):
         logging.info(f"Archiving generated report for job: {jobFileName}")
 
-        # Define source and archive directories
         source_directory = os.path.join(self.output_base_dir, jobFileName)
-        archive_directory = os.path.join(self.output_base_dir, "archive")
-
-        # Ensure the archive directory exists
-        if not os.path.exists(archive_directory):
-            os.makedirs(archive_directory)
-            logging.info(f"Created archive directory: {archive_directory}")
-
-        # Get current timestamp in the format YYYYMMDD_HHMMSS
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        # Iterate through files in the source directory
-        if os.path.exists(source_directory):
-            for file_name in os.listdir(source_directory):
-                # Skip `controllerData.json` and any files starting with `info`
-                if file_name == "controllerData.json" or file_name.startswith("info"):
-                    logging.info(f"Skipping file: {file_name}")
-                    continue
-
-                source_file_path = os.path.join(source_directory, file_name)
-
-                # Skip directories, only process files
-                if os.path.isfile(source_file_path):
-                    # Construct the new filename with the timestamp
-                    base_name, ext = os.path.splitext(file_name)
-                    new_file_name = f"{base_name}_{timestamp}{ext}"
-
-                    # Destination file path
-                    destination_file_path = os.path.join(archive_directory, new_file_name)
-
-                    # Copy file to the archive directory
-                    shutil.copy2(source_file_path, destination_file_path)
-                    logging.info(f"Archiving a backup copy at: {destination_file_path}")
-        else:
-            logging.error(f"Source directory {source_directory} does not exist.")
\ No newline at end of file
+        if not os.path.exists(source_directory):
+            logging.error(f"Source directory {source_directory} does not exist.")
+            return
+
+        timestamp = self.newRunId(jobFileName)
+        files = {}
+        for file_name in sorted(os.listdir(source_directory)):
+            # Skip `controllerData.json`/`.sqlite` and any files starting with `info`
+            if file_name.startswith("controllerData.") or file_name.startswith("info"):
+                logging.info(f"Skipping file: {file_name}")
+                continue
+
+            source_file_path = os.path.join(source_directory, file_name)
+            if os.path.isfile(source_file_path):
+                files[file_name] = self.storeBlob(source_file_path)
+
+        self.writeManifest(jobFileName, timestamp, files)
+        stored = sum(1 for entry in files.values() if entry["new"])
+        logging.info(f"Archived {len(files)} file(s) for run {timestamp}, {stored} new blob(s), {len(files) - stored} deduplicated.")
+
+        self.applyRetention(jobFileName, currentRun=timestamp)
+
+    def newRunId(self, jobFileName: str) -> str:
+        """Timestamp of a new run, with a -N suffix when a run of the same job was already archived within that second."""
+        timestamp = datetime.now().strftime(TIMESTAMP_FORMAT)
+        taken = {run["timestamp"] for run in self.listRuns(jobFileName)}
+        runId, suffix = timestamp, 1
+        while runId in taken or os.path.exists(os.path.join(self.manifest_directory, jobFileName, f"{runId}.json")):
+            suffix += 1
+            runId = f"{timestamp}-{suffix}"
+        return runId
+
+    def storeBlob(self, file_path: str) -> dict:
+        """Hash a file and store it compressed under its digest unless an identical blob already exists."""
+        sha256 = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+
+        existing = self._findBlob(digest)
+        if existing is not None:
+            return {"blob": digest, "codec": existing, "size": os.path.getsize(file_path), "new": False}
+
+        codec = "zst" if zstandard is not None else "gz"
+        blob_path = self._blobPath(digest, codec)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+
+        tmp_path = f"{blob_path}.tmp"
+        with open(file_path, "rb") as src, open(tmp_path, "wb") as dst:
+            if codec == "zst":
+                with zstandard.ZstdCompressor().stream_writer(dst, closefd=False) as writer:
+                    shutil.copyfileobj(src, writer, CHUNK_SIZE)
+            else:
+                with gzip.GzipFile(fileobj=dst, mode="wb", mtime=0) as writer:
+                    shutil.copyfileobj(src, writer, CHUNK_SIZE)
+        os.replace(tmp_path, blob_path)
+
+        return {"blob": digest, "codec": codec, "size": os.path.getsize(file_path), "new": True}
+
+    def writeManifest(self, jobFileName: str, timestamp: str, files: dict):
+        job_manifest_directory = os.path.join(self.manifest_directory, jobFileName)
+        os.makedirs(job_manifest_directory, exist_ok=True)
+
+        manifest = {
+            "job": jobFileName,
+            "timestamp": timestamp,
+            "files": {name: {"blob": entry["blob"], "codec": entry["codec"], "size": entry["size"]} for name, entry in files.items()},
+        }
+        self._writeJson(os.path.join(job_manifest_directory, f"{timestamp}.json"), manifest)
+
+        index = self.listRuns(jobFileName)
+        index = [run for run in index if run["timestamp"] != timestamp]
+        index.append(
+            {
+                "timestamp": timestamp,
+                "files": len(files),
+                "size": sum(entry["size"] for entry in files.values()),
+                "blobs": sorted({entry["blob"] for entry in files.values()}),
+            }
+        )
+        index.sort(key=lambda run: _runKey(run["timestamp"]), reverse=True)
+        self._writeJson(os.path.join(job_manifest_directory, "index.json"), index)
+
+    def listRuns(self, jobFileName: str) -> list:
+        """Archived runs of a job, newest first, read from the job index."""
+        index_path = os.path.join(self.manifest_directory, jobFileName, "index.json")
+        if not os.path.exists(index_path):
+            return []
+        with open(index_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def readManifest(self, jobFileName: str, timestamp: str) -> dict:
+        with open(os.path.join(self.manifest_directory, jobFileName, f"{timestamp}.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def restore(self, jobFileName: str, timestamp: str, destination: str) -> list:
+        """Restore every file of an archived run into destination. Returns the restored file paths."""
+        manifest = self.readManifest(jobFileName, timestamp)
+        os.makedirs(destination, exist_ok=True)
+
+        restored = []
+        for file_name, entry in manifest["files"].items():
+            target = os.path.join(destination, file_name)
+            with open(self._blobPath(entry["blob"], entry["codec"]), "rb") as src, open(target, "wb") as dst:
+                if entry["codec"] == "zst":
+                    if zstandard is None:
+                        raise RuntimeError(f"Blob {entry['blob']} is zstd compressed but the zstandard package is not installed.")
+                    with zstandard.ZstdDecompressor().stream_reader(src) as reader:
+                        shutil.copyfileobj(reader, dst, CHUNK_SIZE)
+                else:
+                    with gzip.GzipFile(fileobj=src, mode="rb") as reader:
+                        shutil.copyfileobj(reader, dst, CHUNK_SIZE)
+            restored.append(target)
+        return restored
+
+    def applyRetention(self, jobFileName: str, currentRun: str = None):
+        """
+        Drop runs outside the retention policy, then delete blobs no longer referenced by any job.
+        A run is kept if it is one of the last N runs, or the newest run of one of the last D days or W weeks.
+        With no policy configured every run is kept, and the run just archived is kept whatever the policy says.
+        """
+        if self.keepLastRuns is None and self.keepDailyRuns is None and self.keepWeeklyRuns is None:
+            return
+
+        runs = self.listRuns(jobFileName)
+        keep = self.retainedRuns(runs)
+        if currentRun is not None:
+            keep.add(currentRun)
+
+        expired = [run for run in runs if run["timestamp"] not in keep]
+        if not expired:
+            return
+
+        job_manifest_directory = os.path.join(self.manifest_directory, jobFileName)
+        for run in expired:
+            manifest_path = os.path.join(job_manifest_directory, f"{run['timestamp']}.json")
+            if os.path.exists(manifest_path):
+                os.remove(manifest_path)
+        self._writeJson(os.path.join(job_manifest_directory, "index.json"), [run for run in runs if run["timestamp"] in keep])
+        logging.info(f"Archive retention removed {len(expired)} run(s) of {jobFileName}")
+
+        self.collectGarbage()
+
+    def retainedRuns(self, runs: list) -> set:
+        """Timestamps of the runs, newest first, the retention policy keeps."""
+        keep = set()
+        if self.keepLastRuns is not None:
+            keep.update(run["timestamp"] for run in runs[: self.keepLastRuns])
+        if self.keepDailyRuns is not None:
+            keep.update(self._rollUp(runs, lambda ts: ts.date(), self.keepDailyRuns))
+        if self.keepWeeklyRuns is not None:
+            keep.update(self._rollUp(runs, lambda ts: ts.isocalendar()[:2], self.keepWeeklyRuns))
+        return keep
+
+    def collectGarbage(self):
+        """Delete blobs not referenced by any job index."""
+        if not os.path.exists(self.blob_directory):
+            return
+
+        referenced = set()
+        if os.path.exists(self.manifest_directory):
+            for jobFileName in os.listdir(self.manifest_directory):
+                for run in self.listRuns(jobFileName):
+                    referenced.update(run["blobs"])
+
+        removed = 0
+        for prefix in os.listdir(self.blob_directory):
+            prefix_directory = os.path.join(self.blob_directory, prefix)
+            for blob_name in os.listdir(prefix_directory):
+                if blob_name.split(".")[0] not in referenced:
+                    os.remove(os.path.join(prefix_directory, blob_name))
+                    removed += 1
+        if removed:
+            logging.info(f"Archive garbage collection removed {removed} unreferenced blob(s)")
+
+    @staticmethod
+    def _rollUp(runs: list, bucketOf, count: int) -> set:
+        kept = set()
+        buckets = []
+        for run in runs:  # newest first, so the first run seen is the newest of its bucket
+            bucket = bucketOf(datetime.strptime(_runKey(run["timestamp"])[0], TIMESTAMP_FORMAT))
+            if bucket in buckets:
+                continue
+            if len(buckets) == count:
+                break
+            buckets.append(bucket)
+            kept.add(run["timestamp"])
+        return kept
+
+    def _blobPath(self, digest: str, codec: str) -> str:
+        return os.path.join(self.blob_directory, digest[:2], f"{digest}.{codec}")
+
+    def _findBlob(self, digest: str):
+        for codec in ("zst", "gz"):
+            if os.path.exists(self._blobPath(digest, codec)):
+                return codec
+        return None
+
+    @staticmethod
+    def _writeJson(path: str, data):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_path, path)
+
+
+def _runKey(runId: str) -> tuple:
+    """(timestamp, N) of a run id, N being 1 for the first run of a second and the -N suffix of later ones."""
+    timestamp, _, suffix = runId.partition("-")
+    return timestamp, int(suffix or 1)
+
+
+@click.group()
+@click.option("-o", "--output-dir", default="output")
+@click.pass_context
+def cli(ctx, output_dir):
+    ctx.obj = Archiver(output_dir)
+
+
+@cli.command("list")
+@click.argument("job_file")
+@click.pass_obj
+def listCommand(archiver: Archiver, job_file: str):
+    for run in archiver.listRuns(job_file):
+        click.echo(f'{run["timestamp"]}  {run["files"]} files  {run["size"]} bytes')
+
+
+@cli.command("restore")
+@click.argument("job_file")
+@click.argument("timestamp")
+@click.option("--to", "destination", default=None)
+@click.pass_obj
+def restoreCommand(archiver: Archiver, job_file: str, timestamp: str, destination: str):
+    destination = destination or os.path.join(archiver.archive_directory, "restored", job_file, timestamp)
+    for path in archiver.restore(job_file, timestamp, destination):
+        click.echo(path)
+
+
+if __name__ == "__main__":
+    cli()
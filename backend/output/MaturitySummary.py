@@ -0,0 +1,63 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+
+@dataclass
+class ApplicationSummary:
+    controller: str
+    componentType: str
+    name: str
+    applicationId: Any
+    description: str
+    # JobStep name -> computed score (bronze/silver/gold/platinum)
+    scores: Dict[str, str] = field(default_factory=dict)
+    # JobStep name -> evaluated metric name -> value
+    metrics: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @property
+    def overallAssessment(self) -> str:
+        return next((score for jobStep, score in self.scores.items() if jobStep.startswith("OverallAssessment")), None)
+
+
+@dataclass
+class MaturitySummary:
+    """Per-application tiers and evaluated metrics of one component type, taken from analyzed controllerData."""
+
+    componentType: str
+    applications: List[ApplicationSummary] = field(default_factory=list)
+
+    @staticmethod
+    def fromControllerData(controllerData, jobs, componentType: str) -> "MaturitySummary":
+        jobStepNames = [type(jobStep).__name__ for jobStep in jobs if jobStep.componentType == componentType]
+
+        summary = MaturitySummary(componentType)
+        for host, hostInfo in controllerData.items():
+            for component in hostInfo[componentType].values():
+                application = ApplicationSummary(
+                    controller=hostInfo["controller"].host,
+                    componentType=componentType,
+                    name=component["name"],
+                    applicationId=component["applicationId"] if componentType == "mrum" else component["id"],
+                    description=component.get("description", ""),
+                )
+                for jobStepName in jobStepNames:
+                    application.scores[jobStepName] = component[jobStepName]["computed"][0]
+                    # evaluated metrics are [value, Color] once thresholds have been applied
+                    application.metrics[jobStepName] = {
+                        metric: value[0] if isinstance(value, list) else value for metric, value in component[jobStepName]["evaluated"].items()
+                    }
+                summary.applications.append(application)
+        return summary
+
+    @property
+    def totalApplications(self) -> int:
+        return len(self.applications)
+
+    def countWithScore(self, score: str) -> int:
+        return sum(1 for application in self.applications if application.overallAssessment == score)
+
+    def appsWithScore(self, score: str) -> List[str]:
+        return [application.name for application in self.applications if application.overallAssessment == score]
+
+    def valuesInColumn(self, jobStepName: str, metric: str) -> List[Any]:
+        return [application.metrics[jobStepName][metric] for application in self.applications if metric in application.metrics.get(jobStepName, {})]
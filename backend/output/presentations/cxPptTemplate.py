@@ -1,17 +1,17 @@
-import json
 import logging
 import os
 from datetime import datetime
 from enum import Enum
 from typing import List
 
-from openpyxl import load_workbook
 from pptx import Presentation
 from pptx.dml.color import RGBColor
 from pptx.slide import Slide
 from pptx.util import Inches, Pt
 from tzlocal import get_localzone
 
+from backend.output.MaturitySummary import MaturitySummary
+
 class Color(Enum):
     WHITE = RGBColor(255, 255, 255)
     BLACK = RGBColor(0, 0, 0)
@@ -189,27 +189,12 @@ def addTable(slide, data, fontSize: int = 16, left: float = None, top: float = 3
                     run.font.size = Pt(fontSize)
                     run.font.color.rgb = Color.BLACK.value
 
-def getValuesInColumn(sheet, param):
-    values = []
-    for column_cell in sheet.iter_cols(1, sheet.max_column):
-        if column_cell[0].value == param:
-            for data in column_cell[1:]:
-                values.append(data.value)
-            break
-    return values
-
-def getAppsWithScore(sheet, assessmentScore):
-    values = []
-    for column_cell in sheet.iter_cols(1, sheet.max_column):
-        if column_cell[0].value == "OverallAssessment":
-            for idx, data in enumerate(column_cell[1:]):
-                if data.value == assessmentScore:
-                    # +2 because idx is 0-based and rows are 1-based, and header is row 1
-                    values.append(sheet[f"C{idx + 2}"].value)
-            break
-    return values
-
-def createCxPpt(folder, output_dir="output"):
+def percentOfApps(values, predicate, totalApplications):
+    return str(format((len([x for x in values if predicate(x)]) / totalApplications if totalApplications > 0 else 0) * 100, ".0f")) + "%"
+
+
+def createCxPpt(folder, output_dir="output", summary: MaturitySummary = None, lastRun: int = None):
+    """Create the CX deck from the in-memory APM maturity summary, no workbook re-parse needed."""
     logging.info(f"Creating presentation from template for output folder: {folder}")
 
     template_path = "backend/resources/pptAssets/cxPpt_template.pptx"
@@ -220,29 +205,20 @@ def createCxPpt(folder, output_dir="output"):
         return
 
     job_dir = os.path.join(output_dir, folder)
-    info_path = os.path.join(job_dir, "info.json")
-    if not os.path.exists(info_path):
-        logging.warning(f"Info file {info_path} does not exist. Skipping PPT generation.")
-        return
-
-    info = json.loads(open(info_path).read())
-
-    ma_path = os.path.join(job_dir, f"{folder}-MaturityAssessment-apm.xlsx")
-    if not os.path.exists(ma_path):
-        logging.warning(f"Maturity Assessment file {ma_path} does not exist. Skipping PPT generation.")
+    if summary is None:
+        logging.warning(f"No APM maturity summary available for {folder}. Skipping PPT generation.")
         return
+    if lastRun is None:
+        lastRun = int(datetime.now().timestamp())
 
-    wb = load_workbook(filename=ma_path)
-    totalApplications = wb["Analysis"].max_row - 1
-    sheet = wb["Analysis"]
-    scores = getValuesInColumn(sheet, "OverallAssessment")
+    totalApplications = summary.totalApplications
 
     # 1. Title Slide (Slide 0)
     slide = root.slides[0]
     updateTitle(slide, f"{folder} Configuration Assessment Highlights")
     if len(slide.shapes.placeholders) > 1:
         # Assuming placeholder 1 is subtitle/date
-        slide.shapes.placeholders[1].text = f'Data As Of: {datetime.fromtimestamp(info["lastRun"], get_localzone()).strftime("%m-%d-%Y at %H:%M:%S")}'
+        slide.shapes.placeholders[1].text = f'Data As Of: {datetime.fromtimestamp(lastRun, get_localzone()).strftime("%m-%d-%Y at %H:%M:%S")}'
 
     # 2. Current State (Slide 2 - Section Header)
     slide = root.slides[2]
@@ -257,10 +233,10 @@ def createCxPpt(folder, output_dir="output"):
         [
             folder,
             str(totalApplications),
-            f"{format((scores.count('bronze') / (wb['Analysis'].max_row - 1) if wb['Analysis'].max_row - 1 > 0 else 0) * 100, '.0f')}% ({scores.count('bronze')})",
-            f"{format((scores.count('silver') / (wb['Analysis'].max_row - 1) if wb['Analysis'].max_row - 1 > 0 else 0) * 100, '.0f')}% ({scores.count('silver')})",
-            f"{format((scores.count('gold') / (wb['Analysis'].max_row - 1) if wb['Analysis'].max_row - 1 > 0 else 0) * 100, '.0f')}% ({scores.count('gold')})",
-            f"{format((scores.count('platinum') / (wb['Analysis'].max_row - 1) if wb['Analysis'].max_row - 1 > 0 else 0) * 100, '.0f')}% ({scores.count('platinum')})",
+            *[
+                f"{format((summary.countWithScore(score) / totalApplications if totalApplications > 0 else 0) * 100, '.0f')}% ({summary.countWithScore(score)})"
+                for score in ["bronze", "silver", "gold", "platinum"]
+            ],
         ],
     ]
     addTable(slide, data, top=5.0)
@@ -269,10 +245,10 @@ def createCxPpt(folder, output_dir="output"):
     slide = root.slides[4]
     # Keep title: "Application and Machine Agents"
 
-    percentAgentsLessThan1YearOld = getValuesInColumn(wb["AppAgentsAPM"], "percentAgentsLessThan1YearOld")
-    percentAgentsReportingData = getValuesInColumn(wb["AppAgentsAPM"], "percentAgentsReportingData")
-    percentMachineAgentsLessThan1YearOld = getValuesInColumn(wb["MachineAgentsAPM"], "percentAgentsLessThan1YearOld")
-    percentMachineAgentsReportingData = getValuesInColumn(wb["MachineAgentsAPM"], "percentAgentsReportingData")
+    percentAgentsLessThan1YearOld = summary.valuesInColumn("AppAgentsAPM", "percentAgentsLessThan1YearOld")
+    percentAgentsReportingData = summary.valuesInColumn("AppAgentsAPM", "percentAgentsReportingData")
+    percentMachineAgentsLessThan1YearOld = summary.valuesInColumn("MachineAgentsAPM", "percentAgentsLessThan1YearOld")
+    percentMachineAgentsReportingData = summary.valuesInColumn("MachineAgentsAPM", "percentAgentsReportingData")
 
     data_agents = [
         [
@@ -284,10 +260,10 @@ def createCxPpt(folder, output_dir="output"):
         ],
         [
             folder,
-            str(format((len([x for x in percentAgentsLessThan1YearOld if x != 100]) / totalApplications if totalApplications > 0 else 0) * 100, ".0f")) + "%",
-            str(format((len([x for x in percentAgentsReportingData if x == 0]) / totalApplications if totalApplications > 0 else 0) * 100, ".0f")) + "%",
-            str(format((len([x for x in percentMachineAgentsLessThan1YearOld if x != 100]) / totalApplications if totalApplications > 0 else 0) * 100, ".0f")) + "%",
-            str(format((len([x for x in percentMachineAgentsReportingData if x == 0]) / totalApplications if totalApplications > 0 else 0) * 100, ".0f")) + "%",
+            percentOfApps(percentAgentsLessThan1YearOld, lambda x: x != 100, totalApplications),
+            percentOfApps(percentAgentsReportingData, lambda x: x == 0, totalApplications),
+            percentOfApps(percentMachineAgentsLessThan1YearOld, lambda x: x != 100, totalApplications),
+            percentOfApps(percentMachineAgentsReportingData, lambda x: x == 0, totalApplications),
         ],
     ]
     addTable(slide, data_agents, top=5.0)
@@ -299,10 +275,10 @@ def createCxPpt(folder, output_dir="output"):
     # 6. Overhead (Slide 7)
     slide = root.slides[7]
 
-    developerModeNotEnabledForAnyBT = getValuesInColumn(wb["OverheadAPM"], "developerModeNotEnabledForAnyBT")
-    findEntryPointsNotEnabled = getValuesInColumn(wb["OverheadAPM"], "findEntryPointsNotEnabled")
-    aggressiveSnapshottingNotEnabled = getValuesInColumn(wb["OverheadAPM"], "aggressiveSnapshottingNotEnabled")
-    developerModeNotEnabledForApplication = getValuesInColumn(wb["OverheadAPM"], "developerModeNotEnabledForApplication")
+    developerModeNotEnabledForAnyBT = summary.valuesInColumn("OverheadAPM", "developerModeNotEnabledForAnyBT")
+    findEntryPointsNotEnabled = summary.valuesInColumn("OverheadAPM", "findEntryPointsNotEnabled")
+    aggressiveSnapshottingNotEnabled = summary.valuesInColumn("OverheadAPM", "aggressiveSnapshottingNotEnabled")
+    developerModeNotEnabledForApplication = summary.valuesInColumn("OverheadAPM", "developerModeNotEnabledForApplication")
 
     data_overhead = [
         [
@@ -314,10 +290,10 @@ def createCxPpt(folder, output_dir="output"):
         ],
         [
             folder,
-            str(format((len([x for x in developerModeNotEnabledForAnyBT if x == 0]) / totalApplications if totalApplications > 0 else 0) * 100, ".0f")) + "%",
-            str(format((len([x for x in findEntryPointsNotEnabled if x == 0]) / totalApplications if totalApplications > 0 else 0) * 100, ".0f")) + "%",
-            str(format((len([x for x in aggressiveSnapshottingNotEnabled if x == 0]) / totalApplications if totalApplications > 0 else 0) * 100, ".0f")) + "%",
-            str(format((len([x for x in developerModeNotEnabledForApplication if x == 0]) / totalApplications if totalApplications > 0 else 0) * 100, ".0f")) + "%",
+            percentOfApps(developerModeNotEnabledForAnyBT, lambda x: x == 0, totalApplications),
+            percentOfApps(findEntryPointsNotEnabled, lambda x: x == 0, totalApplications),
+            percentOfApps(aggressiveSnapshottingNotEnabled, lambda x: x == 0, totalApplications),
+            percentOfApps(developerModeNotEnabledForApplication, lambda x: x == 0, totalApplications),
         ],
     ]
     addTable(slide, data_overhead, top=5.0)
@@ -325,8 +301,8 @@ def createCxPpt(folder, output_dir="output"):
     # 7. Error Configuration (Slide 8)
     slide = root.slides[8]
 
-    successPercentageOfWorstTransaction = getValuesInColumn(wb["ErrorConfigurationAPM"], "successPercentageOfWorstTransaction")
-    numberOfCustomRules = getValuesInColumn(wb["ErrorConfigurationAPM"], "numberOfCustomRules")
+    successPercentageOfWorstTransaction = summary.valuesInColumn("ErrorConfigurationAPM", "successPercentageOfWorstTransaction")
+    numberOfCustomRules = summary.valuesInColumn("ErrorConfigurationAPM", "numberOfCustomRules")
 
     data_error = [
         [
@@ -336,8 +312,8 @@ def createCxPpt(folder, output_dir="output"):
         ],
         [
             folder,
-            str(format((len([x for x in successPercentageOfWorstTransaction if x == 0]) / totalApplications if totalApplications > 0 else 0) * 100, ".0f")) + "%",
-            str(format((len([x for x in numberOfCustomRules if x == 0]) / totalApplications if totalApplications > 0 else 0) * 100, ".0f")) + "%",
+            percentOfApps(successPercentageOfWorstTransaction, lambda x: x == 0, totalApplications),
+            percentOfApps(numberOfCustomRules, lambda x: x == 0, totalApplications),
         ],
     ]
     addTable(slide, data_error, top=5.0)
@@ -345,10 +321,10 @@ def createCxPpt(folder, output_dir="output"):
     # 8. Health Rules and Alerting (Slide 9)
     slide = root.slides[9]
 
-    numberOfHealthRuleViolations = getValuesInColumn(wb["HealthRulesAndAlertingAPM"], "numberOfHealthRuleViolations")
-    numberOfDefaultHealthRulesModified = getValuesInColumn(wb["HealthRulesAndAlertingAPM"], "numberOfDefaultHealthRulesModified")
-    numberOfActionsBoundToEnabledPolicies = getValuesInColumn(wb["HealthRulesAndAlertingAPM"], "numberOfActionsBoundToEnabledPolicies")
-    numberOfCustomHealthRules = getValuesInColumn(wb["HealthRulesAndAlertingAPM"], "numberOfCustomHealthRules")
+    numberOfHealthRuleViolations = summary.valuesInColumn("HealthRulesAndAlertingAPM", "numberOfHealthRuleViolations")
+    numberOfDefaultHealthRulesModified = summary.valuesInColumn("HealthRulesAndAlertingAPM", "numberOfDefaultHealthRulesModified")
+    numberOfActionsBoundToEnabledPolicies = summary.valuesInColumn("HealthRulesAndAlertingAPM", "numberOfActionsBoundToEnabledPolicies")
+    numberOfCustomHealthRules = summary.valuesInColumn("HealthRulesAndAlertingAPM", "numberOfCustomHealthRules")
 
     data_hr = [
         [
@@ -360,10 +336,10 @@ def createCxPpt(folder, output_dir="output"):
         ],
         [
             folder,
-            str(format((len([x for x in numberOfHealthRuleViolations if x >= 50]) / totalApplications if totalApplications > 0 else 0) * 100, ".0f")) + "%",
-            str(format((len([x for x in numberOfDefaultHealthRulesModified if x == 0]) / totalApplications if totalApplications > 0 else 0) * 100, ".0f")) + "%",
-            str(format((len([x for x in numberOfActionsBoundToEnabledPolicies if x == 0]) / totalApplications if totalApplications > 0 else 0) * 100, ".0f")) + "%",
-            str(format((len([x for x in numberOfCustomHealthRules if x == 0]) / totalApplications if totalApplications > 0 else 0) * 100, ".0f")) + "%",
+            percentOfApps(numberOfHealthRuleViolations, lambda x: x >= 50, totalApplications),
+            percentOfApps(numberOfDefaultHealthRulesModified, lambda x: x == 0, totalApplications),
+            percentOfApps(numberOfActionsBoundToEnabledPolicies, lambda x: x == 0, totalApplications),
+            percentOfApps(numberOfCustomHealthRules, lambda x: x == 0, totalApplications),
         ],
     ]
     addTable(slide, data_hr, top=5.0)
@@ -398,7 +374,7 @@ def createCxPpt(folder, output_dir="output"):
     # 11. Raise Gold Apps (Slide 12)
     slide = root.slides[12]
     updateTitle(slide, "Raise Gold Apps to Platinum Status")
-    goldApps = getAppsWithScore(wb["Analysis"], "gold")
+    goldApps = summary.appsWithScore("gold")
     text_gold = {
         f"These apps are currently in Gold status. See {folder}-MaturityAssessment-apm.xlsx Analysis sheet for a full set of applications.": [],
         "We recommend working with them to raise them to Platinum status:": goldApps[:10],
@@ -14,6 +14,15 @@ medium_bg = '#A0A0A0'
 dark_bg = '#000000'
 
 
+def assessedOnly(frame, columns):
+    """
+    Turn 'not assessed' cells of metrics shed to meet a run deadline into NaN, which raises no task.
+    So are '≥N' cells, written when probing stopped at the highest threshold and so never short of the task limits.
+    """
+    for column in columns:
+        frame[column] = pd.to_numeric(frame[column], errors='coerce')
+
+
 class ConfigurationAnalysisReport(PostProcessReport):
     def __init__(self, output_dir="output"):
         self.output_dir = output_dir
@@ -237,6 +246,7 @@ class ConfigurationAnalysisReport(PostProcessReport):
     def dataCollectorStatus(self, application, taskList):
         frame = pd.read_excel(self.analysis_sheet, sheet_name='DataCollectorsAPM', engine='openpyxl')
         frame.drop('controller', axis=1)
+        assessedOnly(frame, ['numberOfDataCollectorFieldsCollectedInSnapshots', 'numberOfDataCollectorFieldsCollectedInAnalytics'])
         appFrame = frame.loc[frame['application'] == application]
 
         # Number of data collector fields configured
@@ -267,6 +277,7 @@ class ConfigurationAnalysisReport(PostProcessReport):
     def apmDashBoardsStatus(self, application, taskList):
         frame = pd.read_excel(self.analysis_sheet, sheet_name='DashboardsAPM', engine='openpyxl')
         frame.drop('controller', axis=1)
+        assessedOnly(frame, ['numberOfDashboards', 'percentageOfDashboardsModifiedLast6Months', 'numberOfDashboardsUsingBiQ'])
         appFrame = frame.loc[frame['application'] == application]
 
         # Number of custom dashboards
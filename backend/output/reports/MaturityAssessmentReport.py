@@ -2,8 +2,9 @@ import logging
 import os
 
 from openpyxl import Workbook
+from backend.output.MaturitySummary import MaturitySummary
 from backend.output.ReportBase import ReportBase
-from backend.util.excel_utils import addFilterAndFreeze, resizeColumnWidth, writeColoredRow, writeSummarySheet, writeUncoloredRow
+from backend.util.excel_utils import Color, addFilterAndFreeze, resizeColumnWidth, writeColoredRow, writeSummarySheet, writeUncoloredRow
 
 
 class MaturityAssessmentReport(ReportBase):
@@ -46,26 +47,26 @@ class MaturityAssessmentReport(ReportBase):
             )
 
             rowIdx = 2
-            for host, hostInfo in controllerData.items():
-                for component in hostInfo[reportType].values():
-
-                    data_row = [
-                        (hostInfo["controller"].host, None),
-                        (reportType, None),
-                        (component["name"], None),
-                        (component["applicationId"] if reportType == "mrum" else component["id"], None),
-                        *[component[jobStep]["computed"] for jobStep in [type(jobStep).__name__ for jobStep in filteredJobs]],
-                    ]
-
-                    if reportType == "apm": # add desc after name
-                        data_row.insert(4, (component["description"], None))
-
-                    writeColoredRow(
-                        analysisSheet,
-                        rowIdx,
-                        data_row
-                    )
-                    rowIdx += 1
+            summary = MaturitySummary.fromControllerData(controllerData, filteredJobs, reportType)
+            for application in summary.applications:
+
+                data_row = [
+                    (application.controller, None),
+                    (reportType, None),
+                    (application.name, None),
+                    (application.applicationId, None),
+                    *[(score, Color[score]) for score in application.scores.values()],
+                ]
+
+                if reportType == "apm": # add desc after name
+                    data_row.insert(4, (application.description, None))
+
+                writeColoredRow(
+                    analysisSheet,
+                    rowIdx,
+                    data_row
+                )
+                rowIdx += 1
 
             addFilterAndFreeze(analysisSheet, "E2")
             resizeColumnWidth(analysisSheet)
@@ -26,3 +26,24 @@ class AsyncioUtils:
                 return await task
 
         return await asyncio.gather(*[semTask(task) for task in tasks])
+
+    @staticmethod
+    async def mapWithConcurrency(func, items, concurrency: int = None) -> list:
+        """
+        Await func(item) for every item using a fixed pool of workers fed from one queue.
+        Unlike gatherWithConcurrency no coroutine is created before a worker is free. Results keep item order.
+        """
+        items = list(items)
+        results = [None] * len(items)
+        queue = asyncio.Queue()
+        for idx, item in enumerate(items):
+            queue.put_nowait((idx, item))
+
+        async def worker():
+            while not queue.empty():
+                idx, item = queue.get_nowait()
+                results[idx] = await func(item)
+
+        workerCount = min(concurrency or AsyncioUtils.concurrentConnections, len(items))
+        await asyncio.gather(*[worker() for _ in range(workerCount)])
+        return results
@@ -0,0 +1,103 @@
+import json
+import math
+from enum import Enum
+from typing import Callable
+
+try:
+    import orjson
+except ImportError:  # optional, fall back to json from the standard library
+    orjson = None
+
+
+class StdlibCodec:
+    """JSON from the standard library."""
+
+    name = "json"
+
+    def loads(self, data):
+        """Parse a str or a body of bytes. Bytes are UTF-8, bodies that are not are read as ISO-8859-1."""
+        if isinstance(data, (bytes, bytearray)):
+            try:
+                return json.loads(data)
+            except UnicodeDecodeError:
+                return json.loads(data.decode("ISO-8859-1"))
+        return json.loads(data)
+
+    def dump(self, obj, fp, default: Callable = None):
+        """Write obj as indented UTF-8 JSON to the binary file fp."""
+        fp.write(json.dumps(obj, default=default, indent=4).encode("utf-8"))
+
+
+class OrjsonCodec(StdlibCodec):
+    """
+    orjson, parsing straight from bytes and writing bytes. What orjson rejects, NaN, integers beyond 64 bits or bodies
+    that are not UTF-8, is left to the standard library, so both codecs accept the same input. Written JSON matches
+    the standard library's apart from the indentation, see dump.
+    """
+
+    name = "orjson"
+    # dataclasses and datetimes go through default like with the standard library, keys may be ints like with json.dump
+    DUMP_OPTIONS = (orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+    def loads(self, data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return super().loads(data)
+
+    def dump(self, obj, fp, default: Callable = None):
+        """
+        Write obj as UTF-8 JSON indented by 2 spaces, the only indentation orjson offers, to the binary file fp.
+        orjson would write Enum members by value, so they are handed to default first, as json.dump does. Data orjson
+        would write differently still, NaN and infinity as null or keys json.dump rejects, is left to the standard library.
+        """
+        hook = None if default is None else (lambda o: _orjsonReady(default(o), default))
+        try:
+            data = orjson.dumps(_orjsonReady(obj, default), default=hook, option=self.DUMP_OPTIONS)
+        except (_StdlibOnly, orjson.JSONEncodeError):
+            super().dump(obj, fp, default)
+            return
+        fp.write(data)
+
+
+class _StdlibOnly(Exception):
+    """The data holds a value orjson writes differently from the standard library."""
+
+
+def _orjsonReady(obj, default: Callable):
+    """obj with Enum members replaced by what default returns for them. Containers are only copied where a member was replaced."""
+    if obj is None or isinstance(obj, (str, int)):
+        return obj
+    if isinstance(obj, float):
+        if not math.isfinite(obj):
+            raise _StdlibOnly()
+        return obj
+    if isinstance(obj, dict):
+        converted = None
+        for key, value in obj.items():
+            if not isinstance(key, (str, int, float)) and key is not None:
+                raise _StdlibOnly()
+            ready = _orjsonReady(value, default)
+            if ready is not value:
+                if converted is None:
+                    converted = dict(obj)
+                converted[key] = ready
+        return obj if converted is None else converted
+    if isinstance(obj, (list, tuple)):
+        converted = None
+        for idx, value in enumerate(obj):
+            ready = _orjsonReady(value, default)
+            if ready is not value:
+                if converted is None:
+                    converted = list(obj)
+                converted[idx] = ready
+        return obj if converted is None else converted
+    # members mixed with str or int were returned above, json.dump writes those by value as well
+    if isinstance(obj, Enum):
+        if default is None:
+            raise _StdlibOnly()
+        return _orjsonReady(default(obj), default)
+    return obj
+
+
+jsonCodec = OrjsonCodec() if orjson is not None else StdlibCodec()
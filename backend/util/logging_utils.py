@@ -1,61 +1,163 @@
 import asyncio
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import time
 
+# per-request debug lines of AppDService, rate limited by initLogging
+REQUEST_LOGGER_NAME = "AppDService.requests"
+
+_listener = None
+_delayMonitor = None
+
+
+def initLogging(debug: bool, requestLogRate: int = 100):
+    """
+    Set up logging. Records are put on a queue by the calling thread and formatted and written by a listener thread,
+    so the event loop never blocks on file or console I/O. Per-request debug lines are limited to requestLogRate per second (0 for no limit).
+    """
+    global _listener, _delayMonitor
 
-def initLogging(debug: bool):
-    """Set up logging."""
     if not os.path.exists("logs"):
         os.makedirs("logs")
 
+    if _listener is not None:
+        _listener.stop()
+    if _delayMonitor is not None:
+        _delayMonitor.stop()
+
+    formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s %(funcName)s: %(message)s")
+    handlers = [
+        logging.FileHandler("logs/config-assessment-tool.log", mode='a'),
+        logging.StreamHandler(),
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    logQueue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(logQueue, *handlers, respect_handler_level=True)
+    _listener.start()
+
     logging.basicConfig(
         force=True,  # Override any existing logging configuration
         level=logging.DEBUG if debug else logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(name)s %(funcName)s: %(message)s",
-        handlers=[
-            logging.FileHandler("logs/config-assessment-tool.log", mode='a'),
-            logging.StreamHandler(),
-        ],
+        handlers=[LazyQueueHandler(logQueue)],
     )
+
+    requestLogger = logging.getLogger(REQUEST_LOGGER_NAME)
+    for existingFilter in list(requestLogger.filters):
+        requestLogger.removeFilter(existingFilter)
+    if requestLogRate:
+        requestLogger.addFilter(RateLimitFilter(requestLogRate))
+
     try:
         if asyncio.get_running_loop():
-            EventLoopDelayMonitor()
+            _delayMonitor = EventLoopDelayMonitor()
     except RuntimeError:  # 'RuntimeError: There is no current event loop...'
-        pass
+        _delayMonitor = None
+
+
+def _stopListener():
+    if _listener is not None:
+        _listener.stop()
+
+
+# flush whatever is still queued when the process exits
+atexit.register(_stopListener)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread. The stock handler formats every record in the calling thread,
+    which is exactly the work we want off the event loop. Records whose arguments could still change are rendered here.
+    """
+
+    _IMMUTABLE_TYPES = (str, int, float, bool, type(None))
+
+    def prepare(self, record):
+        if record.args and not (isinstance(record.args, tuple) and all(isinstance(arg, self._IMMUTABLE_TYPES) for arg in record.args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+class RateLimitFilter(logging.Filter):
+    """Let at most ratePerSecond records through per second and report how many were dropped."""
+
+    def __init__(self, ratePerSecond: int):
+        super().__init__()
+        self.ratePerSecond = ratePerSecond
+        self.windowStart = time.monotonic()
+        self.passed = 0
+        self.suppressed = 0
+
+    def filter(self, record):
+        now = time.monotonic()
+        if now - self.windowStart >= 1:
+            if self.suppressed:
+                logging.getLogger(__name__.split('.')[-1]).debug(
+                    "Suppressed %d of %d request debug lines in the last %.1fs", self.suppressed, self.suppressed + self.passed, now - self.windowStart
+                )
+            self.windowStart = now
+            self.passed = 0
+            self.suppressed = 0
+
+        if self.passed < self.ratePerSecond or record.levelno > logging.DEBUG:
+            self.passed += 1
+            return True
+        self.suppressed += 1
+        return False
 
 
 class EventLoopDelayMonitor:
-    def __init__(self, loop=None, start=True, interval=1, logger=None):
+    """
+    Measures how late a callback scheduled every interval seconds runs and logs the mean and maximum delay
+    every reportInterval seconds. Task introspection only happens when reporting.
+    """
+
+    def __init__(self, loop=None, start=True, interval=1, reportInterval=60, logger=None):
         self._interval = interval
+        self._reportInterval = reportInterval
         self._log = logger or logging.getLogger(__name__)
         self._loop = loop or asyncio.get_event_loop()
+        self._resetAggregates()
         if start:
             self.start()
 
+    def _resetAggregates(self):
+        self.samples = 0
+        self.totalDelay = 0.0
+        self.maxDelay = 0.0
+        self.slowSamples = 0
+        self.windowStart = self._loop.time()
+
     def run(self):
         self._loop.call_later(self._interval, self._handler, self._loop.time())
 
     def _handler(self, start_time):
-        latency = (self._loop.time() - start_time) - self._interval
-
-        self._log.debug(
-            f"asyncio - Task count: {len(asyncio.all_tasks())} - EventLoop delay %.4f",
-            latency,
-        )
-
-        for coro in asyncio.all_tasks():
-            if not hasattr(coro.get_coro(), "cr_frame"):
-                continue
-
-            f_locals = coro.get_coro().cr_frame.f_locals
-
-            obj = f_locals.get("self", None)
-            host = obj.host if hasattr(obj, "host") else None
-
-            debugString = f_locals.get("debugString", None)
-
-            if host is not None and debugString is not None:
-                self._log.debug(f"asyncio PENDING tasks - {host} - {debugString}")
+        now = self._loop.time()
+        latency = (now - start_time) - self._interval
+
+        self.samples += 1
+        self.totalDelay += latency
+        self.maxDelay = max(self.maxDelay, latency)
+        if latency > 0.1:
+            self.slowSamples += 1
+
+        if now - self.windowStart >= self._reportInterval:
+            if self._log.isEnabledFor(logging.DEBUG):
+                self._log.debug(
+                    "asyncio - Task count: %d - EventLoop delay over %.0fs: mean %.4f max %.4f, %d of %d samples over 100ms",
+                    len(asyncio.all_tasks(self._loop)),
+                    now - self.windowStart,
+                    self.totalDelay / self.samples,
+                    self.maxDelay,
+                    self.slowSamples,
+                    self.samples,
+                )
+            self._resetAggregates()
 
         if not self.is_stopped():
             self.run()
@@ -68,4 +170,4 @@ class EventLoopDelayMonitor:
         self.run()
 
     def stop(self):
-        self._stopped = True
\ No newline at end of file
+        self._stopped = True
@@ -0,0 +1,19 @@
+import random
+from collections import OrderedDict
+from typing import Callable, List
+
+
+def stratifiedSample(items: list, sampleSize: int, stratumOf: Callable, seed) -> List:
+    """
+    Random sample of about sampleSize items, allocated to strata in proportion to their size but with at least
+    two items of every stratum (all of a smaller one). The same seed picks the same items.
+    """
+    strata = OrderedDict()
+    for item in items:
+        strata.setdefault(stratumOf(item), []).append(item)
+    rng = random.Random(str(seed))
+    sample = []
+    for members in strata.values():
+        allocation = min(len(members), max(2, round(sampleSize * len(members) / len(items))))
+        sample.extend(rng.sample(members, allocation))
+    return sample
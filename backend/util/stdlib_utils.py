@@ -3,6 +3,9 @@ import binascii
 from enum import Enum
 from typing import Optional
 
+# written by jsonEncoder in place of objects it cannot serialize
+NON_SERIALIZABLE_PREFIX = "<<non-serializable: "
+
 
 def substringBetween(s: str, left: str, right: str) -> Optional[str]:
     """Returns substring between two chars. Returns"""
@@ -46,7 +49,7 @@ def jsonEncoder(o):
     if hasattr(o, "__json__"):
         return o.__json__()
     else:
-        return f"<<non-serializable: {type(o).__qualname__}>>"
+        return f"{NON_SERIALIZABLE_PREFIX}{type(o).__qualname__}>>"
 
 
 def isBase64(s: str, encoding="ISO-8859-1"):
@@ -0,0 +1,58 @@
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__.split('.')[-1])
+
+TAGS_URL = "https://api.github.com/repos/appdynamics/config-assessment-tool/tags"
+RELEASES_URL = "https://github.com/Appdynamics/config-assessment-tool/releases"
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+
+def _warnIfOutdated(codebaseVersion: str, latestTag: str):
+    if latestTag and latestTag.lstrip("v") != codebaseVersion.lstrip("v"):
+        logger.warning(f"You are using an outdated version of the software. Current {codebaseVersion} Latest {latestTag}")
+        logger.warning(f"You can get the latest version from {RELEASES_URL}")
+
+
+def _fetchLatestTag(codebaseVersion: str, cacheFile: str, verifySsl: bool):
+    import requests
+
+    try:
+        response = requests.request("GET", TAGS_URL, verify=verifySsl, timeout=5)
+        if not response.ok:
+            logger.warning(f"Unable to get latest tag from {TAGS_URL}")
+            return
+        latestTag = json.loads(response.text)[0]["name"]
+    except (requests.exceptions.RequestException, ValueError, IndexError, KeyError):
+        logger.warning(f"Unable to get latest tag from {TAGS_URL}")
+        return
+
+    try:
+        with open(cacheFile, "w", encoding="utf-8") as f:
+            json.dump({"checkedAt": int(time.time()), "latestTag": latestTag}, f)
+    except OSError as e:
+        logger.debug(f"Unable to cache latest tag in {cacheFile}: {e}")
+    _warnIfOutdated(codebaseVersion, latestTag)
+
+
+def checkLatestVersion(codebaseVersion: str, cacheFile: str, verifySsl: bool = True):
+    """
+    Warn when a newer release is tagged on GitHub without delaying startup.
+    A tag cached less than a day ago is used directly, otherwise the lookup runs on a daemon thread.
+    """
+    try:
+        with open(cacheFile, encoding="utf-8") as f:
+            cached = json.load(f)
+        if time.time() - cached["checkedAt"] < CACHE_TTL_SECONDS:
+            _warnIfOutdated(codebaseVersion, cached["latestTag"])
+            return None
+    except (OSError, ValueError, KeyError):
+        pass
+
+    os.makedirs(os.path.dirname(cacheFile), exist_ok=True)
+    thread = threading.Thread(target=_fetchLatestTag, args=(codebaseVersion, cacheFile, verifySsl), name="version-check", daemon=True)
+    thread.start()
+    return thread
@@ -6,6 +6,7 @@ import logging
 import multiprocessing
 import platform
 import subprocess
+from collections import deque
 from datetime import datetime
 
 import requests
@@ -187,17 +188,91 @@ def handle_run(runColumn, jobName, thresholds, debug, concurrentConnections, new
         log_modal.open()
         rerun()
 
+def _read_last_lines(f, n_lines, end, block_size=64 * 1024):
+    """Reads the last N lines of an open binary file ending at byte offset `end`, seeking backwards block by block."""
+    position = end
+    data = b""
+    while position > 0 and data.count(b"\n") <= n_lines:
+        read_size = min(block_size, position)
+        position -= read_size
+        f.seek(position)
+        data = f.read(read_size) + data
+    return data.decode("utf-8", errors="replace").splitlines(keepends=True)[-n_lines:]
+
 def tail_file(filepath, n_lines=50):
     """Reads the last N lines from a file."""
     try:
-        with open(filepath, "r") as f:
-            lines = f.readlines()
-            return "".join(lines[-n_lines:])
+        with open(filepath, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            return "".join(_read_last_lines(f, n_lines, f.tell()))
     except FileNotFoundError:
         return "Log file not found."
     except Exception as e:
         return f"Error reading log file: {e}"
 
+class LogTailer:
+    """
+    Keeps the last `max_lines` lines of a log file between Streamlit reruns.
+    The first poll seeks from the end of the file, later polls only read the bytes appended since the previous one.
+    A changed inode or a file shorter than the remembered offset is treated as a rotation and the tail is reloaded.
+    """
+
+    def __init__(self, filepath, max_lines=1000):
+        self.filepath = filepath
+        self.lines = deque(maxlen=max_lines)
+        self.offset = None
+        self.inode = None
+        self.partial = b""
+
+    def poll(self):
+        try:
+            stat = os.stat(self.filepath)
+        except FileNotFoundError:
+            self.offset = None
+            self.lines.clear()
+            return False
+
+        rotated = self.offset is not None and (stat.st_ino != self.inode or stat.st_size < self.offset)
+        if self.offset is None or rotated:
+            with open(self.filepath, "rb") as f:
+                self.lines.clear()
+                self.lines.extend(_read_last_lines(f, self.lines.maxlen, stat.st_size))
+            self.inode = stat.st_ino
+            self.offset = stat.st_size
+            self.partial = b""
+            if self.lines and not self.lines[-1].endswith(("\n", "\r")):
+                self.partial = self.lines.pop().encode("utf-8")
+            return True
+
+        if stat.st_size == self.offset:
+            return False
+
+        with open(self.filepath, "rb") as f:
+            f.seek(self.offset)
+            data = self.partial + f.read(stat.st_size - self.offset)
+        self.offset = stat.st_size
+
+        # hold back an unterminated last line until the writer finishes it
+        complete, newline, self.partial = data.rpartition(b"\n")
+        if newline:
+            self.lines.extend(line + "\n" for line in complete.decode("utf-8", errors="replace").split("\n"))
+        return True
+
+    def tail(self, n_lines):
+        lines = list(self.lines)[-n_lines:]
+        if self.partial:
+            lines.append(self.partial.decode("utf-8", errors="replace"))
+        return "".join(lines)
+
+def get_log_tailer(jobName, filepath):
+    """Returns the tailer kept in session state for this job's log modal."""
+    key = f"log_tailer_{jobName}"
+    tailer = st.session_state.get(key)
+    if tailer is None or tailer.filepath != filepath:
+        tailer = LogTailer(filepath)
+        st.session_state[key] = tailer
+    return tailer
+
 # --- Main Component ---
 
 def jobHandler(jobName: str, debug: bool, concurrentConnections: int):
@@ -328,8 +403,14 @@ def jobHandler(jobName: str, debug: bool, concurrentConnections: int):
             log_placeholder = st.empty()
             log_container_id = f"log-container-{jobName.replace(' ', '-')}"
 
+            log_tailer = get_log_tailer(jobName, log_file)
+
             def display_logs(num_lines, auto_scroll):
-                log_content = tail_file(log_file, num_lines)
+                if not os.path.exists(log_file):
+                    log_content = "Log file not found."
+                else:
+                    log_tailer.poll()
+                    log_content = log_tailer.tail(num_lines)
 
                 # Log container HTML
                 log_html = f'<div id="{log_container_id}" style="height: 400px; overflow-y: scroll; overflow-x: auto; border: 1px solid #ccc; padding: 10px; background-color: #f0f2f6; font-family: monospace; white-space: pre; font-size: 7px !important; line-height: 1.2 !important;">{log_content}</div>'
@@ -8,11 +8,13 @@ Purpose:
 - Ensures formulas in Excel files are recalculated before processing.
 
 Key Features:
-- `save_workbook`: Opens and saves an Excel workbook using `xlwings` to ensure formulas are recalculated.
+- `save_workbook`: Opens and saves an Excel workbook using `xlwings` to ensure formulas are recalculated,
+  one Excel instance at a time.
 - `check_controllers_match`: Validates that two Excel files have matching controller values.
 """
 
 import logging
+import threading
 from pathlib import Path
 from typing import Optional
 
@@ -20,6 +22,17 @@ import pandas as pd
 from openpyxl import load_workbook
 import xlwings as xw
 
+# Several hidden Excel instances side by side are unstable and leave orphaned
+# processes behind, so workbooks are saved one at a time. Batch comparisons
+# replace this with a lock shared by all worker processes (set_excel_lock).
+_excel_lock = threading.Lock()
+
+
+def set_excel_lock(lock) -> None:
+    """Use `lock` to serialize Excel across processes (pool initializer)."""
+    global _excel_lock
+    _excel_lock = lock
+
 
 def save_workbook(filepath: str) -> None:
     """
@@ -27,19 +40,20 @@ def save_workbook(filepath: str) -> None:
     before we read it with pandas/openpyxl.
     """
     path = Path(filepath).resolve()
-    logging.info("Saving workbook via Excel: %s", path)
 
-    app = xw.App(visible=False)
-    try:
-        wb = app.books.open(str(path))
-        wb.save()
-    finally:
-        # Always try to close/quit even if something goes wrong
+    with _excel_lock:
+        logging.info("Saving workbook via Excel: %s", path)
+        app = xw.App(visible=False)
         try:
-            wb.close()
-        except Exception:
-            pass
-        app.quit()
+            wb = app.books.open(str(path))
+            wb.save()
+        finally:
+            # Always try to close/quit even if something goes wrong
+            try:
+                wb.close()
+            except Exception:
+                pass
+            app.quit()
 
 
 def check_controllers_match(previous_file_path: str, current_file_path: str) -> bool:
@@ -11,14 +11,20 @@ Key Functions:
 - `run_comparison`: Handles APM comparisons.
 - `run_comparison_brum`: Handles BRUM comparisons.
 - `run_comparison_mrum`: Handles MRUM comparisons.
+- `run_batch_comparison`: Runs every discovered folder pair in parallel.
 """
 
 import os
+import json
+import shutil
 import logging
+import datetime as dt
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Dict, Tuple, Optional, Any, List
 from pathlib import Path
 
-from .excel_io import save_workbook, check_controllers_match
+from .excel_io import save_workbook, check_controllers_match, set_excel_lock
 from .summary import (
     create_summary_workbooks,
     compare_files_summary,
@@ -453,3 +459,295 @@ def save_matched_files(
 
     return prev_path, curr_path
 
+
+# ---------------------------------------------------------------------------
+# Batch folder comparison (many controllers x APM/BRUM/MRUM)
+# ---------------------------------------------------------------------------
+
+RUNNERS = {
+    "apm": run_comparison,
+    "brum": run_comparison_brum,
+    "mrum": run_comparison_mrum,
+}
+
+TREND_INDEX_FILE = "trend_index.json"
+
+
+def _domain_files(files: List[Any], domain: str) -> List[Any]:
+    """All uploaded files whose name carries the domain token (e.g. '-apm.xlsx')."""
+    return [
+        f for f in files
+        if getattr(f, "filename", None) and _domain_score(f.filename, domain) >= 100
+    ]
+
+
+def discover_folder_pairs(
+    previous_files: List[Any],
+    current_files: List[Any],
+    data_types: List[str],
+) -> List[Dict[str, Any]]:
+    """
+    Discover every (previous, current) workbook pair in the uploaded folders.
+
+    Files are paired per domain by identical base name first (same job file on
+    both runs), then by name similarity for whatever is left. If a domain has a
+    single file on each side it falls back to `find_best_matching_files`, so
+    single-controller folders behave exactly as before.
+
+    Returns a list of {"domain", "previous", "current"} dicts.
+    """
+    pairs: List[Dict[str, Any]] = []
+    fallback = None
+
+    for domain in [(t or "").lower() for t in data_types]:
+        if domain not in RUNNERS:
+            continue
+
+        prev_candidates = _domain_files(previous_files, domain)
+        curr_candidates = _domain_files(current_files, domain)
+
+        if len(prev_candidates) <= 1 or len(curr_candidates) <= 1:
+            if fallback is None:
+                fallback = find_best_matching_files(previous_files, current_files)
+            prev_file, curr_file = fallback.get(domain, (None, None))
+            # Loose keyword matching can pick another domain's workbook (e.g. 'rum').
+            if any(prev_file is p["previous"] or curr_file is p["current"] for p in pairs):
+                continue
+            if prev_file and curr_file:
+                pairs.append({"domain": domain, "previous": prev_file, "current": curr_file})
+            continue
+
+        remaining = list(curr_candidates)
+        for prev_file in prev_candidates:
+            if not remaining:
+                break
+            prev_key = _norm_name(Path(prev_file.filename).name)
+            exact = next(
+                (cf for cf in remaining if _norm_name(Path(cf.filename).name) == prev_key),
+                None,
+            )
+            if exact is None:
+                exact = max(
+                    remaining,
+                    key=lambda cf: SequenceMatcher(
+                        None, prev_key, _norm_name(Path(cf.filename).name)
+                    ).ratio(),
+                )
+            remaining.remove(exact)
+            pairs.append({"domain": domain, "previous": prev_file, "current": exact})
+
+    return pairs
+
+
+def save_pair_files(
+    pairs: List[Dict[str, Any]],
+    upload_folder: str,
+) -> List[Dict[str, Any]]:
+    """
+    Save each discovered pair into its own sub-folder of upload_folder and
+    return picklable jobs ({"pair_id", "domain", "previous_path", "current_path"}).
+    """
+    jobs = []
+    for idx, pair in enumerate(pairs):
+        domain = pair["domain"]
+        stem = _norm_name(Path(pair["current"].filename).stem)[:40] or "workbook"
+        pair_id = f"{idx:03d}_{domain}_{stem}"
+
+        pair_folder = os.path.join(upload_folder, pair_id)
+        os.makedirs(pair_folder, exist_ok=True)
+
+        prev_path = os.path.join(pair_folder, f"previous_{domain}.xlsx")
+        curr_path = os.path.join(pair_folder, f"current_{domain}.xlsx")
+        pair["previous"].save(prev_path)
+        pair["current"].save(curr_path)
+
+        jobs.append(
+            {
+                "pair_id": pair_id,
+                "domain": domain,
+                "previous_path": prev_path,
+                "current_path": curr_path,
+            }
+        )
+    return jobs
+
+
+def _run_pair(job: Dict[str, Any], config: Dict) -> Dict[str, Any]:
+    """
+    Worker entry point: run one pair's pipeline in isolated upload/result
+    sub-folders so concurrent pairs never overwrite each other's files.
+    """
+    pair_config = dict(config)
+    pair_config["upload_folder"] = os.path.join(config["upload_folder"], job["pair_id"])
+    pair_config["result_folder"] = os.path.join(config["result_folder"], job["pair_id"])
+
+    output_file, ppt_file = RUNNERS[job["domain"]](
+        previous_file_path=job["previous_path"],
+        current_file_path=job["current_path"],
+        config=pair_config,
+    )
+
+    json_path, _, payload = build_comparison_json(
+        domain=job["domain"].upper(),
+        comparison_result_path=output_file,
+        current_file_path=job["current_path"],
+        previous_file_path=job["previous_path"],
+        result_folder=pair_config["result_folder"],
+        meta={"domain": job["domain"].upper(), "pair": job["pair_id"]},
+    )
+
+    return {
+        "pair_id": job["pair_id"],
+        "domain": job["domain"].upper(),
+        "xlsx": output_file,
+        "pptx": ppt_file,
+        "json": json_path,
+        "meta": payload.get("meta", {}),
+        "overall": payload.get("overall", {}),
+    }
+
+
+def _default_workers(config: Dict) -> int:
+    workers = config.get("compare_workers")
+    try:
+        workers = int(workers) if workers else 0
+    except (TypeError, ValueError):
+        workers = 0
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def run_batch_comparison(
+    jobs: List[Dict[str, Any]],
+    config: Dict,
+    max_workers: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Run all pair jobs in parallel across CPU cores.
+
+    The worker count comes from `max_workers`, else `compare_workers` in
+    config.json, else the CPU count. Every pipeline recalculates its workbooks
+    in Excel; workers share one lock so only one Excel instance runs at a time
+    while the rest of the pipelines still run in parallel. Returns
+    (results, errors); a failing pair is reported in errors and does not stop
+    the others.
+    """
+    results: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    if not jobs:
+        return results, errors
+
+    workers = min(max_workers or _default_workers(config), len(jobs))
+    logger.info("Running %d comparison pair(s) with %d worker(s).", len(jobs), workers)
+
+    if workers == 1:
+        for job in jobs:
+            try:
+                results.append(_run_pair(job, config))
+            except Exception as e:
+                logger.error("Pair %s failed: %s", job["pair_id"], e, exc_info=True)
+                errors.append(f"{job['domain'].upper()} ({job['pair_id']}): {e}")
+    else:
+        excel_lock = multiprocessing.get_context().Lock()
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=set_excel_lock, initargs=(excel_lock,)
+        ) as pool:
+            futures = {pool.submit(_run_pair, job, config): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error("Pair %s failed: %s", job["pair_id"], e, exc_info=True)
+                    errors.append(f"{job['domain'].upper()} ({job['pair_id']}): {e}")
+
+    results.sort(key=lambda r: r["pair_id"])
+    return results, errors
+
+
+def merge_batch_results(
+    results: List[Dict[str, Any]],
+    result_folder: str,
+) -> Optional[str]:
+    """
+    Merge per-pair outputs into one combined insights JSON and refresh the
+    trend index.
+
+    Each pair's snapshot is also published to result_folder under the usual
+    analysis_summary_<domain>_*.json name so the History/Trends APIs see it.
+    Returns the path of the combined JSON, or None if there was nothing to merge.
+    """
+    if not results:
+        return None
+
+    os.makedirs(result_folder, exist_ok=True)
+    batch_date = dt.datetime.now(dt.timezone.utc).strftime("%Y%m%d_%H%M%S")
+
+    combined: Dict[str, Any] = {
+        "generatedAt": dt.datetime.now(dt.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+        "compareDate": batch_date,
+        "pairs": [],
+        "domains": {},
+    }
+
+    index_path = os.path.join(result_folder, TREND_INDEX_FILE)
+    index = load_trend_index(result_folder)
+
+    for result in results:
+        meta = result.get("meta", {})
+        domain = result["domain"]
+
+        published = f"analysis_summary_{domain.lower()}_{meta.get('compareDate', batch_date)}_{result['pair_id']}.json"
+        shutil.copyfile(result["json"], os.path.join(result_folder, published))
+
+        combined["pairs"].append(
+            {
+                "pair": result["pair_id"],
+                "domain": domain,
+                "controller": meta.get("controller"),
+                "xlsx": os.path.relpath(result["xlsx"], result_folder),
+                "pptx": os.path.relpath(result["pptx"], result_folder),
+                "json": published,
+                "overall": result.get("overall", {}),
+            }
+        )
+        combined["domains"].setdefault(domain, {})[meta.get("controller") or "Unknown"] = {
+            "overall": result.get("overall", {}),
+            "tiers": meta.get("tiers", {}),
+            "file": published,
+        }
+        index[published] = _trend_entry(published, meta)
+
+    combined_path = os.path.join(result_folder, f"analysis_batch_{batch_date}.json")
+    with open(combined_path, "w", encoding="utf-8") as f:
+        json.dump(combined, f, ensure_ascii=False, indent=2)
+
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+
+    return combined_path
+
+
+def _trend_entry(file_name: str, meta: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "file": file_name,
+        "domain": meta.get("domain"),
+        "controller": meta.get("controller"),
+        "previousDate": meta.get("previousDate") or "",
+        "currentDate": meta.get("currentDate") or "",
+        "compareDate": meta.get("compareDate") or "",
+        "improved": int(meta.get("improved", 0)),
+        "degraded": int(meta.get("degraded", 0)),
+        "percentage": float(meta.get("percentage", 0.0)),
+        "tiers": meta.get("tiers") or {},
+    }
+
+
+def load_trend_index(result_folder: str) -> Dict[str, Any]:
+    """Load the trend index (file name -> run metadata), or {} if absent/corrupt."""
+    index_path = os.path.join(result_folder, TREND_INDEX_FILE)
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        return index if isinstance(index, dict) else {}
+    except (OSError, ValueError):
+        return {}
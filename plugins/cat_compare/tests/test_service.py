@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+pytest.importorskip("xlwings")
+
+from compare_tool.service import TREND_INDEX_FILE, discover_folder_pairs, merge_batch_results
+
+
+class Upload:
+    """Stands in for a werkzeug FileStorage."""
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    def save(self, path):
+        with open(path, "w") as f:
+            f.write(self.filename)
+
+
+def test_discover_folder_pairs_matches_by_name():
+    previous = [Upload("prev/ctrlA-MaturityAssessment-apm.xlsx"), Upload("prev/ctrlB-MaturityAssessment-apm.xlsx")]
+    current = [Upload("curr/ctrlB-MaturityAssessment-apm.xlsx"), Upload("curr/ctrlA-MaturityAssessment-apm.xlsx")]
+
+    pairs = discover_folder_pairs(previous, current, ["apm"])
+
+    assert [(p["previous"], p["current"]) for p in pairs] == [(previous[0], current[1]), (previous[1], current[0])]
+    assert {p["domain"] for p in pairs} == {"apm"}
+
+
+def test_discover_folder_pairs_single_files_per_domain():
+    previous = [Upload("prev/job-MaturityAssessment-apm.xlsx"), Upload("prev/job-MaturityAssessment-brum.xlsx")]
+    current = [Upload("curr/job-MaturityAssessment-apm.xlsx"), Upload("curr/job-MaturityAssessment-brum.xlsx")]
+
+    pairs = discover_folder_pairs(previous, current, ["apm", "brum", "unknown"])
+
+    assert [(p["domain"], p["previous"], p["current"]) for p in pairs] == [
+        ("apm", previous[0], current[0]),
+        ("brum", previous[1], current[1]),
+    ]
+
+
+def test_merge_batch_results(tmp_path):
+    results = []
+    for pair_id, controller in [("000_apm_a", "a.example.com"), ("001_apm_b", "b.example.com")]:
+        pair_folder = tmp_path / pair_id
+        pair_folder.mkdir()
+        snapshot = pair_folder / "analysis_summary.json"
+        snapshot.write_text("{}")
+        meta = {"domain": "APM", "controller": controller, "compareDate": "20260101_000000", "improved": 2, "degraded": 1, "percentage": 50.0}
+        results.append(
+            {
+                "pair_id": pair_id,
+                "domain": "APM",
+                "xlsx": str(pair_folder / "comparison_result.xlsx"),
+                "pptx": str(pair_folder / "Analysis_Summary_APM.pptx"),
+                "json": str(snapshot),
+                "meta": meta,
+                "overall": {"improved": 2},
+            }
+        )
+
+    combined_path = merge_batch_results(results, str(tmp_path))
+
+    combined = json.loads(open(combined_path).read())
+    assert [p["pair"] for p in combined["pairs"]] == ["000_apm_a", "001_apm_b"]
+    assert set(combined["domains"]["APM"]) == {"a.example.com", "b.example.com"}
+    index = json.loads((tmp_path / TREND_INDEX_FILE).read_text())
+    assert len(index) == 2
+    for published, entry in index.items():
+        assert (tmp_path / published).exists()
+        assert entry["improved"] == 2 and entry["percentage"] == 50.0
+    assert merge_batch_results([], str(tmp_path)) is None
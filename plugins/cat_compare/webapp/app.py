@@ -30,8 +30,11 @@ from compare_tool.service import (
     run_comparison,        # APM
     run_comparison_brum,   # BRUM
     run_comparison_mrum,   # MRUM
-    find_best_matching_files,  # Folder processing
-    save_matched_files,        # Folder processing
+    discover_folder_pairs,     # Folder processing
+    save_pair_files,           # Folder processing
+    run_batch_comparison,      # Folder processing
+    merge_batch_results,       # Folder processing
+    load_trend_index,
 )
 import logging
 
@@ -120,7 +123,7 @@ def upload_apm():
 
 
 
-@app.route("/download/<filename>")
+@app.route("/download/<path:filename>")
 def download(filename):
     return send_from_directory(RESULT_FOLDER, filename, as_attachment=True)
 
@@ -230,67 +233,31 @@ def upload_folders():
     logging.info(f"[FOLDERS] Previous folder: {len(previous_files)} files")
     logging.info(f"[FOLDERS] Current folder: {len(current_files)} files")
     
-    # Find matching files for each data type
-    matches = find_best_matching_files(previous_files, current_files)
-    
-    # Process each selected data type
-    results = {}
+    # Discover every controller x domain pair up front, then compare them in parallel
+    pairs = discover_folder_pairs(previous_files, current_files, selected_types)
     errors = []
-    
     for data_type in selected_types:
-        domain = data_type.upper()
-        logging.info(f"[FOLDERS] Processing {domain}")
-        
-        try:
-            # Save matched files for this domain
-            previous_path, current_path = save_matched_files(matches, UPLOAD_FOLDER, data_type)
-            
-            if not previous_path or not current_path:
-                errors.append(f"No matching {domain} files found in the selected folders.")
-                continue
-            
-            # Process based on data type
-            if data_type == 'apm':
-                output_file, ppt_file = run_comparison(
-                    previous_file_path=previous_path,
-                    current_file_path=current_path,
-                    config=config,
-                )
-            elif data_type == 'brum':
-                output_file, ppt_file = run_comparison_brum(
-                    previous_file_path=previous_path,
-                    current_file_path=current_path,
-                    config=config,
-                )
-            elif data_type == 'mrum':
-                output_file, ppt_file = run_comparison_mrum(
-                    previous_file_path=previous_path,
-                    current_file_path=current_path,
-                    config=config,
-                )
-            
-            # Build JSON snapshot for insights
-            json_path, json_name, _ = build_comparison_json(
-                domain=domain,
-                comparison_result_path=output_file,
-                current_file_path=current_path,
-                previous_file_path=previous_path,
-                result_folder=RESULT_FOLDER,
-            )
-            
-            # Store results
-            results[domain] = {
-                'xlsx': os.path.basename(output_file),
-                'pptx': os.path.basename(ppt_file),
-                'json': json_name
-            }
-            
-            logging.info(f"[FOLDERS] Successfully processed {domain}")
-            
-        except Exception as e:
-            logging.error(f"[FOLDERS] Error processing {domain}: {e}", exc_info=True)
-            errors.append(f"{domain}: Error during processing - {str(e)}")
-    
+        if not any(p["domain"] == data_type.lower() for p in pairs):
+            errors.append(f"No matching {data_type.upper()} files found in the selected folders.")
+
+    jobs = save_pair_files(pairs, UPLOAD_FOLDER)
+    batch_results, batch_errors = run_batch_comparison(jobs, config)
+    errors.extend(batch_errors)
+
+    combined_path = merge_batch_results(batch_results, RESULT_FOLDER)
+
+    results = {}
+    for result in batch_results:
+        label = result["domain"]
+        if len(batch_results) > len({r["domain"] for r in batch_results}):
+            label = f"{result['domain']} - {result['meta'].get('controller') or result['pair_id']}"
+        results[label] = {
+            'xlsx': os.path.relpath(result["xlsx"], RESULT_FOLDER),
+            'pptx': os.path.relpath(result["pptx"], RESULT_FOLDER),
+            'json': os.path.relpath(result["json"], RESULT_FOLDER),
+        }
+        logging.info(f"[FOLDERS] Successfully processed {label}")
+
     # Generate response message
     if results:
         message_parts = ["Processing completed successfully!<br><br>"]
@@ -300,6 +267,11 @@ def upload_folders():
             message_parts.append(f"• Results: <a href='/download/{files['xlsx']}' style='color: #32CD32;'>Download Excel</a><br>")
             message_parts.append(f"• PowerPoint: <a href='/download/{files['pptx']}' style='color: #32CD32;'>Download PPT</a><br>")
             message_parts.append(f"• JSON: <a href='/download/{files['json']}' style='color: #32CD32;'>Download JSON</a><br><br>")
+
+        if combined_path:
+            message_parts.append(
+                f"<strong>Combined insights:</strong> <a href='/download/{os.path.basename(combined_path)}' style='color: #32CD32;'>Download JSON</a><br>"
+            )
         
         if errors:
             message_parts.append("<br><strong>Warnings:</strong><br>")
@@ -334,11 +306,21 @@ def scan_runs(folder: str, domain: str, controller_filter: Optional[str], limit:
     if not os.path.isdir(folder):
         return []
 
+    index = load_trend_index(folder)
+
     runs = []
     for name in sorted(os.listdir(folder), reverse=True):
         if not (name.startswith(prefix) and name.endswith(".json")):
             continue
 
+        # Snapshots written by batch folder runs are indexed; skip re-parsing them.
+        indexed = index.get(name)
+        if indexed is not None:
+            if controller_filter and _slug(indexed.get("controller")) != _slug(controller_filter):
+                continue
+            runs.append(dict(indexed, sortPrev=indexed.get("previousDate", "")))
+            continue
+
         path = os.path.join(folder, name)
         try:
             with open(path, "r", encoding="utf-8") as f:
@@ -0,0 +1,99 @@
+"""
+Parsing controller responses and writing the controllerData snapshot, with the standard library as before and with the
+accelerated codec. Pass captured response bodies (e.g. saved with the browser's developer tools or curl) and snapshots
+as files, without any the payloads are generated in the shape of metric data, node metadata and snapshot lists.
+
+    python tests/benchmark_json.py [payload.json ...]
+"""
+import io
+import json
+import sys
+import time
+from collections import OrderedDict
+
+from backend.util.excel_utils import Color
+from backend.util.json_utils import OrjsonCodec, StdlibCodec, orjson
+from backend.util.stdlib_utils import jsonEncoder
+
+
+def metricData(nodes: int) -> list:
+    return [
+        {
+            "metricId": 1000 + idx,
+            "metricName": f"BTM|Application Diagnostic Data|Node:{idx}|Availability",
+            "metricPath": f"Application Infrastructure Performance|Tier {idx % 20}|Individual Nodes|node-{idx}|Agent|App|Availability",
+            "frequency": "ONE_MIN",
+            "metricValues": [{"startTimeInMillis": 1700000000000 + minute * 60000, "value": 1, "min": 0, "max": 1, "current": 1,
+                              "sum": 60, "count": 60, "standardDeviation": 0.0, "occurrences": 1, "useRange": True} for minute in range(10)],
+        }
+        for idx in range(nodes)
+    ]
+
+
+def nodeMetadata(nodes: int) -> list:
+    return [
+        {
+            "applicationComponentNode": {"id": idx, "name": f"node-{idx}", "machineId": 5000 + idx, "tierId": idx % 20},
+            "appAgentVersion": "Server Agent #23.8.0.35032 v23.8.0 GA compatible with 4.4.1.0 r1b7e5c3",
+            "latestAgentRuntime": "-Dappdynamics.agent.applicationName=Café -Xmx2g " * 8,
+            "properties": {f"property{key}": f"value{key}" for key in range(20)},
+        }
+        for idx in range(nodes)
+    ]
+
+
+def snapshots(count: int) -> dict:
+    return {
+        "requestSegmentDataListItems": [
+            {"id": idx, "requestGUID": f"{idx:032x}", "businessTransactionId": idx % 200, "timeTakenInMilliSecs": idx % 5000,
+             "userExperience": "NORMAL", "url": f"/api/orders/{idx}", "errorOccured": False, "hasDeepDiveData": idx % 3 == 0}
+            for idx in range(count)
+        ]
+    }
+
+
+def generatedPayloads() -> dict:
+    return {
+        "metric-data, 2000 nodes": json.dumps(metricData(2000)).encode("utf-8"),
+        "node metadata, 2000 nodes": json.dumps(nodeMetadata(2000)).encode("utf-8"),
+        "snapshots, 5000 requests": json.dumps(snapshots(5000)).encode("utf-8"),
+    }
+
+
+def generatedSnapshot() -> OrderedDict:
+    applications = OrderedDict(
+        (f"app-{idx}", {"applicationId": idx, "nodes": nodeMetadata(50), "evaluated": {"metric": [1, Color.green], "other": [0, Color.red]}})
+        for idx in range(200)
+    )
+    return OrderedDict([("controller.example.com", {"apm": applications, "configurationAnalysisReport": {}})])
+
+
+def best(function, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(paths: list):
+    if orjson is None:
+        print("orjson is not installed, the accelerated codec falls back to the standard library")
+    stdlibCodec, orjsonCodec = StdlibCodec(), OrjsonCodec()
+    payloads = {path: open(path, "rb").read() for path in paths} or generatedPayloads()
+
+    print(f"{'parse':<40} {'before':>10} {'codec':>10}")
+    for name, body in payloads.items():
+        before = best(lambda: json.loads(body.decode("ISO-8859-1")))
+        after = best(lambda: orjsonCodec.loads(body))
+        print(f"{name[-40:]:<40} {before * 1000:8.1f}ms {after * 1000:8.1f}ms  {before / after:5.1f}x  {len(body) / 1e6:.1f} MB")
+
+    snapshot = generatedSnapshot() if not paths else stdlibCodec.loads(max(payloads.values(), key=len))
+    before = best(lambda: json.dump(snapshot, fp=io.StringIO(), default=jsonEncoder, indent=4))
+    after = best(lambda: orjsonCodec.dump(snapshot, io.BytesIO(), default=jsonEncoder))
+    print(f"{'write snapshot':<40} {before * 1000:8.1f}ms {after * 1000:8.1f}ms  {before / after:5.1f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,138 @@
+"""
+Client CPU per request of the hot endpoints, sent through uplink's request building as before and through
+AppdController's direct templates. The controller is a local aiohttp server in a separate process, so only the client's CPU is measured.
+
+    python tests/benchmark_transport.py [requests per endpoint]
+"""
+import asyncio
+import multiprocessing
+import socket
+import sys
+import time
+
+import aiohttp
+from aiohttp import web
+from uplink import AiohttpClient, Body, Consumer, Path, Query, get, headers, params, post
+from uplink.auth import BearerToken
+
+from backend.api.appd.AppDController import AppdController
+
+METRIC_PATH = "Application Infrastructure Performance|Tier A|Individual Nodes|node-{}|Agent|App|Availability"
+AGENT_CONFIGURATION_BODY = (
+    '{"checkAncestors":false,"key":{"agentType":"{agentType}","attachedEntity":{"id":null,"version":null,"entityId":{entityId},"entityType":"{entityType}"}}}'
+)
+
+
+class UplinkController(Consumer):
+    """The hot endpoints as they were declared before they moved to direct templates."""
+
+    @params({"output": "json"})
+    @get("/controller/rest/applications/{applicationID}/metric-data")
+    def getMetricData(
+        self,
+        applicationID: Path,
+        metric_path: Query("metric-path"),
+        rollup: Query("rollup"),
+        time_range_type: Query("time-range-type"),
+        duration_in_mins: Query("duration-in-mins"),
+        start_time: Query("start-time"),
+        end_time: Query("end-time"),
+    ):
+        """Retrieves Metrics"""
+
+    @params({"output": "json"})
+    @get("/controller/restui/components/getNodeViewData/{applicationId}/{nodeId}")
+    def getAppServerAgentsMetadata(self, applicationId: Path, nodeId: Path):
+        """Retrieves app agent metadata"""
+
+    @params({"output": "json"})
+    @headers({"Accept": "application/json, text/plain, */*"})
+    @post("/controller/restui/agentManager/getAgentConfiguration")
+    def getAgentConfiguration(self, body: Body):
+        """Retrieves Agent Configurations"""
+
+    @params({"output": "json"})
+    @get("/controller/sim/v2/user/machines/{machineId}")
+    def getServer(self, machineId: Path):
+        """Retrieves server agent info"""
+
+
+def serve(port: int):
+    async def reply(request):
+        await request.read()
+        return web.Response(body=b"[]", content_type="application/json")
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", reply)
+    web.run_app(app, host="127.0.0.1", port=port, print=None, handle_signals=False)
+
+
+def uplinkCalls(controller, idx):
+    yield controller.getMetricData(1, METRIC_PATH.format(idx), True, "BEFORE_NOW", 1440, "", "")
+    yield controller.getAppServerAgentsMetadata(1, idx)
+    body = (
+        AGENT_CONFIGURATION_BODY.replace("{agentType}", "APP_AGENT").replace("{entityId}", str(idx)).replace("{entityType}", "APPLICATION_COMPONENT_NODE")
+    )
+    yield controller.getAgentConfiguration(body)
+    yield controller.getServer(idx)
+
+
+def directCalls(controller, idx):
+    yield controller.getMetricData(1, METRIC_PATH.format(idx), True, "BEFORE_NOW", 1440, "", "")
+    yield controller.getAppServerAgentsMetadata(1, idx)
+    yield controller.getAgentConfiguration("APP_AGENT", "APPLICATION_COMPONENT_NODE", idx)
+    yield controller.getServer(idx)
+
+
+async def measure(name: str, controller, calls, count: int, concurrency: int = 20):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(request):
+        async with semaphore:
+            response = await request
+            await response.content.read()
+            response.release()
+
+    # warm up connections and caches
+    await asyncio.gather(*[send(request) for idx in range(concurrency) for request in calls(controller, idx)])
+    cpuStart = time.process_time()
+    wallStart = time.perf_counter()
+    await asyncio.gather(*[send(request) for idx in range(count) for request in calls(controller, idx)])
+    cpuSeconds = time.process_time() - cpuStart
+    wallSeconds = time.perf_counter() - wallStart
+    requests = count * 4
+    print(f"{name:<8} {requests} requests  {cpuSeconds / requests * 1e6:8.1f} us CPU/request  {requests / wallSeconds:8.0f} requests/s")
+    return cpuSeconds / requests
+
+
+async def main(count: int, port: int):
+    baseUrl = f"http://127.0.0.1:{port}"
+    async with aiohttp.ClientSession() as session:
+        uplinkController = UplinkController(base_url=baseUrl, client=AiohttpClient(session=session))
+        directController = AppdController(base_url=baseUrl, client=AiohttpClient(session=session), session=session)
+        for controller in [uplinkController, directController]:
+            controller.session.headers["Content-Type"] = "application/json;charset=UTF-8"
+            controller.session.auth = BearerToken("token")
+
+        before = await measure("uplink", uplinkController, uplinkCalls, count)
+        after = await measure("direct", directController, directCalls, count)
+        print(f"direct transport uses {(1 - after / before) * 100:.0f}% less client CPU per request")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2500
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = multiprocessing.get_context("spawn").Process(target=serve, args=(port,), daemon=True)
+    server.start()
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        asyncio.run(main(count, port))
+    finally:
+        server.terminate()
@@ -0,0 +1,50 @@
+import asyncio
+from collections import OrderedDict
+
+from backend.api.Result import Result
+from backend.extractionSteps.maturityAssessment.apm.AppAgentsAPM import AppAgentsAPM
+
+
+class NodeController:
+    """Controller service of one application with 40 nodes in 4 tiers, recording the requests made."""
+
+    host = "controller.example.com"
+    timeRangeMins = 60
+
+    def __init__(self, nodeSampleSize: int):
+        self.nodeSampleSize = nodeSampleSize
+        self.nodes = [{"id": idx, "name": f"node-{idx}", "tierName": f"tier-{idx % 4}", "appAgentVersion": "23.8.0"} for idx in range(40)]
+        self.metricPaths = []
+        self.metadataNodeIds = []
+
+    async def getNodes(self, applicationID):
+        return Result([dict(node) for node in self.nodes], None)
+
+    async def getMetricData(self, applicationID, metric_path, **kwargs):
+        self.metricPaths.append(metric_path)
+        values = [{"sum": 60}] if metric_path.endswith("Availability") else []
+        return Result(
+            [
+                {"metricPath": metric_path.replace("*|Individual Nodes|*", f'{node["tierName"]}|Individual Nodes|{node["name"]}'), "metricValues": values}
+                for node in self.nodes
+                if node["id"] % 2 == 0
+            ],
+            None,
+        )
+
+    async def getAppAgentMetadata(self, applicationId, agentIDs, agentVersions=None):
+        self.metadataNodeIds.extend(agentIDs)
+        return Result([{"applicationComponentNode": {"id": nodeId}} for nodeId in agentIDs], None)
+
+
+def test_sampling_limits_metadata_but_keeps_availability_exact():
+    controller = NodeController(nodeSampleSize=10)
+    application = {"id": 1, "name": "app"}
+    controllerData = {controller.host: {"controller": controller, "apm": OrderedDict(app=application)}}
+
+    asyncio.run(AppAgentsAPM().extract(controllerData))
+
+    assert sum(path.endswith("Agent|App|Availability") for path in controller.metricPaths) == 1
+    assert len(controller.metadataNodeIds) == len(application["sampledNodeIds"]) < 40
+    assert [node["appAgentAvailability"] for node in application["nodes"]] == [60 if idx % 2 == 0 else 0 for idx in range(40)]
+    assert {node["id"] for node in application["nodes"] if node["metadata"] is not None} == set(application["sampledNodeIds"])
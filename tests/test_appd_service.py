@@ -0,0 +1,330 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from backend.api.appd import AppDService as appdService
+from backend.api.appd.AppDService import AppDService
+
+
+class Response:
+    """Just enough of an aiohttp response for getResultFromResponse."""
+
+    def __init__(self, data, status_code: int = 200):
+        body = json.dumps(data).encode("utf-8")
+        self.status_code = status_code
+
+        async def read():
+            return body
+
+        self.content = SimpleNamespace(read=read)
+
+
+def service(**kwargs) -> AppDService:
+    authMethod = SimpleNamespace(host="controller.example.com", auth_method="basic", controller=SimpleNamespace(), username="user")
+    return AppDService(authMethod=authMethod, **kwargs)
+
+
+def test_getAgentIdsPaginated_pages_until_a_short_page(monkeypatch):
+    monkeypatch.setattr(appdService, "AGENT_PAGE_SIZE", 10)
+    agents = [{"id": idx} for idx in range(25)]
+    requests = []
+
+    async def listAgents(body):
+        body = json.loads(body)
+        requests.append(body["offset"])
+        return Response({"data": agents[body["offset"] : body["offset"] + body["limit"]]})
+
+    result = asyncio.run(service().getAgentIdsPaginated(listAgents, "id", "ID", "agents"))
+
+    assert result.error is None
+    assert result.data == list(range(25))
+
+
+def test_getAgentIdsPaginated_breaks_host_name_ties_by_id(monkeypatch):
+    monkeypatch.setattr(appdService, "AGENT_PAGE_SIZE", 10)
+    agents = [{"id": idx, "host": "shared-host"} for idx in range(25)]
+    sorts = []
+
+    async def listAgents(body):
+        body = json.loads(body)
+        sorts.append(body["columnSorts"])
+        if body["columnSorts"] != [{"column": "HOST_NAME", "direction": "ASC"}, {"column": "ID", "direction": "ASC"}]:
+            return Response({"error": "unsorted"}, status_code=500)
+        return Response({"data": agents[body["offset"] : body["offset"] + body["limit"]]})
+
+    result = asyncio.run(service().getAgentIdsPaginated(listAgents, "id", "ID", "agents"))
+
+    assert result.data == list(range(25))
+
+
+def test_getAgentIdsPaginated_falls_back_to_host_name_order(monkeypatch):
+    monkeypatch.setattr(appdService, "AGENT_PAGE_SIZE", 10)
+    agents = [{"id": idx} for idx in range(25)]
+
+    async def listAgents(body):
+        body = json.loads(body)
+        if len(body["columnSorts"]) > 1:
+            return Response({"error": "unknown column"}, status_code=500)
+        return Response({"data": agents[body["offset"] : body["offset"] + body["limit"]]})
+
+    result = asyncio.run(service().getAgentIdsPaginated(listAgents, "id", "UNKNOWN_COLUMN", "agents"))
+
+    assert result.error is None
+    assert result.data == list(range(25))
+
+
+def test_getAgentIdsPaginated_stops_when_offset_is_ignored(monkeypatch):
+    monkeypatch.setattr(appdService, "AGENT_PAGE_SIZE", 10)
+    calls = 0
+
+    async def listAgents(body):
+        nonlocal calls
+        calls += 1
+        # honors limit but always returns the first page
+        return Response({"data": [{"id": idx} for idx in range(json.loads(body)["limit"])]})
+
+    result = asyncio.run(service().getAgentIdsPaginated(listAgents, "id", "ID", "agents"))
+
+    assert result.data == list(range(10))
+    assert calls <= appdService.AGENT_PAGE_WINDOW
+
+
+class CountingController:
+    """Controller whose endpoints answer with their own name and count requests."""
+
+    def __init__(self):
+        self.requests = []
+
+    def __getattr__(self, name):
+        async def endpoint(*args, **kwargs):
+            self.requests.append(name)
+            await asyncio.sleep(0)
+            return Response([{"endpoint": name}])
+
+        return endpoint
+
+
+def test_singleFlight_coalesces_in_flight_calls_and_memoizes_only_allowed_methods():
+    appd = service()
+    appd.controller = CountingController()
+
+    async def scenario():
+        concurrent = await asyncio.gather(appd.getNodes(1), appd.getNodes(1))
+        await appd.getNodes(1)
+        await appd.getBtMatchRules(1)
+        await appd.getBtMatchRules(1)
+        return concurrent
+
+    first, second = asyncio.run(scenario())
+
+    assert appd.controller.requests == ["getNodes", "getNodes", "getBtMatchRules"]
+    assert first.data == second.data and first.data is not second.data
+    assert [key[0] for key in appd.memo] == ["getBtMatchRules"]
+    assert appd.redundantCalls == {"getNodes": 1, "getBtMatchRules": 1}
+
+
+def test_health_rules_and_policies_are_fetched_again_every_daemon_run():
+    appd = service()
+    appd.controller = CountingController()
+
+    async def daemonRuns():
+        for _ in range(2):
+            appd.resetRunState(cacheTtlSeconds=3600)
+            await appd.getPolicies(1)
+            await appd.getBtMatchRules(1)
+
+    asyncio.run(daemonRuns())
+
+    assert appd.controller.requests == ["getPolicies", "getBtMatchRules", "getPolicies"]
+
+
+def test_health_rule_definitions_stay_shared_for_coalesced_calls():
+    appd = service()
+    definition = {"name": "Business Transaction response time is much higher than normal", "affects": {}, "evalCriterias": {}}
+
+    class HealthRuleController:
+        async def getHealthRules(self, applicationID, detailed):
+            await asyncio.sleep(0)
+            return Response([{"id": applicationID * 100, **definition}])
+
+    appd.controller = HealthRuleController()
+
+    async def scenario():
+        return await asyncio.gather(appd.getHealthRules(1), appd.getHealthRules(1), appd.getHealthRules(2))
+
+    first, coalesced, other = asyncio.run(scenario())
+
+    assert first.data[0].data == coalesced.data[0].data == {"id": 100, **definition}
+    assert other.data[0].data["id"] == 200
+    assert first.data[0].data["affects"] is coalesced.data[0].data["affects"] is other.data[0].data["affects"]
+    assert first.data is not coalesced.data
+    assert appd.redundantCalls == {"getHealthRules": 1}
+
+
+def test_timeSlices_meet_on_the_hour():
+    now = 1767225600000 + 17 * 60 * 1000 + 1234
+    appd = service(metricSliceMins=1000)
+    appd.endTime = now
+
+    slices = appd.timeSlices(3 * 1440)
+
+    assert slices[0][0] == now - 3 * 1440 * 60 * 1000 and slices[-1][1] == now
+    assert all(end == start for (_, end), (start, _) in zip(slices, slices[1:]))
+    assert all(start % appdService.HOUR_MILLIS == 0 for start, _ in slices[1:])
+    assert {end - start for start, end in slices[1:-1]} == {17 * appdService.HOUR_MILLIS}
+    assert service(metricSliceMins=1440).timeSlices(1440) == []
+
+
+def test_metric_slices_share_the_connection_limit(monkeypatch):
+    monkeypatch.setattr(appdService.AsyncioUtils, "concurrentConnections", 3)
+    appd = service(metricSliceMins=60)
+    inFlight = peak = 0
+
+    class MetricController:
+        async def getMetricData(self, *args):
+            nonlocal inFlight, peak
+            inFlight += 1
+            peak = max(peak, inFlight)
+            await asyncio.sleep(0)
+            inFlight -= 1
+            return Response([{"metricPath": "A", "metricValues": [{"sum": 1, "count": 1}]}])
+
+    appd.controller = MetricController()
+
+    async def scenario():
+        return await appdService.AsyncioUtils.gatherWithConcurrency(
+            *[appd.getMetricData(applicationID, "A", True, "BEFORE_NOW", duration_in_mins=600) for applicationID in range(5)]
+        )
+
+    results = asyncio.run(scenario())
+
+    assert peak == 3
+    assert all(result.data[0]["metricValues"][0]["sum"] >= 10 for result in results)
+
+
+def test_resumed_run_queries_metrics_for_the_restored_window():
+    appd = service(metricSliceMins=1440)
+    # restored from the interrupted run's store, see Engine.initControllers
+    appd.startTime, appd.endTime = 1767225600000, 1767225600000 + 1440 * 60 * 1000
+    requests = []
+
+    class MetricController:
+        async def getMetricData(self, applicationID, metric_path, rollup, time_range_type, duration_in_mins, start_time, end_time):
+            requests.append((time_range_type, duration_in_mins, start_time, end_time))
+            return Response([])
+
+        async def getMetricTree(self, body):
+            timeRange = json.loads(body)["timeRangeSpecifier"]
+            requests.append((timeRange["type"], timeRange["durationInMinutes"], timeRange["startTime"], timeRange["endTime"]))
+            return Response([])
+
+    appd.controller = MetricController()
+
+    async def scenario():
+        await appd.getMetricData(1, "A", True, "BEFORE_NOW", duration_in_mins=60)
+        await appd.getMetricData(1, "A", True, "BEFORE_NOW", duration_in_mins=2880)
+        await appd.getCustomMetrics(1, "tier")
+
+    asyncio.run(scenario())
+
+    assert requests[0] == ("BETWEEN_TIMES", "", appd.endTime - 60 * 60 * 1000, appd.endTime)
+    assert requests[1][2] == appd.endTime - 2880 * 60 * 1000 and requests[2][3] == appd.endTime
+    assert requests[3] == ("BETWEEN_TIMES", None, appd.startTime, appd.endTime)
+    assert len(requests) == 4
+
+
+def test_getDataCollectorUsage_without_probeSnapshots_sends_no_snapshot_search():
+    appd = service()
+    dataCollector = {"type": "http", "enabledForApm": True, "enabledForAnalytics": True, "requestParameters": [{"displayName": "orderId"}],
+                     "cookieNames": ["JSESSIONID"], "sessionKeys": ["user"], "headers": []}
+
+    class DataCollectorController(CountingController):
+        async def getDataCollectors(self, applicationID):
+            self.requests.append("getDataCollectors")
+            return Response([dataCollector])
+
+        async def getSnapshotsWithDataCollector(self, body):
+            self.requests.append("getSnapshotsWithDataCollector")
+            return Response({"requestSegmentDataListItems": [{"id": 1}]})
+
+    appd.controller = DataCollectorController()
+
+    skipped = asyncio.run(appd.getDataCollectorUsage(1, enoughConfirmed=5, probeSnapshots=False))
+    assert appd.controller.requests == ["getDataCollectors"]
+    assert skipped.data["dataCollectorsPresentInSnapshots"] == [("Session Key", "user", True)]
+
+    probed = asyncio.run(appd.getDataCollectorUsage(1, enoughConfirmed=5))
+    assert appd.controller.requests.count("getSnapshotsWithDataCollector") == 2
+    assert len(probed.data["dataCollectorsPresentInSnapshots"]) == 3
+
+
+def test_getServerAvailability_queries_each_machine():
+    appd = service()
+    requestedIds = []
+
+    class ServerController:
+        async def getServerAvailability(self, body):
+            machineId = json.loads(body)["ids"][0]
+            requestedIds.append(json.loads(body)["ids"])
+            return Response({"data": {str(machineId): {"values": [{"value": machineId % 2}]}}})
+
+    appd.controller = ServerController()
+
+    availability = asyncio.run(appd.getServerAvailability([10, 11, 12]))
+
+    assert availability == {10: 0, 11: 1, 12: 0}
+    assert sorted(requestedIds) == [[10], [11], [12]]
+
+
+def test_agent_metadata_cache_expires_after_its_ttl(tmp_path, monkeypatch):
+    cacheFile = str(tmp_path / "agentMetadata.json")
+    requestedIds = []
+    now = [1_000_000.0]
+    monkeypatch.setattr(appdService.time, "time", lambda: now[0])
+
+    class MetadataController:
+        async def getAppServerAgentsMetadata(self, applicationId, agentId):
+            requestedIds.append(agentId)
+            return Response({"applicationComponentNode": {"appAgent": {"latestAgentRuntime": f"run {len(requestedIds)}"}}})
+
+    def run():
+        appd = service(agentMetadataCacheFile=cacheFile, agentMetadataCacheTtlMins=60)
+        appd.controller = MetadataController()
+        result = asyncio.run(appd.getAppAgentMetadata(1, [7], ["22.1"]))
+        appd.agentMetadataCache.save()
+        return result.data[0]["applicationComponentNode"]["appAgent"]["latestAgentRuntime"]
+
+    assert run() == "run 1"
+    now[0] += 59 * 60
+    assert run() == "run 1"
+    now[0] += 2 * 60
+    assert run() == "run 2"
+    assert requestedIds == [7, 7]
+
+
+def test_singleFlight_waiters_take_over_from_a_cancelled_call():
+    appd = service()
+    started = []
+
+    class SlowController(CountingController):
+        async def getNodes(self, applicationID):
+            started.append(applicationID)
+            await asyncio.sleep(0.01)
+            return Response([{"endpoint": "getNodes"}])
+
+    appd.controller = SlowController()
+
+    async def scenario():
+        leader = asyncio.create_task(appd.getNodes(1))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(appd.getNodes(1)) for _ in range(2)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await asyncio.gather(*followers), leader
+
+    (first, second), leader = asyncio.run(scenario())
+
+    assert leader.cancelled()
+    assert first.data == second.data == [{"endpoint": "getNodes"}]
+    assert started == [1, 1]
+    assert appd.redundantCalls == {"getNodes": 1}
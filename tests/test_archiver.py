@@ -0,0 +1,60 @@
+import asyncio
+import os
+
+from backend.output.Archiver import Archiver
+
+
+def run(timestamp: str) -> dict:
+    return {"timestamp": timestamp, "files": 1, "size": 1, "blobs": []}
+
+
+def archiveRun(archiver: Archiver, outputDir, jobFileName: str, content: str) -> str:
+    jobDir = outputDir / jobFileName
+    jobDir.mkdir(exist_ok=True)
+    (jobDir / "report.xlsx").write_text(content)
+    asyncio.run(archiver.post_process(jobFileName))
+    return archiver.listRuns(jobFileName)[0]["timestamp"]
+
+
+def test_retainedRuns():
+    # newest first: two runs on Jan 10, one each on Jan 9, Jan 2 and Dec 31
+    runs = [run("20260110_120000"), run("20260110_080000"), run("20260109_120000"), run("20260102_120000"), run("20251231_120000")]
+
+    assert Archiver(keepLastRuns=2).retainedRuns(runs) == {"20260110_120000", "20260110_080000"}
+    assert Archiver(keepDailyRuns=2).retainedRuns(runs) == {"20260110_120000", "20260109_120000"}
+    assert Archiver(keepWeeklyRuns=2).retainedRuns(runs) == {"20260110_120000", "20260102_120000"}
+    assert Archiver(keepLastRuns=1, keepDailyRuns=3).retainedRuns(runs) == {"20260110_120000", "20260109_120000", "20260102_120000"}
+    assert Archiver(keepLastRuns=0).retainedRuns(runs) == set()
+
+
+def test_retention_keeps_current_run(tmp_path):
+    archiver = Archiver(str(tmp_path), keepLastRuns=0)
+
+    timestamp = archiveRun(archiver, tmp_path, "job", "first")
+
+    assert [r["timestamp"] for r in archiver.listRuns("job")] == [timestamp]
+    restored = archiver.restore("job", timestamp, str(tmp_path / "restored"))
+    assert open(restored[0]).read() == "first"
+
+
+def test_runs_within_one_second_get_their_own_manifest(tmp_path):
+    archiver = Archiver(str(tmp_path))
+
+    timestamps = [archiveRun(archiver, tmp_path, "job", content) for content in ["first", "second", "third"]]
+
+    assert len(set(timestamps)) == 3
+    assert [r["timestamp"] for r in archiver.listRuns("job")] == list(reversed(timestamps))
+    for timestamp, content in zip(timestamps, ["first", "second", "third"]):
+        restored = archiver.restore("job", timestamp, str(tmp_path / "restored" / timestamp))
+        assert open(restored[0]).read() == content
+
+
+def test_retention_collects_unreferenced_blobs(tmp_path):
+    archiver = Archiver(str(tmp_path), keepLastRuns=1)
+
+    archiveRun(archiver, tmp_path, "job", "first")
+    archiveRun(archiver, tmp_path, "job", "second")
+
+    blobs = [name for _, _, names in os.walk(tmp_path / "archive" / "blobs") for name in names]
+    assert len(archiver.listRuns("job")) == 1
+    assert len(blobs) == 1
@@ -0,0 +1,48 @@
+import json
+from collections import OrderedDict
+
+from backend.extractionSteps.maturityAssessment.apm.DataCollectorsAPM import DataCollectorsAPM
+from backend.util.excel_utils import Color
+
+
+def thresholds() -> dict:
+    with open("input/thresholds/DefaultThresholds.json") as f:
+        thresholds = json.load(f)
+    # set by Engine.validateThresholdsFile, every data collector metric is better when higher
+    jobStepThresholds = thresholds["apm"]["DataCollectorsAPM"]
+    jobStepThresholds["direction"] = {metric: "decreasing" for metric in jobStepThresholds["platinum"]}
+    return thresholds
+
+
+def analyzed(fieldsInSnapshots: int, unprobed: int) -> OrderedDict:
+    fields = [("HTTP Parameter", f"field{idx}", True) for idx in range(fieldsInSnapshots + unprobed)]
+    application = {
+        "id": 1,
+        "dataCollectors": {
+            "allDataCollectors": fields,
+            "dataCollectorsPresentInSnapshots": fields[:fieldsInSnapshots],
+            "dataCollectorsPresentInAnalytics": fields[:fieldsInSnapshots],
+            "unprobedDataCollectors": unprobed,
+            "snapshotsAssessed": True,
+        },
+    }
+    hostInfo = {"controller": type("Controller", (), {"host": "controller.example.com"}), "apm": {"app": application},
+                "analyticsEnabledStatus": [{"applicationId": 1, "enabled": True}]}
+    DataCollectorsAPM().analyze({"controller.example.com": hostInfo}, thresholds())
+    return application["DataCollectorsAPM"]
+
+
+def test_counts_of_stopped_probing_are_written_as_lower_bounds():
+    stopped = analyzed(fieldsInSnapshots=5, unprobed=3)
+
+    assert stopped["evaluated"]["numberOfDataCollectorFieldsCollectedInSnapshots"] == ["≥5", Color.platinum]
+    assert stopped["evaluated"]["numberOfDataCollectorFieldsCollectedInAnalytics"] == ["≥5", Color.platinum]
+    assert stopped["raw"]["numberOfDataCollectorFieldsNotProbed"] == 3
+    assert stopped["computed"][0] == "platinum"
+
+
+def test_counts_of_finished_probing_are_exact():
+    finished = analyzed(fieldsInSnapshots=3, unprobed=0)
+
+    assert finished["evaluated"]["numberOfDataCollectorFieldsCollectedInSnapshots"] == [3, Color.gold]
+    assert finished["computed"][0] == "gold"
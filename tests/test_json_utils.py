@@ -0,0 +1,71 @@
+import io
+import json
+from collections import OrderedDict
+from enum import Enum, IntEnum
+
+import pytest
+
+from backend.util.excel_utils import Color
+from backend.util.json_utils import OrjsonCodec, StdlibCodec
+from backend.util.stdlib_utils import jsonEncoder
+
+pytest.importorskip("orjson")
+
+
+class Level(Enum):
+    low = "L"
+    high = 2
+
+
+class Priority(IntEnum):
+    normal = 1
+
+
+class Summary:
+    def __json__(self):
+        return {"level": Level.high, "tags": {"a"}}
+
+
+def dumped(codec, obj) -> bytes:
+    fp = io.BytesIO()
+    codec.dump(obj, fp, default=jsonEncoder)
+    return fp.getvalue()
+
+
+def test_both_codecs_write_the_same_json():
+    data = OrderedDict(
+        [
+            ("evaluated", {"metric": [1, Color.green], "other": (0, Color.red)}),
+            ("levels", [Level.low, Level.high, Priority.normal]),
+            ("summary", Summary()),
+            ("byId", {1: "one", 2: [Level.low]}),
+            ("values", [0.5, None, True, "Café"]),
+        ]
+    )
+
+    orjsonOutput, stdlibOutput = dumped(OrjsonCodec(), data), dumped(StdlibCodec(), data)
+
+    assert json.loads(orjsonOutput) == json.loads(stdlibOutput)
+    assert json.loads(orjsonOutput)["levels"] == ["low", "high", 1]
+    assert data["evaluated"]["metric"][1] is Color.green
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), 2**70])
+def test_values_orjson_writes_differently_are_left_to_the_standard_library(value):
+    data = {"value": value}
+
+    assert dumped(OrjsonCodec(), data) == dumped(StdlibCodec(), data)
+
+
+def test_keys_the_standard_library_rejects_are_rejected():
+    for codec in [OrjsonCodec(), StdlibCodec()]:
+        with pytest.raises(TypeError):
+            dumped(codec, {"byLevel": {Level.low: 1}})
+
+
+def test_loads_accepts_what_the_standard_library_accepts():
+    codec = OrjsonCodec()
+
+    assert codec.loads(b'{"a": [1, 2.5, "x"]}') == {"a": [1, 2.5, "x"]}
+    assert codec.loads(b'{"a": NaN}')["a"] != codec.loads(b'{"a": NaN}')["a"]
+    assert codec.loads('{"name": "Caf\xe9"}'.encode("ISO-8859-1")) == {"name": "Café"}
@@ -0,0 +1,58 @@
+from backend.api.MetricAggregate import MetricAggregate, mergeMetricData
+
+HOUR_MILLIS = 60 * 60 * 1000
+START = 1767225600000  # 2026-01-01T00:00:00Z
+
+
+def hourlyValues(hours: int) -> list:
+    return [
+        {"startTimeInMillis": START + hour * HOUR_MILLIS, "value": hour % 7, "min": hour % 3, "max": 10 + hour % 5, "current": hour,
+         "sum": (hour % 7) * 60, "count": 60, "occurrences": 1 + hour % 2}
+        for hour in range(hours)
+    ]
+
+
+def rolledUp(metricPath: str, values: list) -> dict:
+    """The controller's rollup of hourly values, as a single-window response returns it."""
+    count = sum(value["count"] for value in values)
+    return {
+        "metricPath": metricPath,
+        "frequency": "SIXTY_MIN",
+        "metricValues": [
+            {
+                "startTimeInMillis": values[0]["startTimeInMillis"],
+                "value": round(sum(value["value"] * value["count"] for value in values) / count),
+                "min": min(value["min"] for value in values),
+                "max": max(value["max"] for value in values),
+                "current": values[-1]["current"],
+                "sum": sum(value["sum"] for value in values),
+                "count": count,
+                "occurrences": sum(value["occurrences"] for value in values),
+            }
+        ],
+    }
+
+
+def test_merged_hour_aligned_slices_match_the_single_window():
+    values = {"A|Calls per Minute": hourlyValues(72), "B|Errors per Minute": hourlyValues(72)[5:]}
+    singleWindow = [rolledUp(metricPath, series) for metricPath, series in values.items()]
+    slices = [
+        [rolledUp(metricPath, series[sliceStart : sliceStart + 24]) for metricPath, series in values.items() if series[sliceStart : sliceStart + 24]]
+        for sliceStart in range(0, 72, 24)
+    ]
+
+    assert mergeMetricData(slices, rollup=True) == singleWindow
+
+
+def test_merge_without_rollup_concatenates_series():
+    values = hourlyValues(48)
+    slices = [[{"metricPath": "A", "metricValues": values[:24]}], [{"metricPath": "A", "metricValues": values[24:]}], []]
+
+    assert mergeMetricData(slices, rollup=False) == [{"metricPath": "A", "metricValues": values}]
+
+
+def test_fromMetricData_sums_per_entity():
+    aggregate = MetricAggregate.fromMetricData([rolledUp("A", hourlyValues(24)), {"metricPath": "B", "metricValues": []}])
+
+    assert list(aggregate) == [("A", sum((hour % 7) * 60 for hour in range(24)), True), ("B", 0.0, False)]
+    assert aggregate.nonZeroCount == 1
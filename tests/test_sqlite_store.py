@@ -0,0 +1,83 @@
+from collections import OrderedDict
+
+from backend.core.SqliteStore import HostRecord, LazyMap, SqliteStore, openControllerData
+
+
+def hostRecord(tmp_path, cacheSize: int = 2, applications: int = 10) -> HostRecord:
+    store = SqliteStore.create(str(tmp_path / "controllerData.sqlite"), cacheSize)
+    hostInfo = HostRecord(store, "controller.example.com")
+    hostInfo["apm"] = OrderedDict((str(idx), {"i": idx, "sub": {}}) for idx in range(applications))
+    return hostInfo
+
+
+def test_nested_values_stay_live_until_release(tmp_path):
+    hostInfo = hostRecord(tmp_path)
+    sub = hostInfo["apm"]["0"]["sub"]
+
+    # more applications than the cache holds are read in between
+    for application in hostInfo["apm"].values():
+        application["seen"] = True
+    sub["x"] = 1
+    hostInfo.store.flush()
+
+    assert hostInfo["apm"]["0"] == {"i": 0, "sub": {"x": 1}, "seen": True}
+    hostInfo.store.close()
+    assert openControllerData(str(tmp_path / "controllerData.sqlite"))["controller.example.com"]["apm"]["0"]["sub"] == {"x": 1}
+
+
+def test_release_writes_back_and_trims(tmp_path):
+    hostInfo = hostRecord(tmp_path)
+    store = hostInfo.store
+    for application in hostInfo["apm"].values():
+        application["seen"] = True
+    assert len(store.cache) > store.cacheSize
+
+    store.release()
+
+    assert len(store.cache) == store.cacheSize
+    reopened = SqliteStore(store.path)
+    assert all(application["seen"] for application in LazyMap(reopened, "controller.example.com", "apm").values())
+
+
+def test_readOnly_trims_on_every_access(tmp_path):
+    hostInfo = hostRecord(tmp_path, applications=20)
+    store = hostInfo.store
+    store.release()
+
+    with store.readOnly():
+        total = 0
+        for application in hostInfo["apm"].values():
+            total += application["i"]
+            assert len(store.cache) <= store.cacheSize
+
+    assert total == sum(range(20))
+
+
+def test_checkpoint_releases_and_records(tmp_path):
+    hostInfo = hostRecord(tmp_path)
+    store = hostInfo.store
+    for application in hostInfo["apm"].values():
+        application["extracted"] = True
+
+    store.checkpoint("controller.example.com", "AppAgentsAPM", "chunk")
+
+    assert store.checkpoints("controller.example.com", "AppAgentsAPM") == {"chunk"}
+    assert len(store.cache) == store.cacheSize
+    assert all(application["extracted"] for application in LazyMap(SqliteStore(store.path), "controller.example.com", "apm").values())
+
+
+def test_lazy_map_keeps_order_and_deletes(tmp_path):
+    hostInfo = hostRecord(tmp_path, applications=3)
+    applications = hostInfo["apm"]
+    del applications["1"]
+    applications["3"] = {"i": 3}
+    applications.move_to_end("0")
+    hostInfo["controllerLevel"] = {"version": "23.1"}
+
+    assert list(applications) == ["2", "3", "0"]
+    hostInfo.store.close()
+    reopened = openControllerData(str(tmp_path / "controllerData.sqlite"))["controller.example.com"]
+    # move_to_end only applies to the running process
+    assert list(reopened["apm"]) == ["0", "2", "3"]
+    assert list(reopened) == ["apm", "controllerLevel"]
+    assert reopened["controllerLevel"] == {"version": "23.1"}
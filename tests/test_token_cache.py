@@ -0,0 +1,68 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend.api.Result import Result
+from backend.api.appd import AuthMethod as authMethodModule
+from backend.api.appd.AuthMethod import AuthMethod
+from backend.api.appd.TokenCache import TokenCache
+
+
+def tokenCache(tmp_path, clientSecret: str = "secret") -> TokenCache:
+    return TokenCache(str(tmp_path), "controller.example.com", "customer1", "client", clientSecret)
+
+
+def test_round_trip(tmp_path):
+    pytest.importorskip("cryptography")
+    expiresAt = time.time() + 300
+    tokenCache(tmp_path).store("access-token", expiresAt)
+
+    assert tokenCache(tmp_path).load(60) == ("access-token", expiresAt)
+    assert tokenCache(tmp_path).load(600) is None
+    assert b"access-token" not in open(tokenCache(tmp_path).path, "rb").read()
+
+
+def test_rejects_tampered_entries_and_other_secrets(tmp_path):
+    pytest.importorskip("cryptography")
+    cache = tokenCache(tmp_path)
+    cache.store("access-token", time.time() + 300)
+    blob = bytearray(open(cache.path, "rb").read())
+
+    assert tokenCache(tmp_path, "rotated").load() is None
+
+    blob[len(blob) // 2] ^= 1
+    with open(cache.path, "wb") as f:
+        f.write(blob)
+    assert tokenCache(tmp_path).load() is None
+
+    with open(cache.path, "wb") as f:
+        f.write(b"not a token")
+    assert tokenCache(tmp_path).load() is None
+
+
+def test_refresh_of_short_lived_tokens_is_rate_limited(monkeypatch):
+    monkeypatch.setattr(authMethodModule, "TOKEN_REFRESH_MIN_SECONDS", 0.05)
+    requests = 0
+
+    async def scenario():
+        controller = SimpleNamespace(session=SimpleNamespace(headers={}, auth=None), get_client_session=lambda: None)
+        authMethod = AuthMethod("secret", "controller.example.com", 443, account="customer1", username="client", password="secret", controller=controller)
+
+        async def requestAccessToken():
+            nonlocal requests
+            requests += 1
+            # expires_in below the refresh margin
+            authMethod._applyToken(f"token-{requests}", time.time() + 0.01)
+            return Result(None, None)
+
+        authMethod._requestAccessToken = requestAccessToken
+        await requestAccessToken()
+        authMethod._scheduleRefresh()
+        await asyncio.sleep(0.5)
+        authMethod._refreshTask.cancel()
+
+    asyncio.run(scenario())
+
+    assert 2 <= requests <= 12